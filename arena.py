@@ -0,0 +1,368 @@
+"""
+Modo arena do Snake Game, independente do Pygame
+
+Dezenas a centenas de cobras (jogadores e bots) dividem um mesmo tabuleiro.
+A grade de ocupação compartilhada (simulation.Grid) conta os segmentos de
+todas as cobras em cada célula, e uma segunda grade guarda a dona de cada
+célula; as cabeças do tick formam um índice espacial (célula -> cobras).
+Com isso, as colisões de cabeça com corpo, de cabeça com cabeça e a disputa
+pela comida são resolvidas olhando apenas as células das cabeças que se
+moveram: o custo de um tick não depende do comprimento dos corpos.
+
+A comida também fica indexada em blocos com cerca de uma comida cada: o bot
+que precisa de um novo alvo procura em anéis de blocos ao redor da cabeça,
+em vez de percorrer toda a comida do tabuleiro.
+
+Regras de colisão: uma cabeça que entra em uma célula com algum corpo morre
+(inclusive o próprio); cabeças que se encontram na mesma célula morrem todas,
+exceto a da cobra estritamente maior, que sobrevive e fica com a comida que
+estiver ali. Bots mortos renascem depois de alguns ticks.
+
+O estado visível da arena é transmitido e gravado tick a tick por
+state_codec.py, que o aplica em uma cópia que só desenha (Arena.mirror),
+como a de um cliente de rede.
+"""
+
+import math
+import random
+from array import array
+from collections import deque
+
+from simulation import CELL_INDEX, DIRECTIONS, Grid, Snake, TickClock
+from autopilot import OPPOSITE
+
+# Tentativas de sortear uma célula livre que também sirva para nascer
+SPAWN_ATTEMPTS = 20
+# Lado mínimo (em células) dos blocos em que a comida é indexada para a busca dos bots
+MIN_FOOD_BUCKET = 8
+
+# Direções com o deslocamento já extraído (ler Direction.value a cada bot e tick custa caro)
+STEPS = [(direction, direction.value[0], direction.value[1]) for direction in DIRECTIONS]
+DIRECTION_CODES = {direction: code for code, direction in enumerate(DIRECTIONS)}
+
+# Cobra da arena: fica fora da grade enquanto está morta
+class ArenaSnake(Snake):
+    __slots__ = ("id", "alive", "score", "kills", "deaths", "respawn_tick", "death_cause", "target")
+
+    def __init__(self, snake_id, width, height, grid):
+        self.id = snake_id
+        self.alive = False
+        self.score = 0
+        self.kills = 0
+        self.deaths = 0
+        self.respawn_tick = 0
+        self.death_cause = None
+        # Comida que o bot está perseguindo (célula)
+        self.target = None
+        super().__init__(width, height, grid)
+
+    def reset(self):
+        # Snake.reset coloca a cobra no centro; na arena ela só entra na grade ao nascer
+        super().reset()
+        self.grid.vacate(self.positions.pop())
+
+    def spawn(self, position, direction, length):
+        self.positions = deque([position])
+        self.grid.occupy(position)
+        self.vacated = []
+        self.direction = direction
+        self.next_direction = direction
+        self.grow_pending = length - 1
+        self.alive = True
+        self.death_cause = None
+        self.target = None
+
+    def remove(self):
+        for position in self.positions:
+            self.grid.vacate(position)
+        self.vacated = list(self.positions)
+        self.positions.clear()
+        self.alive = False
+
+    def die(self, cause):
+        self.remove()
+        self.death_cause = cause
+        self.deaths += 1
+
+class Arena:
+    def __init__(self, width=80, height=60, bots=20, players=1, difficulty=1, food_count=None,
+                 start_length=3, respawn_ticks=20, clock=None, seed=None):
+        self.width = width
+        self.height = height
+        # As primeiras `players` cobras recebem ações de fora; as demais são conduzidas pelos bots
+        self.players = players
+        # Cobra vista como "o jogador" por quem desenha (em um cliente de rede, a do próprio cliente)
+        self.player_id = 0
+        self.bot_count = bots
+        self.food_count = food_count if food_count is not None else max(1, (players + bots) // 2)
+        self.start_length = start_length
+        self.respawn_ticks = respawn_ticks
+        # Todas as cobras andam juntas, no ritmo da dificuldade (sem power-ups na arena)
+        self.move_delay = max(50, 150 - difficulty * 10)
+        self.clock = clock if clock is not None else TickClock()
+        self.rng = random.Random(seed)
+        # Blocos de comida com cerca de uma comida cada; o último de cada eixo fica com a sobra, então
+        # nenhum é mais estreito que bucket_span e quem está a r anéis de blocos da cabeça está a pelo
+        # menos (r - 1) * bucket_span + 1 células dela
+        self.bucket_size = max(MIN_FOOD_BUCKET, math.isqrt(width * height // max(1, self.food_count)))
+        self.bucket_columns = max(1, width // self.bucket_size)
+        self.bucket_rows = max(1, height // self.bucket_size)
+        self.bucket_span = min(self.bucket_size, width, height)
+        self.reset()
+
+    @classmethod
+    def mirror(cls, width, height, player_id):
+        """Arena vazia que só recebe estados (state_codec.StateDecoder), como a de um cliente de rede;
+        com player_id None não há jogador (espectador)"""
+        arena = cls(width, height, bots=0, players=player_id + 1 if player_id is not None else 0, food_count=0)
+        for snake in arena.snakes:
+            snake.remove()
+        arena.player_id = player_id
+        return arena
+
+    @property
+    def player(self):
+        return self.snakes[self.player_id] if self.players else None
+
+    def reset(self, seed=None):
+        if seed is not None:
+            self.rng.seed(seed)
+        reset_clock = getattr(self.clock, "reset", None)
+        if reset_clock is not None:
+            reset_clock()
+        self.ticks = 0
+
+        # Grade nova a cada partida: a ordem do índice livre (e os sorteios) depende só da semente
+        size = self.width * self.height
+        self.grid = Grid(self.width, self.height)
+        # Dona de cada célula ocupada (id da cobra cuja cabeça entrou nela por último)
+        self.owner = array(CELL_INDEX, [-1]) * size
+        self.snakes = [ArenaSnake(i, self.width, self.height, self.grid)
+                       for i in range(self.players + self.bot_count)]
+        # Comida como conjunto de células: várias ao mesmo tempo, disputadas pelas cobras
+        self.clear_food()
+        for snake in self.snakes:
+            self.spawn(snake)
+        self.spawn_food()
+
+    def alive(self):
+        return [snake for snake in self.snakes if snake.alive]
+
+    def random_empty(self):
+        # Célula livre de cobras e de comida (a comida ocupa uma fração mínima do tabuleiro)
+        for _ in range(SPAWN_ATTEMPTS):
+            cell = self.grid.random_free(self.rng)
+            if cell is None:
+                return None
+            if cell not in self.food:
+                return cell
+        return None
+
+    def spawn(self, snake):
+        """Coloca a cobra em uma célula livre com as duas seguintes também livres; False se não houver"""
+        grid = self.grid
+        for _ in range(SPAWN_ATTEMPTS):
+            cell = self.random_empty()
+            if cell is None:
+                return False
+            direction = self.rng.choice(DIRECTIONS)
+            x, y = grid.position(cell)
+            dx, dy = direction.value
+            ahead = [((y + dy * i) % self.height) * self.width + (x + dx * i) % self.width for i in (1, 2)]
+            if not any(grid.snake[c] for c in ahead):
+                snake.spawn((x, y), direction, self.start_length)
+                self.owner[cell] = snake.id
+                return True
+        return False
+
+    def spawn_food(self):
+        while len(self.food) < self.food_count:
+            cell = self.random_empty()
+            if cell is None:
+                break
+            self.add_food(cell)
+
+    def clear_food(self):
+        self.food = set()
+        # Bloco -> células com comida (só os blocos não vazios)
+        self.food_buckets = {}
+
+    def food_bucket(self, cell):
+        size = self.bucket_size
+        column = min(cell % self.width // size, self.bucket_columns - 1)
+        row = min(cell // self.width // size, self.bucket_rows - 1)
+        return row * self.bucket_columns + column
+
+    def add_food(self, cell):
+        self.food.add(cell)
+        self.food_buckets.setdefault(self.food_bucket(cell), set()).add(cell)
+
+    def remove_food(self, cell):
+        self.food.discard(cell)
+        bucket = self.food_bucket(cell)
+        cells = self.food_buckets.get(bucket)
+        if cells is not None:
+            cells.discard(cell)
+            if not cells:
+                del self.food_buckets[bucket]
+
+    def step(self, actions=None):
+        """Executa um tick para todas as cobras vivas e retorna os eventos como (evento, id da cobra)
+
+        actions mapeia o id de uma cobra de jogador para a direção deste tick (sem ela, a cobra segue
+        em frente); as cobras dos bots escolhem a própria direção."""
+        advance = getattr(self.clock, "advance", None)
+        if advance is not None:
+            advance(self.move_delay)
+        self.ticks += 1
+        grid = self.grid
+        width = self.width
+        owner = self.owner
+
+        # Mover todas as cabeças antes de verificar qualquer colisão: uma cauda que sai libera a célula
+        # no mesmo tick, seja qual for a ordem das cobras
+        heads = {}
+        for snake in self.snakes:
+            if not snake.alive:
+                continue
+            if snake.id >= self.players:
+                self.steer(snake)
+            elif actions is not None and snake.id in actions and actions[snake.id] is not None:
+                snake.set_direction(actions[snake.id])
+            snake.move()
+            x, y = snake.positions[0]
+            heads.setdefault(y * width + x, []).append(snake)
+
+        events = []
+        dead = []
+        survivors = []
+        for cell, arrivals in heads.items():
+            # Segmentos na célula além das cabeças que acabaram de chegar: um corpo, o que mata todas elas
+            if grid.snake[cell] > len(arrivals):
+                body_owner = owner[cell]
+                for snake in arrivals:
+                    dead.append((snake, "self" if body_owner == snake.id else "body", body_owner))
+                continue
+            if len(arrivals) == 1:
+                survivors.append((cell, arrivals[0]))
+                continue
+            # Cabeça com cabeça: só a cobra estritamente maior sobrevive
+            arrivals.sort(key=lambda snake: len(snake.positions), reverse=True)
+            winner = arrivals[0] if len(arrivals[0].positions) > len(arrivals[1].positions) else None
+            for snake in arrivals:
+                if snake is not winner:
+                    dead.append((snake, "head", winner.id if winner is not None else -1))
+            if winner is not None:
+                survivors.append((cell, winner))
+
+        for snake, cause, killer in dead:
+            snake.die(cause)
+            snake.respawn_tick = self.ticks + self.respawn_ticks
+            if killer >= 0 and killer != snake.id:
+                self.snakes[killer].kills += 1
+            events.append(("crash", snake.id))
+
+        # A disputa pela comida já foi decidida: cada célula tem no máximo uma cabeça viva
+        for cell, snake in survivors:
+            owner[cell] = snake.id
+            if cell in self.food:
+                self.remove_food(cell)
+                snake.grow()
+                snake.score += 10
+                events.append(("eat", snake.id))
+
+        # Bots mortos renascem; jogadores dependem de quem os controla (ver respawn)
+        for snake in self.snakes:
+            if not snake.alive and snake.id >= self.players and snake.respawn_tick <= self.ticks:
+                self.spawn(snake)
+        self.spawn_food()
+        return events
+
+    def respawn(self, snake_id):
+        """Faz um jogador renascer; retorna False se não houver lugar"""
+        snake = self.snakes[snake_id]
+        return not snake.alive and self.spawn(snake)
+
+    def join(self, snake_id):
+        """Entrega a cobra de jogador snake_id a um novo participante, com o placar zerado"""
+        snake = self.snakes[snake_id]
+        snake.remove()
+        snake.score = 0
+        snake.kills = 0
+        snake.deaths = 0
+        return self.spawn(snake)
+
+    def leave(self, snake_id):
+        # A cobra de quem saiu some do tabuleiro e não renasce
+        self.snakes[snake_id].remove()
+
+    def steer(self, snake):
+        # Bot guloso: segue para a comida-alvo pelo menor caminho no toro, evitando células ocupadas
+        grid = self.grid
+        width = self.width
+        height = self.height
+        if snake.target not in self.food:
+            snake.target = self.nearest_food(snake.positions[0])
+        target = snake.target
+        head_x, head_y = snake.positions[0]
+        # Deslocamento mais curto até o alvo, com sinal (atravessando as bordas se for mais perto)
+        if target is not None:
+            to_x = (target % width - head_x + width // 2) % width - width // 2
+            to_y = (target // width - head_y + height // 2) % height - height // 2
+        else:
+            to_x = to_y = 0
+        backwards = OPPOSITE[snake.direction]
+
+        # No empate, começar de uma direção sorteada evita que todos os bots façam as mesmas curvas
+        start = int(self.rng.random() * 4)
+        best = None
+        best_key = None
+        for i in range(start, start + 4):
+            direction, dx, dy = STEPS[i % 4]
+            if direction is backwards:
+                continue
+            blocked = grid.snake[((head_y + dy) % height) * width + (head_x + dx) % width] != 0
+            key = (blocked, abs(to_x - dx) + abs(to_y - dy))
+            if best_key is None or key < best_key:
+                best = direction
+                best_key = key
+        snake.set_direction(best)
+
+    def nearest_food(self, position):
+        # Busca em anéis de blocos ao redor da cabeça, até que nenhum bloco ainda não visto possa ter
+        # comida mais perto do que a melhor encontrada
+        width = self.width
+        height = self.height
+        half_width = width // 2
+        half_height = height // 2
+        x, y = position
+        buckets = self.food_buckets
+        head_column = min(x // self.bucket_size, self.bucket_columns - 1)
+        head_row = min(y // self.bucket_size, self.bucket_rows - 1)
+        best = None
+        best_distance = width + height
+        for ring in range(max(self.bucket_columns, self.bucket_rows) // 2 + 1):
+            if (ring - 1) * self.bucket_span >= best_distance:
+                break
+            for bucket in self.bucket_ring(head_column, head_row, ring):
+                for cell in buckets.get(bucket, ()):
+                    distance = abs((cell % width - x + half_width) % width - half_width) + \
+                        abs((cell // width - y + half_height) % height - half_height)
+                    if distance < best_distance:
+                        best = cell
+                        best_distance = distance
+        return best
+
+    def bucket_ring(self, column, row, ring):
+        # Blocos na borda do quadrado de raio ring (com volta nas bordas do tabuleiro)
+        columns = self.bucket_columns
+        rows = self.bucket_rows
+        if ring == 0:
+            return (row * columns + column,)
+        offsets = [(dx, dy) for dy in (-ring, ring) for dx in range(-ring, ring + 1)]
+        offsets.extend((dx, dy) for dx in (-ring, ring) for dy in range(-ring + 1, ring))
+        return {((row + dy) % rows) * columns + (column + dx) % columns for dx, dy in offsets}
+
+    def rank(self, snake):
+        """Posição da cobra no placar da arena (1 = maior pontuação)"""
+        return 1 + sum(1 for other in self.snakes if other.score > snake.score)
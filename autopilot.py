@@ -0,0 +1,233 @@
+"""
+Piloto automático do Snake Game
+
+Planejador independente do Pygame que conduz a cobra até a comida por uma
+busca em largura sobre o tabuleiro toroidal (a cobra atravessa as bordas,
+como em Snake.move). A busca considera o tempo: uma célula do corpo pode ser
+atravessada se a cauda já a tiver liberado quando a cabeça chegar. Antes de
+seguir um caminho, o planejador simula o percurso em um clone da partida e
+só o aceita se, depois de comer, a cabeça ainda alcança a cauda; senão, a
+cobra segue a própria cauda pelo caminho mais longo disponível.
+"""
+
+import time
+from collections import deque
+
+from simulation import Direction
+
+# Direção oposta a cada direção (a cobra não pode dar meia-volta)
+OPPOSITE = {
+    Direction.RIGHT: Direction.LEFT,
+    Direction.LEFT: Direction.RIGHT,
+    Direction.UP: Direction.DOWN,
+    Direction.DOWN: Direction.UP,
+}
+
+# Células que nunca ficam livres (barreiras) recebem este "tempo de liberação"
+BLOCKED = 1 << 30
+
+# Tabelas de vizinhança por tamanho de tabuleiro: para cada célula, os vizinhos (com volta nas
+# bordas) e a direção que leva a cada um
+_neighbour_tables = {}
+
+def neighbour_table(width, height):
+    table = _neighbour_tables.get((width, height))
+    if table is None:
+        table = []
+        for cell in range(width * height):
+            x = cell % width
+            y = cell // width
+            table.append((
+                (y * width + (x + 1) % width, Direction.RIGHT),
+                (y * width + (x - 1) % width, Direction.LEFT),
+                (((y - 1) % height) * width + x, Direction.UP),
+                (((y + 1) % height) * width + x, Direction.DOWN),
+            ))
+        _neighbour_tables[(width, height)] = table
+    return table
+
+def free_times(sim):
+    """Para cada célula, o número de movimentos até ela poder receber a cabeça"""
+    positions = sim.snake.positions
+    width = sim.width
+    times = [0] * (width * sim.height)
+    for x, y in sim.barriers:
+        times[y * width + x] = BLOCKED
+
+    # O segmento i sai no (length - i)-ésimo encolhimento da cauda, que só começa após o crescimento
+    # pendente; percorrer da cauda para a cabeça deixa o maior tempo quando segmentos se sobrepõem
+    release = sim.snake.grow_pending + 1
+    for x, y in reversed(positions):
+        cell = y * width + x
+        if times[cell] < release:
+            times[cell] = release
+        release += 1
+    return times
+
+def search(sim, goal):
+    """Menor caminho (lista de células, sem a cabeça) da cabeça até goal, ou None"""
+    table = neighbour_table(sim.width, sim.height)
+    times = free_times(sim)
+    head_x, head_y = sim.snake.positions[0]
+    start = head_y * sim.width + head_x
+    backwards = OPPOSITE[sim.snake.direction]
+
+    parents = [-1] * len(table)
+    parents[start] = start
+    # No primeiro movimento, a meia-volta seria ignorada pelo jogo
+    frontier = []
+    for neighbour, direction in table[start]:
+        if direction != backwards and times[neighbour] <= 1 and parents[neighbour] < 0:
+            parents[neighbour] = start
+            frontier.append(neighbour)
+    steps = 1
+    while frontier:
+        if parents[goal] >= 0:
+            path = []
+            cell = goal
+            while cell != start:
+                path.append(cell)
+                cell = parents[cell]
+            path.reverse()
+            return path
+        steps += 1
+        next_frontier = []
+        for cell in frontier:
+            for neighbour, _ in table[cell]:
+                if parents[neighbour] < 0 and times[neighbour] <= steps:
+                    parents[neighbour] = cell
+                    next_frontier.append(neighbour)
+        frontier = next_frontier
+    return None
+
+def reachable_area(sim):
+    """Quantidade de células que a cabeça consegue alcançar (critério de último recurso)"""
+    table = neighbour_table(sim.width, sim.height)
+    times = free_times(sim)
+    head_x, head_y = sim.snake.positions[0]
+    start = head_y * sim.width + head_x
+
+    seen = bytearray(len(table))
+    seen[start] = 1
+    frontier = [start]
+    count = 0
+    steps = 0
+    while frontier:
+        steps += 1
+        next_frontier = []
+        for cell in frontier:
+            for neighbour, _ in table[cell]:
+                if not seen[neighbour] and times[neighbour] <= steps:
+                    seen[neighbour] = 1
+                    next_frontier.append(neighbour)
+        count += len(next_frontier)
+        frontier = next_frontier
+    return count
+
+def direction_between(cell, target, width, height):
+    for neighbour, direction in neighbour_table(width, height)[cell]:
+        if neighbour == target:
+            return direction
+    return None
+
+class Autopilot:
+    def __init__(self):
+        # Caminho planejado (células restantes) e o estado esperado no próximo tick para reaproveitá-lo
+        self.plan = deque()
+        self.expected = None
+        self.decisions = 0
+        self.reused = 0
+        self.elapsed = 0.0
+
+    def reset(self):
+        # Nova partida: descartar o caminho planejado (as estatísticas são mantidas)
+        self.plan = deque()
+        self.expected = None
+
+    def __call__(self, sim, rng=None):
+        # Permite usar o piloto como política do executor de simulações
+        return self.decide(sim)
+
+    @property
+    def decisions_per_second(self):
+        return self.decisions / self.elapsed if self.elapsed else 0.0
+
+    def decide(self, sim):
+        """Direção para o próximo tick (None se nenhum movimento evita a colisão)"""
+        start = time.perf_counter()
+        direction = self.plan_move(sim)
+        self.elapsed += time.perf_counter() - start
+        self.decisions += 1
+        return direction
+
+    def plan_move(self, sim):
+        # Se o tabuleiro mudou só pela cabeça e pela cauda previstas, o caminho anterior continua válido
+        if self.plan and self.state(sim) == self.expected:
+            self.reused += 1
+            return self.follow(sim)
+
+        self.plan = deque()
+        path = search(sim, sim.grid.index(sim.food.position))
+        if path is not None and self.is_safe(sim, path):
+            self.plan.extend(path)
+            return self.follow(sim)
+        return self.fallback(sim)
+
+    def state(self, sim):
+        snake = sim.snake
+        return (snake.positions[0], len(snake.positions), snake.grow_pending, sim.food.position, len(sim.barriers))
+
+    def follow(self, sim):
+        snake = sim.snake
+        head = sim.grid.index(snake.positions[0])
+        cell = self.plan.popleft()
+
+        # Estado previsto após o movimento (se a comida for comida, o plano termina aqui)
+        growing = snake.grow_pending > 0
+        self.expected = (sim.grid.position(cell), len(snake.positions) + growing, snake.grow_pending - growing,
+                         sim.food.position, len(sim.barriers))
+        return direction_between(head, cell, sim.width, sim.height)
+
+    def is_safe(self, sim, path):
+        # Percorrer o caminho em um clone e conferir se a cabeça ainda alcança a cauda depois
+        future = sim.clone()
+        width = sim.width
+        for cell in path:
+            head_x, head_y = future.snake.positions[0]
+            future.step(direction_between(head_y * width + head_x, cell, width, sim.height))
+            if future.done:
+                return False
+        return self.tail_reachable(future)
+
+    def tail_reachable(self, sim):
+        if len(sim.snake.positions) == 1:
+            return True
+        return search(sim, sim.grid.index(sim.snake.positions[-1])) is not None
+
+    def fallback(self, sim):
+        # Sem caminho seguro até a comida: entre os movimentos que mantêm a cauda alcançável, o que leva
+        # pelo caminho mais longo até ela; sem nenhum, o que deixa mais espaço livre
+        width = sim.width
+        head_x, head_y = sim.snake.positions[0]
+        head = head_y * width + head_x
+        backwards = OPPOSITE[sim.snake.direction]
+
+        best = None
+        best_score = None
+        for _, direction in neighbour_table(width, sim.height)[head]:
+            if direction == backwards:
+                continue
+            future = sim.clone()
+            future.step(direction)
+            if future.done:
+                continue
+
+            if len(future.snake.positions) == 1:
+                score = (1, 0)
+            else:
+                path = search(future, future.grid.index(future.snake.positions[-1]))
+                score = (1, len(path)) if path is not None else (0, reachable_area(future))
+            if best_score is None or score > best_score:
+                best = direction
+                best_score = score
+        return best
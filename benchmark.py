@@ -0,0 +1,400 @@
+#!/usr/bin/env python3
+"""
+Benchmarks do Snake Game
+
+Mede o custo por operação de Snake.move, das verificações de colisão, de
+Food.spawn/PowerUp.spawn, de Simulation.step, do passo do ambiente de RL, do
+tick da arena com muitas cobras, da renderização em lote para arrays NumPy
+(frame_renderer.py) e de SnakeGame.update/draw (com o driver de vídeo
+"dummy" do SDL, inclusive com a câmera em tabuleiros maiores que a janela)
+em vários tamanhos de tabuleiro e de cobra.
+Os resultados podem ser gravados em JSON e comparados com uma execução de
+referência, acusando regressões acima de um limite configurável.
+"""
+
+import argparse
+import atexit
+import json
+import os
+import platform
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+# Os benchmarks do jogo rodam sem janela
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import simulation
+from simulation import Direction, Simulation
+
+GRID_SIZES = [(20, 15), (40, 30), (80, 60)]
+# Tabuleiros maiores que a janela, desenhados pela câmera
+VIEWPORT_SIZES = [(80, 60), (400, 300)]
+SNAKE_LENGTHS = [4, 64, 512]
+# Arena: número de bots e comprimentos iniciais (o custo do tick não deve crescer com os corpos)
+ARENA_SIZES = [(200, 150), (400, 300)]
+ARENA_BOTS = 100
+ARENA_LENGTHS = [4, 64]
+# Quadros por chamada nos benchmarks de renderização em lote
+FRAME_BATCH = 64
+
+def hamiltonian_cycle(width, height):
+    """Células de um ciclo que passa uma vez por cada célula do tabuleiro (em zigue-zague)"""
+    cells = []
+    if height % 2 == 0:
+        for y in range(height):
+            xs = range(width) if y % 2 == 0 else range(width - 1, -1, -1)
+            cells.extend((x, y) for x in xs)
+    else:
+        # Com altura ímpar, o zigue-zague é feito por colunas (a largura precisa ser par)
+        for x in range(width):
+            ys = range(height) if x % 2 == 0 else range(height - 1, -1, -1)
+            cells.extend((x, y) for y in ys)
+    return cells
+
+def cycle_directions(cycle, width, height):
+    """Direção que leva de cada célula do ciclo à seguinte (com volta nas bordas)"""
+    directions = {}
+    for i, (x, y) in enumerate(cycle):
+        next_x, next_y = cycle[(i + 1) % len(cycle)]
+        dx = (next_x - x + 1) % width - 1
+        dy = (next_y - y + 1) % height - 1
+        directions[(x, y)] = Direction((dx, dy))
+    return directions
+
+def place_snake(snake, cycle, directions, length):
+    """Coloca a cobra sobre as primeiras células do ciclo, com a cabeça à frente"""
+    snake.reset()
+    snake.grid.vacate(snake.positions[0])
+    snake.positions.clear()
+    for position in reversed(cycle[:length]):
+        snake.positions.append(position)
+        snake.grid.occupy(position)
+    head = snake.positions[0]
+    snake.direction = snake.next_direction = directions[head]
+
+def measure(operation, min_time, repeat):
+    """Menor tempo médio por chamada (em segundos) entre várias rodadas de pelo menos min_time"""
+    count = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(count):
+            operation()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time / 10:
+            break
+        count *= 2
+    count = max(1, int(count * min_time / max(elapsed, 1e-9)))
+
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(count):
+            operation()
+        per_call = (time.perf_counter() - start) / count
+        best = per_call if best is None else min(best, per_call)
+    return best, count
+
+def bench_snake_move(width, height, length):
+    snake = simulation.Snake(width, height)
+    cycle = hamiltonian_cycle(width, height)
+    directions = cycle_directions(cycle, width, height)
+    place_snake(snake, cycle, directions, length)
+
+    def operation():
+        snake.next_direction = directions[snake.positions[0]]
+        snake.move()
+    return operation
+
+def bench_collisions(width, height, length):
+    snake = simulation.Snake(width, height)
+    cycle = hamiltonian_cycle(width, height)
+    place_snake(snake, cycle, cycle_directions(cycle, width, height), length)
+    # Algumas barreiras fora da cobra
+    for position in cycle[length:length + 10]:
+        snake.grid.add_barrier(position)
+
+    def operation():
+        snake.check_collision_with_self()
+        snake.check_collision_with_walls(True)
+        snake.check_collision_with_barriers()
+    return operation
+
+def bench_food_spawn(width, height, length):
+    snake = simulation.Snake(width, height)
+    cycle = hamiltonian_cycle(width, height)
+    place_snake(snake, cycle, cycle_directions(cycle, width, height), length)
+    food = simulation.Food(width, height)
+    rng = random.Random(0)
+
+    def operation():
+        food.spawn(rng, snake.grid)
+    return operation
+
+def bench_power_up_spawn(width, height, length):
+    snake = simulation.Snake(width, height)
+    cycle = hamiltonian_cycle(width, height)
+    place_snake(snake, cycle, cycle_directions(cycle, width, height), length)
+    food = simulation.Food(width, height)
+    rng = random.Random(0)
+    food.spawn(rng, snake.grid)
+    power_up = simulation.PowerUp(width, height)
+
+    def operation():
+        power_up.spawn(rng, 0, snake.grid, food.position)
+    return operation
+
+def prepare_simulation(sim, length):
+    """Deixa a simulação percorrendo o ciclo para sempre: sem power-ups e com a comida atrás da cauda"""
+    cycle = hamiltonian_cycle(sim.width, sim.height)
+    directions = cycle_directions(cycle, sim.width, sim.height)
+    sim.power_up_delay = float("inf")
+    place_snake(sim.snake, cycle, directions, length)
+    sim.food.position = cycle[-1]
+    return directions
+
+def bench_simulation_step(width, height, length):
+    sim = Simulation(width=width, height=height, seed=0)
+    directions = prepare_simulation(sim, length)
+    snake = sim.snake
+    food = sim.food
+
+    def operation():
+        sim.step(directions[snake.positions[0]])
+        food.position = snake.vacated[0]
+    return operation
+
+def bench_env_step(width, height, length):
+    # Passo do ambiente de RL: a simulação mais a atualização da observação (que não deve crescer com o
+    # tabuleiro nem com a cobra)
+    from snake_env import SnakeEnv
+    env = SnakeEnv(width=width, height=height, seed=0)
+    sim = env.sim
+    directions = prepare_simulation(sim, length)
+    env.sync()
+    actions = {position: simulation.DIRECTIONS.index(direction) for position, direction in directions.items()}
+    snake = sim.snake
+    food = sim.food
+
+    def operation():
+        env.step(actions[snake.positions[0]])
+        food.position = snake.vacated[0]
+    return operation
+
+def bench_arena_step(width, height, length):
+    from arena import Arena
+    arena = Arena(width, height, bots=ARENA_BOTS, players=0, start_length=length, seed=0)
+    return arena.step
+
+def bench_arena_delta(width, height, length):
+    # Tick da arena mais o delta transmitido; a diferença para arena_step é o custo da codificação
+    from arena import Arena
+    from state_codec import StateEncoder
+    arena = Arena(width, height, bots=ARENA_BOTS, players=0, start_length=length, seed=0)
+    encoder = StateEncoder(arena)
+
+    def tick():
+        arena.step()
+        encoder.delta()
+    return tick
+
+def bench_frame_batch(width, height, length):
+    # Lote de FRAME_BATCH quadros em resolução cheia (sprites e HUD), no mesmo array a cada chamada
+    from frame_renderer import FrameRenderer
+    return batch_renderer(FrameRenderer(width, height), width, height, length)
+
+def bench_cell_batch(width, height, length):
+    # O mesmo lote com um pixel por célula, escrito direto a partir das grades
+    from frame_renderer import CellRenderer
+    return batch_renderer(CellRenderer(width, height), width, height, length)
+
+def batch_renderer(renderer, width, height, length):
+    sim = Simulation(width=width, height=height, seed=0)
+    prepare_simulation(sim, length)
+    states = [sim] * FRAME_BATCH
+    out = renderer.new_batch(FRAME_BATCH)
+
+    def operation():
+        renderer.render_batch(states, out)
+    return operation
+
+# Diretório temporário e gravador próprios dos jogos do benchmark (criados no primeiro jogo)
+_game_files = None
+
+def game_files():
+    """Nada do benchmark deve tocar nos arquivos do jogo: configurações, recordes e replays vão para um
+    diretório temporário, removido na saída"""
+    global _game_files
+    if _game_files is None:
+        import persistence
+
+        directory = tempfile.mkdtemp(prefix="snake_benchmark_")
+        # Registrado antes do gravador, para ser removido depois que ele terminar (atexit roda na ordem inversa)
+        atexit.register(shutil.rmtree, directory, True)
+        _game_files = (directory, persistence.BackgroundWriter())
+    return _game_files
+
+def new_game(length, dirty_rects=False, board_size=None):
+    import snake_game
+
+    directory, writer = game_files()
+    settings = snake_game.GameSettings(writer, directory)
+    settings.sound_enabled = False
+    game = snake_game.SnakeGame(dirty_rects=dirty_rects, board_size=board_size, settings=settings)
+    game.replays_dir = directory
+    game.state = snake_game.GameState.PLAYING
+    game.reset_game()
+    directions = prepare_simulation(game.sim, length)
+
+    # Relógio do escalonador parado e acumulador preenchido à mão: cada update executa exatamente um tick
+    game.scheduler.clock = lambda: 0.0
+
+    def tick():
+        game.scheduler.accumulator = game.sim.move_delay
+        game.snake.set_direction(directions[game.snake.positions[0]])
+        game.update()
+        game.food.position = game.snake.vacated[0]
+    return game, tick
+
+def bench_game_update(width, height, length):
+    game, tick = new_game(length)
+    return tick
+
+def bench_game_draw(width, height, length):
+    game, _ = new_game(length)
+    return game.draw
+
+def bench_game_draw_viewport(width, height, length):
+    # Só as células visíveis são desenhadas: o custo não deve crescer com o tabuleiro
+    game, _ = new_game(length, board_size=(width, height))
+    return game.draw
+
+def bench_game_frame_dirty(width, height, length):
+    # Um tick seguido de um quadro com o renderizador de retângulos sujos
+    game, tick = new_game(length, dirty_rects=True)
+
+    def operation():
+        tick()
+        game.draw()
+    return operation
+
+def game_grid():
+    import snake_game
+    return [(snake_game.GRID_WIDTH, snake_game.GRID_HEIGHT)]
+
+# nome -> (fábrica da operação, tamanhos de tabuleiro[, comprimentos da cobra])
+BENCHMARKS = {
+    "snake_move": (bench_snake_move, lambda: GRID_SIZES),
+    "collisions": (bench_collisions, lambda: GRID_SIZES),
+    "food_spawn": (bench_food_spawn, lambda: GRID_SIZES),
+    "power_up_spawn": (bench_power_up_spawn, lambda: GRID_SIZES),
+    "simulation_step": (bench_simulation_step, lambda: GRID_SIZES),
+    "env_step": (bench_env_step, lambda: GRID_SIZES),
+    "arena_step": (bench_arena_step, lambda: ARENA_SIZES, ARENA_LENGTHS),
+    "arena_delta": (bench_arena_delta, lambda: ARENA_SIZES, ARENA_LENGTHS),
+    "frame_batch": (bench_frame_batch, lambda: GRID_SIZES),
+    "cell_batch": (bench_cell_batch, lambda: GRID_SIZES),
+    # O SnakeGame tem o tabuleiro fixo da janela
+    "game_update": (bench_game_update, game_grid),
+    "game_draw": (bench_game_draw, game_grid),
+    "game_frame_dirty": (bench_game_frame_dirty, game_grid),
+    "game_draw_viewport": (bench_game_draw_viewport, lambda: VIEWPORT_SIZES),
+}
+
+def run(selected, min_time, repeat):
+    results = {}
+    for name, (factory, grid_sizes, *lengths) in BENCHMARKS.items():
+        if selected and not any(pattern in name for pattern in selected):
+            continue
+        for width, height in grid_sizes():
+            for length in (lengths[0] if lengths else SNAKE_LENGTHS):
+                # A cobra ocupa no máximo metade do tabuleiro
+                if length > width * height // 2:
+                    continue
+                key = f"{name}[{width}x{height},len={length}]"
+                seconds, count = measure(factory(width, height, length), min_time, repeat)
+                results[key] = {"us_per_op": seconds * 1e6, "ops_per_second": 1 / seconds, "calls": count}
+                print(f"{key:<40} {seconds * 1e6:>12.3f} us/op {1 / seconds:>14.0f} op/s", flush=True)
+    return results
+
+def metadata():
+    info = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "date": int(time.time()),
+    }
+    try:
+        import pygame
+        info["pygame"] = pygame.version.ver
+    except ImportError:
+        pass
+    return info
+
+def threshold_for(name, default, overrides):
+    # A regra mais específica (prefixo mais longo) vence
+    best = None
+    for prefix, value in overrides:
+        if name.startswith(prefix) and (best is None or len(prefix) > len(best[0])):
+            best = (prefix, value)
+    return best[1] if best else default
+
+def compare(results, baseline, default_threshold, overrides):
+    """Compara com a referência; retorna a lista de benchmarks que regrediram"""
+    regressions = []
+    print(f"\n{'Benchmark':<40} {'Referência':>12} {'Atual':>12} {'Variação':>9}  Limite")
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        before = baseline[name]["us_per_op"]
+        after = result["us_per_op"]
+        change = after / before - 1
+        limit = threshold_for(name, default_threshold, overrides)
+        regressed = change > limit
+        if regressed:
+            regressions.append(name)
+        print(f"{name:<40} {before:>12.3f} {after:>12.3f} {change * 100:>+8.1f}%  {limit * 100:.0f}%"
+              f"{'  REGRESSÃO' if regressed else ''}")
+    return regressions
+
+def parse_override(value):
+    prefix, _, fraction = value.partition("=")
+    try:
+        return prefix, float(fraction)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"use PREFIXO=FRAÇÃO, por exemplo game_draw=0.25 (recebido {value!r})")
+
+def main():
+    """Função principal dos benchmarks"""
+    parser = argparse.ArgumentParser(description="Benchmarks do Snake Game")
+    parser.add_argument("filter", nargs="*", help="roda só os benchmarks cujo nome contém um destes textos")
+    parser.add_argument("--min-time", type=float, default=0.2, help="duração mínima de cada rodada (s)")
+    parser.add_argument("--repeat", type=int, default=5, help="rodadas por benchmark (vale a melhor)")
+    parser.add_argument("--output", help="grava os resultados em JSON")
+    parser.add_argument("--baseline", help="JSON de referência para comparar")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="piora relativa tolerada antes de acusar regressão (0.10 = 10%%)")
+    parser.add_argument("--threshold-for", type=parse_override, action="append", default=[],
+                        metavar="PREFIXO=FRAÇÃO", help="limite específico para benchmarks com o prefixo dado")
+    args = parser.parse_args()
+
+    results = run(args.filter, args.min_time, args.repeat)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"metadata": metadata(), "results": results}, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, "r") as f:
+            baseline = json.load(f)["results"]
+        regressions = compare(results, baseline, args.threshold, args.threshold_for)
+        if regressions:
+            print(f"\n{len(regressions)} regressão(ões) acima do limite.")
+            sys.exit(1)
+        print("\nNenhuma regressão acima do limite.")
+
+if __name__ == "__main__":
+    main()
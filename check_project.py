@@ -57,28 +57,11 @@ def check_assets():
     else:
         print(f"✓ Diretório {assets_dir} encontrado.")
     
-    # Verificar sons
-    sound_files = ["eat.wav", "crash.wav", "powerup.wav"]
-    missing_sounds = False
-    
-    for sound in sound_files:
-        sound_path = os.path.join(assets_dir, sound)
-        if os.path.exists(sound_path):
-            print(f"✓ Som {sound} encontrado.")
-        else:
-            print(f"✗ Som {sound} não encontrado!")
-            missing_sounds = True
-    
-    if missing_sounds:
-        print("\nGerando arquivos de som faltantes...")
-        try:
-            if os.path.exists("generate_sounds.py"):
-                subprocess.call([sys.executable, "generate_sounds.py"])
-                print("✓ Sons gerados com sucesso!")
-            else:
-                print("✗ Script generate_sounds.py não encontrado!")
-        except Exception as e:
-            print(f"✗ Erro ao gerar sons: {e}")
+    # Os sons são sintetizados na memória pelo sound_bank.py; os WAVs são só uma exportação opcional
+    if os.path.exists("sound_bank.py"):
+        print("✓ Banco de sons sound_bank.py encontrado.")
+    else:
+        print("✗ Banco de sons sound_bank.py não encontrado!")
 
 def generate_screenshot():
     """Gera uma nova captura de tela do jogo"""
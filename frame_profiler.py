@@ -0,0 +1,168 @@
+"""
+Medição do tempo de cada quadro do Snake Game
+
+Registra o tempo de cada fase do laço principal (eventos, update, desenho) e
+das subfases do desenho (grade, itens, cobra, HUD, envio à tela) em janelas
+circulares dos últimos quadros, de onde saem p50/p95/p99, além de um
+histograma acumulado da sessão inteira e da contagem de quadros longos. Os
+resultados podem ser exportados em CSV ou JSON. Com a medição desligada, o
+jogo não chama nada deste módulo.
+"""
+
+import bisect
+import csv
+import json
+import math
+import time
+from array import array
+
+# Limites superiores (ms) das faixas do histograma acumulado; a última faixa não tem limite
+HISTOGRAM_EDGES = [0.25, 0.5, 1, 2, 4, 8, 12, 16.7, 25, 33.3, 50, 100, 250]
+
+PERCENTILES = (0.50, 0.95, 0.99)
+
+# Estatísticas de uma fase: janela circular dos últimos tempos e histograma de todos eles
+class PhaseStats:
+    def __init__(self, window):
+        self.samples = array("d", [0.0]) * window
+        self.index = 0
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.histogram = [0] * (len(HISTOGRAM_EDGES) + 1)
+
+    def add(self, ms):
+        self.samples[self.index] = ms
+        self.index = (self.index + 1) % len(self.samples)
+        self.count += 1
+        self.total += ms
+        if ms > self.max:
+            self.max = ms
+        self.histogram[bisect.bisect_left(HISTOGRAM_EDGES, ms)] += 1
+
+    def window(self):
+        # Tempos ainda na janela (sem os espaços vazios do começo)
+        return self.samples[:min(self.count, len(self.samples))]
+
+    def percentiles(self):
+        """p50, p95 e p99 (ms) da janela, pelo método do posto mais próximo"""
+        values = sorted(self.window())
+        if not values:
+            return (0.0,) * len(PERCENTILES)
+        return tuple(values[max(0, math.ceil(q * len(values)) - 1)] for q in PERCENTILES)
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else 0.0
+
+class FrameProfiler:
+    def __init__(self, fps=60, window=600, long_frame_ms=None, clock=time.perf_counter, output=None):
+        self.clock = clock
+        self.window = window
+        # Quadro longo: trabalho (eventos + update + desenho) acima do orçamento de um quadro
+        self.long_frame_ms = long_frame_ms if long_frame_ms is not None else 1000 / fps
+        self.long_frames = 0
+        self.frames = 0
+        # Arquivo (.csv ou .json) gravado por finish(); None para apenas imprimir o resumo
+        self.output = output
+        # Fases na ordem em que apareceram (as subfases do desenho têm o prefixo "desenho/")
+        self.phases = {}
+        self.frame_start = None
+        self.phase_start = None
+        self.sub_start = None
+
+    def stats(self, phase):
+        stats = self.phases.get(phase)
+        if stats is None:
+            stats = self.phases[phase] = PhaseStats(self.window)
+        return stats
+
+    def begin_frame(self):
+        now = self.clock()
+        # Intervalo entre o início de dois quadros, incluindo a espera pelo próximo
+        if self.frame_start is not None:
+            self.stats("intervalo").add((now - self.frame_start) * 1000)
+        self.frame_start = self.phase_start = self.sub_start = now
+
+    def end_phase(self, phase):
+        """Encerra uma fase do laço principal iniciada no fim da fase anterior"""
+        now = self.clock()
+        self.stats(phase).add((now - self.phase_start) * 1000)
+        self.phase_start = self.sub_start = now
+
+    def mark(self, phase):
+        """Encerra uma subfase do desenho iniciada na marca anterior"""
+        now = self.clock()
+        self.stats("desenho/" + phase).add((now - self.sub_start) * 1000)
+        self.sub_start = now
+
+    def end_frame(self):
+        work = (self.clock() - self.frame_start) * 1000
+        self.stats("trabalho").add(work)
+        self.frames += 1
+        if work > self.long_frame_ms:
+            self.long_frames += 1
+
+    def ordered_phases(self):
+        # Fases na ordem em que apareceram, com as subfases logo depois da fase a que pertencem
+        order = {}
+        for phase in self.phases:
+            order.setdefault(phase.split("/", 1)[0], len(order))
+        return sorted(self.phases, key=lambda phase: (order[phase.split("/", 1)[0]], "/" in phase))
+
+    def summary(self):
+        """Linhas (fase, quadros, média, p50, p95, p99, máximo) em ms"""
+        rows = []
+        for phase in self.ordered_phases():
+            stats = self.phases[phase]
+            rows.append((phase, stats.count, stats.mean, *stats.percentiles(), stats.max))
+        return rows
+
+    def save(self, path):
+        # O formato segue a extensão do arquivo
+        if path.lower().endswith(".json"):
+            data = {
+                "frames": self.frames,
+                "long_frames": self.long_frames,
+                "long_frame_ms": self.long_frame_ms,
+                "window": self.window,
+                "histogram_edges_ms": HISTOGRAM_EDGES,
+                "phases": {
+                    phase: {
+                        "count": stats.count,
+                        "mean_ms": stats.mean,
+                        "p50_ms": p50,
+                        "p95_ms": p95,
+                        "p99_ms": p99,
+                        "max_ms": stats.max,
+                        "histogram": stats.histogram,
+                    }
+                    for phase in self.ordered_phases()
+                    for stats in [self.phases[phase]]
+                    for p50, p95, p99 in [stats.percentiles()]
+                },
+            }
+            with open(path, "w") as f:
+                json.dump(data, f, indent=2)
+        else:
+            with open(path, "w", newline="") as f:
+                writer = csv.writer(f)
+                writer.writerow(["phase", "count", "mean_ms", "p50_ms", "p95_ms", "p99_ms", "max_ms"])
+                for phase, count, *times in self.summary():
+                    writer.writerow([phase, count] + [f"{value:.4f}" for value in times])
+
+    def report(self):
+        print(f"\nTempo por quadro (ms, últimos {self.window} quadros):")
+        print(f"  {'fase':<26} {'média':>7} {'p50':>7} {'p95':>7} {'p99':>7} {'máx':>8}")
+        for phase, count, mean, p50, p95, p99, maximum in self.summary():
+            print(f"  {phase:<26} {mean:7.2f} {p50:7.2f} {p95:7.2f} {p99:7.2f} {maximum:8.2f}")
+        print(f"  Quadros longos (> {self.long_frame_ms:.1f} ms): {self.long_frames} de {self.frames}")
+
+    def finish(self):
+        # Chamado ao sair do jogo: resumo no terminal e, se pedido, o arquivo de resultados
+        self.report()
+        if self.output:
+            try:
+                self.save(self.output)
+            except OSError as e:
+                print(f"Não foi possível salvar as medições de quadro: {e}")
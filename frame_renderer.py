@@ -0,0 +1,299 @@
+#!/usr/bin/env python3
+"""
+Renderização sem janela do Snake Game para arrays NumPy
+
+Desenha estados de partidas (simulation.Simulation ou snapshots dela) como o
+SnakeGame os mostra durante o jogo (grade, barreiras, comida, power-up, cobra
+e HUD), com o driver de vídeo "dummy" do SDL, para gerar conjuntos de dados e
+miniaturas em lote. Cada superfície do Pygame é criada sobre a memória de um
+array NumPy (pygame.image.frombuffer): o quadro desenhado já é o array, sem
+cópia e sem a ordem (largura, altura) do pygame.surfarray. render_batch
+desenha muitos estados de uma vez em um array (N, altura, largura, 3), que
+pode ser reaproveitado entre as chamadas.
+
+Em resoluções reduzidas, como um pixel por célula, o CellRenderer pinta cada
+célula com uma cor direto no array a partir das grades de ocupação da
+simulação, em vez de reduzir um quadro desenhado em resolução cheia.
+"""
+
+import argparse
+import os
+import sys
+import time
+from itertools import islice
+
+# Sem janela: o driver precisa ser escolhido antes de o snake_game inicializar o display
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import numpy as np
+import pygame
+
+from simulation import POWER_UP_TYPES, Simulation
+from snake_game import GRID_SIZE, AssetManager, Colors, PowerUp, SnakeGame, SpriteAtlas
+from replay import Replay
+
+# Abaixo deste tamanho de célula os sprites perdem os detalhes (olhos, contador): uma cor por célula
+MIN_SPRITE_CELL = 10
+# Quadros desenhados por chamada de render_batch na linha de comando
+BATCH_SIZE = 256
+
+# Índices da paleta do CellRenderer (os power-ups vêm em seguida, na ordem de POWER_UP_TYPES)
+LIGHT, DARK, BARRIER, BODY, HEAD, FOOD, POWER_UP = range(7)
+
+# Base dos renderizadores: estados em lote, snapshots e validação do array de saída
+class BatchRenderer:
+    channels = 3
+
+    def __init__(self, width, height, scale):
+        self.width = width
+        self.height = height
+        self.frame_shape = (height * scale, width * scale, self.channels)
+        # Simulação onde os snapshots são restaurados antes de desenhar
+        self.scratch = None
+
+    def new_batch(self, count):
+        """Array para count quadros, que pode ser passado como out em várias chamadas de render_batch"""
+        return np.empty((count,) + self.frame_shape, dtype=np.uint8)
+
+    def simulation(self, state):
+        if isinstance(state, (bytes, bytearray, memoryview)):
+            if self.scratch is None:
+                self.scratch = Simulation(width=self.width, height=self.height)
+            self.scratch.restore(state)
+            return self.scratch
+        return state
+
+    def check(self, out):
+        if out.dtype != np.uint8 or out.shape[1:] != self.frame_shape or not out.flags.c_contiguous:
+            raise ValueError(f"o array de saída precisa ser uint8 contíguo com forma (N, {self.frame_shape[0]}, "
+                             f"{self.frame_shape[1]}, {self.channels}) (ver new_batch)")
+
+    def rgb(self, frames):
+        return frames
+
+    def render_batch(self, states, out=None):
+        """Desenha os estados e retorna os quadros como (N, altura, largura, 3) em RGB
+
+        Sem out, os quadros vão para um array novo; com out (de new_batch), ele é reaproveitado e
+        states pode ser um gerador, que avança uma simulação entre um quadro e outro."""
+        if out is None:
+            states = list(states)
+            out = self.new_batch(len(states))
+        self.check(out)
+        count = 0
+        for state in states:
+            if count == len(out):
+                raise ValueError(f"mais estados do que os {len(out)} quadros do array de saída")
+            self.draw(self.simulation(state), out[count])
+            count += 1
+        return self.rgb(out[:count])
+
+# Quadros com os sprites do jogo: o fundo da grade é copiado e o resto desenhado por cima, como na tela
+class FrameRenderer(BatchRenderer):
+    # RGBX: o SDL desenha 32 bits por pixel; o quarto byte fica de fora da visão RGB retornada
+    channels = 4
+
+    def __init__(self, width, height, cell_size=GRID_SIZE, grid_enabled=True, hud=True):
+        if cell_size < MIN_SPRITE_CELL:
+            raise ValueError(f"células menores que {MIN_SPRITE_CELL} pixels devem usar o CellRenderer")
+        super().__init__(width, height, cell_size)
+        self.cell_size = cell_size
+        self.size = (width * cell_size, height * cell_size)
+
+        # Quadro de render(), reaproveitado a cada chamada; sua superfície também dá o formato dos sprites
+        self.buffer = np.empty(self.frame_shape, dtype=np.uint8)
+        self.surface = self.wrap(self.buffer)
+        self.sprites = SpriteAtlas(cell_size, target=self.surface)
+        # Só as fontes e o cache de textos do HUD
+        self.assets = AssetManager() if hud else None
+
+        self.background = np.empty(self.frame_shape, dtype=np.uint8)
+        background = self.wrap(self.background)
+        background.fill(Colors.BACKGROUND)
+        if grid_enabled:
+            for x in range(width):
+                for y in range(height):
+                    color = Colors.GRID_LIGHT if (x + y) % 2 == 0 else Colors.GRID_DARK
+                    background.fill(color, (x * cell_size, y * cell_size, cell_size, cell_size))
+
+    def wrap(self, frame):
+        # Superfície que desenha direto na memória do array (altura, largura, 4)
+        return pygame.image.frombuffer(frame, self.size, "RGBX")
+
+    def rgb(self, frames):
+        return frames[..., :3]
+
+    def render(self, state):
+        """Desenha um estado e retorna o quadro (altura, largura, 3) em RGB; o array é reaproveitado
+        na próxima chamada (copie-o para guardar)"""
+        self.draw(self.simulation(state), self.buffer, self.surface)
+        return self.buffer[..., :3]
+
+    def draw(self, sim, frame, surface=None):
+        surface = surface if surface is not None else self.wrap(frame)
+        np.copyto(frame, self.background)
+        size = self.cell_size
+        sprites = self.sprites
+        now = sim.clock()
+
+        for x, y in sim.barriers:
+            surface.fill(Colors.GREY, (x * size, y * size, size, size))
+
+        # Comida, power-up e a cobra (cabeça primeiro, como em Snake.draw) em um único lote de blits
+        sheet, area = sprites.food
+        x, y = sim.food.position
+        blits = [(sheet, (x * size, y * size), area)]
+        power_up = sim.power_up
+        if power_up.active:
+            (sheet, area), (timer_sheet, timer_area) = sprites.power_up_frames(
+                power_up.type, now - power_up.spawn_time, power_up.duration)
+            x, y = power_up.position
+            blits.append((sheet, (x * size, y * size), area))
+            blits.append((timer_sheet, (x * size, y * size), timer_area))
+
+        snake = sim.snake
+        pulse = SpriteAtlas.pulse_frame(now) if snake.is_invincible else -1
+        body, heads = sprites.snake(Colors.GREEN, Colors.DARK_GREEN)
+        sheet, area = heads[snake.direction][pulse]
+        x, y = snake.positions[0]
+        blits.append((sheet, (x * size, y * size), area))
+        sheet, area = body[pulse]
+        blits.extend((sheet, (x * size, y * size), area) for x, y in islice(snake.positions, 1, None))
+        surface.blits(blits, False)
+
+        if self.assets is not None:
+            for _, text, position in SnakeGame.simulation_hud_items(self.assets, sim, self.size[0]):
+                surface.blit(text, position)
+
+# Uma cor por célula, escrita direto no array: miniaturas e observações em pixels a partir das grades
+# de ocupação, com scale pixels por célula
+class CellRenderer(BatchRenderer):
+    def __init__(self, width, height, scale=1, grid_enabled=True):
+        super().__init__(width, height, scale)
+        self.scale = scale
+        self.palette = np.array([Colors.GRID_LIGHT, Colors.GRID_DARK, Colors.GREY, Colors.GREEN,
+                                 Colors.DARK_GREEN, Colors.RED] +
+                                [PowerUp.color_for_type(power_up_type) for power_up_type in POWER_UP_TYPES],
+                                dtype=np.uint8)
+        if not grid_enabled:
+            self.palette[LIGHT] = self.palette[DARK] = Colors.BACKGROUND
+        # Índice da paleta de cada célula (y * largura + x), refeito a cada quadro a partir do xadrez
+        cells = np.arange(width * height)
+        self.background = ((cells % width + cells // width) % 2).astype(np.uint8)
+        self.codes = np.empty(width * height, dtype=np.uint8)
+
+    def render(self, state):
+        """Desenha um estado em um quadro novo (altura * scale, largura * scale, 3) em RGB"""
+        return self.render_batch([state])[0]
+
+    def draw(self, sim, frame):
+        codes = self.codes
+        width = self.width
+        grid = sim.grid
+        np.copyto(codes, self.background)
+        np.putmask(codes, np.frombuffer(grid.barriers, dtype=np.uint8), BARRIER)
+
+        x, y = sim.food.position
+        codes[y * width + x] = FOOD
+        power_up = sim.power_up
+        if power_up.active:
+            x, y = power_up.position
+            codes[y * width + x] = POWER_UP + POWER_UP_TYPES.index(power_up.type)
+        # A cobra por cima dos itens, como na tela
+        np.putmask(codes, np.frombuffer(grid.snake, dtype=np.uint8), BODY)
+        x, y = sim.snake.positions[0]
+        codes[y * width + x] = HEAD
+
+        scale = self.scale
+        if scale == 1:
+            np.take(self.palette, codes, axis=0, out=frame.reshape(-1, 3))
+        else:
+            # Cada célula vira um bloco scale x scale: uma linha de pixels por linha de células, repetida
+            # scale vezes por broadcasting (sem redimensionar um quadro)
+            row = np.take(self.palette, np.repeat(codes.reshape(self.height, width), scale, axis=1), axis=0)
+            frame.reshape(self.height, scale, width * scale, 3)[:] = row[:, None]
+
+def new_renderer(width, height, cell_size=GRID_SIZE, grid_enabled=True, hud=True):
+    """FrameRenderer com os sprites do jogo ou, em células pequenas demais para eles, CellRenderer"""
+    if cell_size < MIN_SPRITE_CELL:
+        return CellRenderer(width, height, cell_size, grid_enabled)
+    return FrameRenderer(width, height, cell_size, grid_enabled, hud)
+
+def replay_states(replay, every=1):
+    """A simulação de um replay a cada `every` ticks, do início até a morte (sempre o mesmo objeto)"""
+    sim = replay.new_simulation()
+    yield sim
+    for action in replay.actions():
+        sim.step(action)
+        if sim.ticks % every == 0 or sim.done:
+            yield sim
+
+def repeated_frames(frames, previous=None):
+    """Quantos quadros são iguais ao anterior (previous é o último quadro do lote anterior)"""
+    count = 0
+    for frame in frames:
+        if previous is not None and np.array_equal(frame, previous):
+            count += 1
+        previous = frame
+    return count
+
+def main():
+    """Desenha as partidas gravadas em replays como quadros em arquivos .npy"""
+    parser = argparse.ArgumentParser(description="Renderiza replays do Snake Game em arrays NumPy, sem janela")
+    parser.add_argument("replays", nargs="+", help="arquivos de replay")
+    parser.add_argument("--cell-size", type=int, default=GRID_SIZE,
+                        help=f"pixels por célula (abaixo de {MIN_SPRITE_CELL}, uma cor por célula)")
+    parser.add_argument("--every", type=int, default=1, help="um quadro a cada N ticks")
+    parser.add_argument("--no-grid", action="store_true", help="fundo liso, sem o xadrez da grade")
+    parser.add_argument("--no-hud", action="store_true", help="sem os textos de pontos, nível e efeitos")
+    args = parser.parse_args()
+    if args.cell_size < 1 or args.every < 1:
+        parser.error("--cell-size e --every precisam ser positivos")
+
+    failures = 0
+    for path in args.replays:
+        try:
+            replay = Replay.load(path)
+        except (OSError, ValueError) as e:
+            print(f"{path}: {e}")
+            failures += 1
+            continue
+
+        renderer = new_renderer(replay.width, replay.height, args.cell_size, not args.no_grid, not args.no_hud)
+        # Quadro inicial, um a cada `every` ticks e o da morte
+        count = 1 + replay.ticks // args.every + (replay.ticks % args.every != 0)
+        out_path = os.path.splitext(path)[0] + ".npy"
+        frames = np.lib.format.open_memmap(out_path, mode="w+", dtype=np.uint8,
+                                           shape=(count,) + renderer.frame_shape[:2] + (3,))
+        batch = renderer.new_batch(min(BATCH_SIZE, count))
+        states = replay_states(replay, args.every)
+
+        # O gerador avança a simulação dentro de render_batch: cada estado é desenhado antes do tick seguinte
+        # (o tempo medido inclui os ticks do replay, mas não a escrita no disco)
+        elapsed = 0.0
+        written = 0
+        repeated = 0
+        previous = None
+        while written < count:
+            start = time.perf_counter()
+            rendered = renderer.render_batch(islice(states, min(len(batch), count - written)), batch)
+            elapsed += time.perf_counter() - start
+            if not len(rendered):
+                break
+            frames[written:written + len(rendered)] = rendered
+            repeated += repeated_frames(rendered, previous)
+            previous = rendered[-1].copy()
+            written += len(rendered)
+        frames.flush()
+        del frames
+
+        print(f"{path}: {written} quadros {renderer.frame_shape[1]}x{renderer.frame_shape[0]} em {out_path} "
+              f"({written / max(elapsed, 1e-9):.0f} quadros/s)")
+        if repeated:
+            print(f"  {repeated} quadros iguais ao anterior: a cobra anda a cada tick, os estados se repetiram")
+            failures += 1
+
+    sys.exit(1 if failures else 0)
+
+if __name__ == "__main__":
+    main()
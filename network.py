@@ -0,0 +1,380 @@
+"""
+Modo multijogador em rede do Snake Game
+
+Um servidor asyncio autoritativo roda a arena (arena.py) em um tick fixo e
+atende centenas de conexões em uma única thread. Os clientes mandam apenas
+direções; o servidor aplica cada uma na hora (como uma tecla no jogo local,
+então várias entre dois ticks se resumem à última válida) e descarta as que
+passarem do limite por tick. A cada tick o estado vira um delta
+(state_codec.py) codificado uma única vez e entregue a todos em uma só
+escrita por conexão. Um cliente que não lê (buffer de saída cheio) perde os
+quadros em vez de atrasar o tick, e é desconectado se continuar assim; como
+um delta só vale sobre o anterior, quem perdeu um quadro (ou acabou de
+entrar) recebe um quadro-chave assim que voltar a ter espaço. Espectadores
+recebem o mesmo fluxo sem controlar nenhuma cobra, e o servidor pode gravá-lo
+em arquivo.
+
+Cada mensagem é um quadro com o tamanho do conteúdo e o tipo. Há também um
+cliente para o SnakeGame (a rede roda em uma thread própria) e clientes
+roteirizados para testar o servidor em localhost.
+"""
+
+import asyncio
+import random
+import socket
+import struct
+import threading
+import time
+import traceback
+from collections import deque
+
+from arena import DIRECTION_CODES, Arena
+from frame_profiler import PhaseStats
+from simulation import DIRECTIONS
+from state_codec import KEYFRAME, KEYFRAME_INTERVAL, StateDecoder, StateEncoder, StateWriter
+
+PROTOCOL_VERSION = 2
+DEFAULT_PORT = 5555
+
+# Quadro: tamanho do conteúdo e tipo da mensagem
+FRAME_HEADER = struct.Struct("<IB")
+# Cliente -> servidor
+HELLO = 1    # versão do protocolo e se é um espectador
+INPUT = 2    # código da direção (um byte)
+# Servidor -> cliente
+WELCOME = 10  # id da cobra, largura, altura e intervalo do tick (ms)
+STATE = 11    # quadro de estado da arena (quadro-chave ou delta, state_codec.py)
+FULL = 12     # sem vagas; a conexão é encerrada
+
+HELLO_MESSAGE = struct.Struct("<BB")
+WELCOME_MESSAGE = struct.Struct("<HHHH")
+# Id da cobra no WELCOME de um espectador
+SPECTATOR_ID = 0xFFFF
+
+# Maior quadro aceito de um cliente (só mensagens pequenas) e do servidor
+MAX_CLIENT_FRAME = 64
+MAX_SERVER_FRAME = 1 << 26
+
+def frame(kind, payload=b""):
+    return FRAME_HEADER.pack(len(payload), kind) + payload
+
+async def read_frame(reader, max_size=MAX_SERVER_FRAME):
+    size, kind = FRAME_HEADER.unpack(await reader.readexactly(FRAME_HEADER.size))
+    if size > max_size:
+        raise ValueError(f"quadro grande demais ({size} bytes)")
+    return kind, (await reader.readexactly(size) if size else b"")
+
+# Conexão de um jogador (ou de um espectador, sem cobra) no servidor
+class Connection:
+    __slots__ = ("snake_id", "writer", "inputs", "lagging", "synced")
+
+    def __init__(self, snake_id, writer):
+        self.snake_id = snake_id
+        self.writer = writer
+        # Direções recebidas desde o último tick e ticks seguidos sem conseguir entregar o estado
+        self.inputs = 0
+        self.lagging = 0
+        # Se o cliente tem o estado do último quadro enviado (senão, o próximo é um quadro-chave)
+        self.synced = False
+
+class GameServer:
+    def __init__(self, width=80, height=60, max_players=256, bots=0, difficulty=1, seed=None,
+                 max_buffer=256 * 1024, max_lag_ticks=100, max_inputs_per_tick=4, max_spectators=64,
+                 keyframe_interval=KEYFRAME_INTERVAL, record=None):
+        # As vagas de jogador ficam vazias (fora do tabuleiro) até alguém se conectar
+        self.arena = Arena(width, height, bots=bots, players=max_players, difficulty=difficulty, seed=seed)
+        for snake_id in range(max_players):
+            self.arena.leave(snake_id)
+        self.max_players = max_players
+        # Bytes ainda não enviados a partir dos quais o cliente é considerado lento
+        self.max_buffer = max_buffer
+        self.max_lag_ticks = max_lag_ticks
+        self.max_inputs_per_tick = max_inputs_per_tick
+        self.max_spectators = max_spectators
+        self.connections = {}
+        self.spectators = set()
+        self.encoder = StateEncoder(self.arena, keyframe_interval)
+        # Gravação opcional do mesmo fluxo de quadros enviado aos clientes
+        self.recorder = StateWriter(record, width, height) if record is not None else None
+        # Tarefas que atendem as conexões, aguardadas no encerramento
+        self.handlers = set()
+        self.server = None
+        self.ticker = None
+
+        # Estatísticas (tempos de tick em ms)
+        self.tick_stats = PhaseStats(600)
+        self.frames_sent = 0
+        self.frames_dropped = 0
+        self.keyframes_sent = 0
+        self.bytes_sent = 0
+        self.inputs_received = 0
+        self.inputs_dropped = 0
+        self.disconnected_slow = 0
+        self.tick_errors = 0
+
+    async def start(self, host="127.0.0.1", port=DEFAULT_PORT):
+        """Abre a porta e começa os ticks; retorna a porta em uso (port=0 escolhe uma livre)"""
+        self.server = await asyncio.start_server(self.handle_client, host, port)
+        self.ticker = asyncio.create_task(self.run_ticks())
+        return self.server.sockets[0].getsockname()[1]
+
+    async def close(self):
+        if self.ticker is not None:
+            self.ticker.cancel()
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+        for connection in [*self.connections.values(), *self.spectators]:
+            connection.writer.close()
+        # Com o socket fechado, cada tarefa termina sozinha na próxima leitura
+        await asyncio.gather(*self.handlers, return_exceptions=True)
+        if self.recorder is not None:
+            self.recorder.close()
+
+    def free_slot(self):
+        for snake_id in range(self.max_players):
+            if snake_id not in self.connections:
+                return snake_id
+        return None
+
+    async def handle_client(self, reader, writer):
+        task = asyncio.current_task()
+        self.handlers.add(task)
+        sock = writer.get_extra_info("socket")
+        if sock is not None:
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        connection = None
+        try:
+            kind, payload = await asyncio.wait_for(read_frame(reader, MAX_CLIENT_FRAME), 5.0)
+            if kind != HELLO:
+                return
+            version, spectator = HELLO_MESSAGE.unpack(payload)
+            if version != PROTOCOL_VERSION:
+                return
+            arena = self.arena
+            if spectator:
+                if len(self.spectators) >= self.max_spectators:
+                    writer.write(frame(FULL))
+                    return
+                connection = Connection(None, writer)
+                self.spectators.add(connection)
+                writer.write(frame(WELCOME, WELCOME_MESSAGE.pack(SPECTATOR_ID, arena.width, arena.height,
+                                                                 arena.move_delay)))
+                # O espectador só recebe; o que ele mandar é ignorado até a conexão fechar
+                while True:
+                    await read_frame(reader, MAX_CLIENT_FRAME)
+            snake_id = self.free_slot()
+            if snake_id is None:
+                writer.write(frame(FULL))
+                return
+            connection = self.connections[snake_id] = Connection(snake_id, writer)
+            arena.join(snake_id)
+            writer.write(frame(WELCOME, WELCOME_MESSAGE.pack(snake_id, arena.width, arena.height, arena.move_delay)))
+
+            snake = arena.snakes[snake_id]
+            while True:
+                kind, payload = await read_frame(reader, MAX_CLIENT_FRAME)
+                if kind != INPUT or len(payload) != 1 or payload[0] >= len(DIRECTIONS):
+                    continue
+                self.inputs_received += 1
+                # Acima do limite por tick, as direções são descartadas (cliente inundando o servidor)
+                if connection.inputs >= self.max_inputs_per_tick:
+                    self.inputs_dropped += 1
+                    continue
+                connection.inputs += 1
+                snake.set_direction(DIRECTIONS[payload[0]])
+        except (asyncio.IncompleteReadError, asyncio.TimeoutError, ConnectionError, ValueError, struct.error):
+            pass
+        finally:
+            if connection is not None and connection.snake_id is None:
+                self.spectators.discard(connection)
+            elif connection is not None:
+                del self.connections[connection.snake_id]
+                self.arena.leave(connection.snake_id)
+            writer.close()
+            self.handlers.discard(task)
+
+    async def run_ticks(self):
+        # Ticks em instantes fixos; um atraso maior que um tick não é compensado com rajadas
+        loop = asyncio.get_running_loop()
+        interval = self.arena.move_delay / 1000
+        next_tick = loop.time()
+        while True:
+            next_tick += interval
+            delay = next_tick - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            elif delay < -interval:
+                next_tick = loop.time()
+            try:
+                self.tick()
+            except Exception:
+                # Um tick com erro não pode parar a arena: registra e segue no próximo
+                self.tick_errors += 1
+                traceback.print_exc()
+                # O estado pode ter sido enviado pela metade: todos recebem um quadro-chave no próximo tick
+                for connection in [*self.connections.values(), *self.spectators]:
+                    connection.synced = False
+
+    def tick(self):
+        start = time.perf_counter()
+        arena = self.arena
+        arena.step()
+        # Jogadores conectados renascem no mesmo ritmo dos bots
+        for snake_id in self.connections:
+            snake = arena.snakes[snake_id]
+            if not snake.alive and snake.respawn_tick <= arena.ticks:
+                arena.respawn(snake_id)
+        state = self.encoder.encode()
+        if self.recorder is not None:
+            self.recorder.write(state)
+        self.broadcast(frame(STATE, state))
+        self.tick_stats.add((time.perf_counter() - start) * 1000)
+
+    def broadcast(self, message):
+        # O mesmo quadro vai para todos: tudo o que um cliente recebe no tick sai em uma única escrita.
+        # Quem está fora de sincronia recebe um quadro-chave, codificado no máximo uma vez por tick.
+        keyframe = message if message[FRAME_HEADER.size] == KEYFRAME else None
+        for connection in [*self.connections.values(), *self.spectators]:
+            connection.inputs = 0
+            transport = connection.writer.transport
+            if transport.is_closing():
+                continue
+            if transport.get_write_buffer_size() > self.max_buffer:
+                # Cliente lento: perde este quadro e, com ele, a base dos próximos deltas
+                self.frames_dropped += 1
+                connection.synced = False
+                connection.lagging += 1
+                if connection.lagging > self.max_lag_ticks:
+                    self.disconnected_slow += 1
+                    transport.abort()
+                continue
+            connection.lagging = 0
+            data = message
+            if not connection.synced:
+                if keyframe is None:
+                    keyframe = frame(STATE, self.encoder.keyframe())
+                data = keyframe
+                connection.synced = True
+                self.keyframes_sent += 1
+            transport.write(data)
+            self.frames_sent += 1
+            self.bytes_sent += len(data)
+
+    def stats(self):
+        p50, p95, p99 = self.tick_stats.percentiles()
+        return {
+            "ticks": self.arena.ticks,
+            "connections": len(self.connections),
+            "spectators": len(self.spectators),
+            "tick_ms_mean": self.tick_stats.mean,
+            "tick_ms_p50": p50,
+            "tick_ms_p99": p99,
+            "tick_ms_max": self.tick_stats.max,
+            "frames_sent": self.frames_sent,
+            "frames_dropped": self.frames_dropped,
+            "keyframes_sent": self.keyframes_sent,
+            "bytes_sent": self.bytes_sent,
+            "inputs_received": self.inputs_received,
+            "inputs_dropped": self.inputs_dropped,
+            "disconnected_slow": self.disconnected_slow,
+            "tick_errors": self.tick_errors,
+        }
+
+async def bot_client(host, port, duration, seed=None, turn_chance=0.2, read=True, spectate=False):
+    """Cliente roteirizado: vira ao acaso a cada estado recebido; com read=False, conecta e nunca lê
+    (simula um cliente lento). Um espectador aplica cada quadro em uma arena espelho, o que confere o
+    fluxo de deltas. Retorna estatísticas da conexão."""
+    rng = random.Random(seed)
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + duration
+    result = {"connected": False, "states": 0, "bytes": 0, "inputs": 0, "keyframes": 0, "desyncs": 0}
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        writer.write(frame(HELLO, HELLO_MESSAGE.pack(PROTOCOL_VERSION, spectate)))
+        kind, payload = await read_frame(reader)
+        if kind != WELCOME:
+            return result
+        result["connected"] = True
+        _, width, height, _ = WELCOME_MESSAGE.unpack(payload)
+        decoder = StateDecoder(Arena.mirror(width, height, None)) if spectate else None
+        if not read:
+            await asyncio.sleep(max(0.0, deadline - loop.time()))
+            return result
+        while loop.time() < deadline:
+            kind, payload = await asyncio.wait_for(read_frame(reader), max(0.0, deadline - loop.time()))
+            if kind == STATE:
+                result["states"] += 1
+                result["bytes"] += len(payload)
+                result["keyframes"] += payload[0] == KEYFRAME
+                if decoder is not None:
+                    result["desyncs"] += not decoder.apply(payload)
+                elif rng.random() < turn_chance:
+                    writer.write(frame(INPUT, bytes([rng.randrange(len(DIRECTIONS))])))
+                    result["inputs"] += 1
+    except (asyncio.IncompleteReadError, asyncio.TimeoutError, ConnectionError):
+        pass
+    finally:
+        writer.close()
+    return result
+
+# Cliente de rede do SnakeGame: o laço asyncio roda em uma thread, e o jogo consome os estados recebidos
+# (quadros de state_codec.py, aplicados pelo jogo em uma arena espelho)
+class NetworkClient:
+    def __init__(self, host, port=DEFAULT_PORT, timeout=5.0, spectate=False):
+        self.host = host
+        self.port = port
+        self.spectate = spectate
+        self.writer = None
+        # Estados ainda não aplicados, na ordem de chegada (deque é seguro entre threads)
+        self.states = deque()
+        self.closed = False
+        self.error = None
+        self.ready = threading.Event()
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_until_complete, args=(self.run(),),
+                                       name="NetworkClient", daemon=True)
+        self.thread.start()
+        if not self.ready.wait(timeout):
+            raise ConnectionError(f"o servidor {host}:{port} não respondeu")
+        if self.error is not None:
+            raise ConnectionError(f"não foi possível entrar no servidor {host}:{port}: {self.error}")
+
+    async def run(self):
+        try:
+            reader, self.writer = await asyncio.open_connection(self.host, self.port)
+            self.writer.write(frame(HELLO, HELLO_MESSAGE.pack(PROTOCOL_VERSION, self.spectate)))
+            kind, payload = await read_frame(reader)
+            if kind != WELCOME:
+                raise ConnectionError("servidor cheio")
+            self.snake_id, self.width, self.height, self.move_delay = WELCOME_MESSAGE.unpack(payload)
+            if self.snake_id == SPECTATOR_ID:
+                self.snake_id = None
+            self.ready.set()
+            while True:
+                kind, payload = await read_frame(reader)
+                if kind == STATE:
+                    self.states.append(payload)
+        except (OSError, asyncio.IncompleteReadError, ValueError) as e:
+            self.error = e
+        finally:
+            self.closed = True
+            if self.writer is not None:
+                self.writer.close()
+            self.ready.set()
+
+    def poll(self):
+        """Estados recebidos desde a última chamada"""
+        states = []
+        while self.states:
+            states.append(self.states.popleft())
+        return states
+
+    def send_direction(self, direction):
+        if not self.closed and self.snake_id is not None:
+            self.loop.call_soon_threadsafe(self.writer.write, frame(INPUT, bytes([DIRECTION_CODES[direction]])))
+
+    def close(self):
+        if not self.closed:
+            self.loop.call_soon_threadsafe(self.writer.close)
+        self.thread.join(1.0)
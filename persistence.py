@@ -0,0 +1,127 @@
+"""
+Gravação de arquivos do Snake Game fora do laço principal
+
+As escritas são entregues a uma thread em segundo plano, para que o quadro
+nunca espere pelo disco (cartões SD podem levar dezenas de milissegundos).
+Substituições do mesmo arquivo pendentes ao mesmo tempo são agrupadas e só a
+mais recente é gravada, sempre de forma atômica (arquivo temporário + rename):
+uma queda no meio da escrita deixa o arquivo anterior intacto. Outras
+tarefas de gravação (como transações SQLite) rodam na mesma thread.
+"""
+
+import atexit
+import os
+import tempfile
+import threading
+
+def atomic_write(path, data):
+    """Substitui o conteúdo de path por data (bytes) sem nunca deixar o arquivo pela metade"""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, temp_path = tempfile.mkstemp(prefix=os.path.basename(path) + ".", suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.unlink(temp_path)
+        except OSError:
+            pass
+        raise
+
+class BackgroundWriter:
+    def __init__(self):
+        self.condition = threading.Condition()
+        # Conteúdo mais recente de cada arquivo a substituir
+        self.replacements = {}
+        # Tarefas arbitrárias, executadas na ordem em que foram agendadas
+        self.tasks = []
+        self.busy = False
+        self.closed = False
+        self.errors = []
+        self.thread = threading.Thread(target=self.run, name="BackgroundWriter", daemon=True)
+        self.thread.start()
+        # A thread é daemon: o que estiver pendente é gravado na saída do interpretador
+        atexit.register(self.close)
+
+    def replace(self, path, data):
+        """Agenda a substituição atômica de path por data (bytes); pedidos anteriores ainda não gravados são descartados"""
+        with self.condition:
+            if not self.closed:
+                self.replacements[path] = data
+                self.condition.notify()
+                return
+        # Depois de encerrada, a gravação acontece na hora
+        self.write(atomic_write, path, data)
+
+    def call(self, function):
+        """Agenda function() na thread de gravação (exceções não tratadas vão para errors)"""
+        with self.condition:
+            if not self.closed:
+                self.tasks.append(function)
+                self.condition.notify()
+                return
+        function()
+
+    def pending(self):
+        return self.replacements or self.tasks
+
+    def run(self):
+        while True:
+            with self.condition:
+                while not self.pending() and not self.closed:
+                    self.condition.wait()
+                if not self.pending():
+                    return
+                replacements, self.replacements = self.replacements, {}
+                tasks, self.tasks = self.tasks, []
+                self.busy = True
+
+            try:
+                for path, data in replacements.items():
+                    self.write(atomic_write, path, data)
+                for task in tasks:
+                    self.run_task(task)
+            finally:
+                with self.condition:
+                    self.busy = False
+                    self.condition.notify_all()
+
+    def run_task(self, task):
+        # Uma tarefa com erro não pode derrubar a thread (nem deixar flush() esperando para sempre)
+        try:
+            task()
+        except Exception as e:
+            name = getattr(task, "__qualname__", repr(task))
+            self.errors.append((name, e))
+            print(f"A tarefa de gravação {name} falhou: {e!r}")
+
+    def write(self, function, path, data):
+        try:
+            function(path, data)
+        except OSError as e:
+            self.errors.append((path, e))
+            print(f"Não foi possível gravar {os.path.basename(path)}: {e}")
+
+    def flush(self, timeout=None):
+        """Espera até que tudo o que foi agendado esteja no disco; retorna False se o tempo acabar"""
+        with self.condition:
+            return self.condition.wait_for(lambda: not (self.pending() or self.busy), timeout)
+
+    def close(self, timeout=5.0):
+        # Grava o que estiver pendente e encerra a thread
+        with self.condition:
+            self.closed = True
+            self.condition.notify_all()
+        self.thread.join(timeout)
+
+# Uma única thread de gravação atende o jogo inteiro
+_shared_writer = None
+
+def shared_writer():
+    global _shared_writer
+    if _shared_writer is None:
+        _shared_writer = BackgroundWriter()
+    return _shared_writer
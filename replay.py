@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Gravação e reprodução de partidas do Snake Game
+
+Uma partida é totalmente determinada pela semente do gerador aleatório, pelas
+configurações e pela direção em vigor a cada tick. O arquivo de replay guarda
+apenas isso (2 bits por tick), e a reprodução headless refaz a partida na
+velocidade máxima para conferir a pontuação e o tick da morte. Para quem só
+quer assistir sem as regras do jogo, a partida refeita pode ser exportada
+como quadros de estado (state_codec.py).
+"""
+
+import argparse
+import os
+import random
+import struct
+import sys
+import time
+
+from simulation import Simulation, Direction, GRID_WIDTH, GRID_HEIGHT
+from state_codec import KEYFRAME_INTERVAL, StateEncoder, StateWriter
+
+REPLAY_MAGIC = b"SNKR"
+REPLAY_VERSION = 1
+# magic, versão, semente, dificuldade, paredes, largura, altura, ticks, pontuação, nível
+HEADER_FORMAT = "<4sBQBBHHIII"
+
+DIRECTIONS = list(Direction)
+DIRECTION_CODES = {direction: code for code, direction in enumerate(DIRECTIONS)}
+
+def new_seed():
+    """Semente para uma nova partida"""
+    return random.getrandbits(63)
+
+class Replay:
+    def __init__(self, seed, difficulty=1, enable_walls=True, width=GRID_WIDTH, height=GRID_HEIGHT):
+        self.seed = seed
+        self.difficulty = difficulty
+        self.enable_walls = enable_walls
+        self.width = width
+        self.height = height
+        # Código da direção (índice em DIRECTIONS) de cada tick
+        self.directions = bytearray()
+        self.score = 0
+        self.level = 1
+
+    @property
+    def ticks(self):
+        return len(self.directions)
+
+    def record(self, direction):
+        self.directions.append(DIRECTION_CODES[direction])
+
+    def finish(self, sim):
+        # Resultado gravado, usado depois para verificar a partida
+        self.score = sim.score
+        self.level = sim.level
+
+    def actions(self):
+        return (DIRECTIONS[code] for code in self.directions)
+
+    def new_simulation(self, **kwargs):
+        return Simulation(self.difficulty, self.enable_walls, self.width, self.height, seed=self.seed, **kwargs)
+
+    def simulate(self):
+        """Refaz a partida sem interface gráfica, o mais rápido possível"""
+        sim = self.new_simulation()
+        step = sim.step
+        for action in self.actions():
+            step(action)
+        return sim
+
+    def export_states(self, path, keyframe_interval=KEYFRAME_INTERVAL):
+        """Refaz a partida gravando o estado de cada tick em path (um quadro-chave a cada
+        keyframe_interval ticks, deltas no resto); retorna a simulação final"""
+        sim = self.new_simulation()
+        encoder = StateEncoder(sim, keyframe_interval)
+        writer = StateWriter(path, self.width, self.height)
+        try:
+            writer.write(encoder.encode())
+            step = sim.step
+            for action in self.actions():
+                step(action)
+                writer.write(encoder.encode())
+        finally:
+            writer.close()
+        return sim
+
+    def verify(self, sim=None):
+        """True se a partida refeita termina com a mesma pontuação, nível e tick da morte"""
+        sim = sim if sim is not None else self.simulate()
+        return sim.done and (sim.score, sim.level, sim.ticks) == (self.score, self.level, self.ticks)
+
+    def to_bytes(self):
+        # Quatro ticks por byte
+        packed = bytearray((self.ticks + 3) // 4)
+        for tick, code in enumerate(self.directions):
+            packed[tick >> 2] |= code << ((tick & 3) * 2)
+
+        header = struct.pack(HEADER_FORMAT, REPLAY_MAGIC, REPLAY_VERSION, self.seed, self.difficulty,
+                             self.enable_walls, self.width, self.height, self.ticks, self.score, self.level)
+        return header + packed
+
+    def save(self, path):
+        with open(path, "wb") as f:
+            f.write(self.to_bytes())
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as f:
+            data = f.read()
+
+        try:
+            magic, version, seed, difficulty, enable_walls, width, height, ticks, score, level = \
+                struct.unpack_from(HEADER_FORMAT, data, 0)
+        except struct.error:
+            raise ValueError(f"{path} não é um arquivo de replay válido")
+        if magic != REPLAY_MAGIC or version != REPLAY_VERSION:
+            raise ValueError(f"{path} não é um arquivo de replay válido")
+
+        packed = data[struct.calcsize(HEADER_FORMAT):]
+        if len(packed) < (ticks + 3) // 4:
+            raise ValueError(f"{path} está incompleto")
+
+        replay = cls(seed, difficulty, bool(enable_walls), width, height)
+        replay.directions = bytearray((packed[tick >> 2] >> ((tick & 3) * 2)) & 3 for tick in range(ticks))
+        replay.score = score
+        replay.level = level
+        return replay
+
+def main():
+    """Verifica replays refazendo as partidas sem interface gráfica"""
+    parser = argparse.ArgumentParser(description="Verifica replays do Snake Game")
+    parser.add_argument("replays", nargs="+", help="arquivos de replay")
+    parser.add_argument("--export-states", action="store_true",
+                        help="grava também cada partida como quadros de estado (.snkt ao lado do replay)")
+    args = parser.parse_args()
+
+    failures = 0
+    for path in args.replays:
+        try:
+            replay = Replay.load(path)
+        except (OSError, ValueError) as e:
+            print(f"{path}: {e}")
+            failures += 1
+            continue
+
+        start = time.perf_counter()
+        if args.export_states:
+            states_path = os.path.splitext(path)[0] + ".snkt"
+            sim = replay.export_states(states_path)
+        else:
+            sim = replay.simulate()
+        elapsed = time.perf_counter() - start
+
+        ok = replay.verify(sim)
+        failures += not ok
+        print(f"{path}: {'OK' if ok else 'DIVERGENTE'} - pontuação {sim.score} (gravada {replay.score}), "
+              f"nível {sim.level} (gravado {replay.level}), morte no tick {sim.ticks} (gravado {replay.ticks}), "
+              f"{sim.ticks / max(elapsed, 1e-9):.0f} ticks/s")
+        if args.export_states:
+            print(f"  estados em {states_path}: {os.path.getsize(states_path)} bytes "
+                  f"({os.path.getsize(states_path) / max(sim.ticks, 1):.1f} por tick)")
+
+    sys.exit(1 if failures else 0)
+
+if __name__ == "__main__":
+    main()
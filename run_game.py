@@ -5,58 +5,143 @@ Arquivo inicializador do Snake Game
 
 import os
 import sys
+import time
+import argparse
 import subprocess
+import importlib.util
+
+class StartupProfiler:
+    """Mede o tempo gasto em cada fase da inicialização"""
+
+    def __init__(self, enabled):
+        self.enabled = enabled
+        self.start = self.last = time.perf_counter()
+        self.phases = []
+
+    def mark(self, phase):
+        now = time.perf_counter()
+        self.phases.append((phase, now - self.last))
+        self.last = now
+
+    def report(self):
+        if not self.enabled:
+            return
+        total = self.last - self.start
+        print("\nTempo de inicialização por fase:")
+        for phase, elapsed in self.phases:
+            print(f"  {phase:<34} {elapsed * 1000:8.1f} ms  {elapsed / total * 100:5.1f}%")
+        print(f"  {'total':<34} {total * 1000:8.1f} ms")
+
+def ensure_dependency(module, package):
+    """Instala uma dependência só se ela não for encontrada (sem importá-la)"""
+    if importlib.util.find_spec(module) is not None:
+        return
+    print(f"{package} não encontrado. Instalando...")
+    subprocess.call([sys.executable, "-m", "pip", "install", package])
+    print(f"{package} instalado com sucesso!")
+
+def parse_board(value):
+    # Tamanho do tabuleiro no formato LARGURAxALTURA (em células)
+    width, _, height = value.lower().partition("x")
+    try:
+        return int(width), int(height)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"use LARGURAxALTURA, por exemplo 2000x2000 (recebido {value!r})")
 
 def main():
     """Função principal para iniciar o jogo"""
+    parser = argparse.ArgumentParser(description="Snake Game")
+    parser.add_argument("--dirty-rects", action="store_true",
+                        help="atualiza apenas as regiões da tela que mudaram durante a partida")
+    parser.add_argument("--interpolate", action="store_true",
+                        help="desenha a cobra entre os ticks para um movimento mais suave")
+    parser.add_argument("--replay", metavar="ARQUIVO",
+                        help="reproduz uma partida gravada (ex.: replays/last.snkr) em velocidade normal")
+    parser.add_argument("--autopilot", action="store_true",
+                        help="começa direto no piloto automático (modo demonstração)")
+    parser.add_argument("--arena", type=int, nargs="?", const=-1, metavar="BOTS",
+                        help="começa direto no modo arena, contra BOTS cobras "
+                             "(padrão: proporcional ao tabuleiro, até 200)")
+    parser.add_argument("--connect", metavar="HOST[:PORTA]",
+                        help="entra em uma arena em rede (servidor iniciado com run_server.py)")
+    parser.add_argument("--spectate", metavar="HOST[:PORTA]", help="assiste a uma arena em rede, sem jogar")
+    parser.add_argument("--watch", metavar="ARQUIVO",
+                        help="assiste a uma gravação de estados (run_server.py --record)")
+    parser.add_argument("--board", type=parse_board, metavar="LxA",
+                        help="tamanho do tabuleiro em células (ex.: 2000x2000); maior que a tela, a câmera segue a cobra")
+    parser.add_argument("--frame-stats", action="store_true",
+                        help="mede o tempo de cada fase dos quadros (painel com F3, resumo ao sair)")
+    parser.add_argument("--frame-stats-output", metavar="ARQUIVO",
+                        help="grava as medições de quadro ao sair (.csv ou .json); implica --frame-stats")
+    parser.add_argument("--startup-profile", action="store_true",
+                        help="mostra o tempo gasto em cada fase da inicialização")
+    args = parser.parse_args()
+
+    profiler = StartupProfiler(args.startup_profile)
     print("Iniciando Snake Game...")
-    
-    # Verificar se o Pygame está instalado
-    try:
-        import pygame
-        print("Pygame já está instalado!")
-    except ImportError:
-        print("Pygame não encontrado. Instalando...")
-        subprocess.call([sys.executable, "-m", "pip", "install", "pygame"])
-        print("Pygame instalado com sucesso!")
 
-    try:
-        import numpy
-        print("Numpy já está instalado!")
-    except ImportError:
-        print("Numpy não encontrado. Instalando...")
-        subprocess.call([sys.executable, "-m", "pip", "install", "numpy"])
-        print("Numpy instalado com sucesso!")
-    
-    # Gerar os sons se eles não existirem
-    assets_dir = os.path.join(os.path.dirname(__file__), "assets")
-    if not os.path.exists(os.path.join(assets_dir, "eat.wav")) or \
-       not os.path.exists(os.path.join(assets_dir, "crash.wav")) or \
-       not os.path.exists(os.path.join(assets_dir, "powerup.wav")):
-        print("Gerando sons para o jogo...")
-        try:
-            from generate_sounds import generate_and_save
-            # Usar a função importada para gerar os sons
-            if not os.path.exists(assets_dir):
-                os.makedirs(assets_dir)
-                
-            # Gerar os sons do jogo
-            generate_and_save("eat.wav", 440, 0.1, 0.6)
-            generate_and_save("crash.wav", 100, 0.3, 0.7, True)
-            generate_and_save("powerup.wav", 800, 0.2, 0.6)
-        except:
-            # Executar o script como processo separado
-            subprocess.call([sys.executable, os.path.join(os.path.dirname(__file__), "generate_sounds.py")])
-    
+    # Verificar dependências
+    ensure_dependency("pygame", "pygame")
+    ensure_dependency("numpy", "numpy")
+    profiler.mark("verificar dependências")
+
+    import pygame
+    profiler.mark("importar pygame")
+
     # Iniciar o jogo
     try:
         from snake_game import SnakeGame
-        game = SnakeGame()
+        profiler.mark("importar o jogo")
+
+        # Um replay é sempre reproduzido no tabuleiro em que foi gravado, e uma partida em rede (ou gravada
+        # pelo servidor) no do servidor
+        replay = None
+        client = None
+        board_size = args.board
+        if args.replay:
+            from replay import Replay
+            replay = Replay.load(args.replay)
+            board_size = (replay.width, replay.height)
+        elif args.connect or args.spectate:
+            from network import DEFAULT_PORT, NetworkClient
+            host, _, port = (args.connect or args.spectate).partition(":")
+            client = NetworkClient(host, int(port) if port else DEFAULT_PORT, spectate=not args.connect)
+            board_size = (client.width, client.height)
+        elif args.watch:
+            from state_codec import RecordingPlayer
+            client = RecordingPlayer(args.watch)
+            board_size = (client.width, client.height)
+
+        frame_profiler = None
+        if args.frame_stats or args.frame_stats_output:
+            from frame_profiler import FrameProfiler
+            frame_profiler = FrameProfiler(output=args.frame_stats_output)
+
+        game = SnakeGame(dirty_rects=args.dirty_rects, interpolate=args.interpolate, board_size=board_size,
+                         profiler=frame_profiler,
+                         arena_bots=args.arena if args.arena is not None and args.arena >= 0 else None)
+        profiler.mark("criar janela e carregar recursos")
+
+        if replay is not None:
+            game.start_replay(replay)
+        elif client is not None:
+            game.start_network(client)
+        elif args.autopilot:
+            game.start_autopilot()
+        elif args.arena is not None:
+            game.start_arena()
+
+        if args.startup_profile:
+            game.handle_events()
+            game.update()
+            game.draw()
+            profiler.mark("primeiro quadro")
+            profiler.report()
+
         game.run()
     except Exception as e:
         print(f"Erro ao iniciar o jogo: {e}")
-        # Tentar executar diretamente
-        subprocess.call([sys.executable, os.path.join(os.path.dirname(__file__), "snake_game.py")])
+        sys.exit(1)
 
 if __name__ == "__main__":
     main()
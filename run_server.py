@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Servidor multijogador do Snake Game
+
+Roda a arena em rede até ser interrompido (Ctrl+C), gravando a partida com
+--record. Com --bot-clients, abre também clientes roteirizados em localhost
+por --duration segundos e imprime as estatísticas do servidor e dos clientes
+(teste de carga sem janela); os espectadores do teste (--spectators) aplicam
+cada quadro recebido, conferindo o fluxo de deltas.
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+
+from network import DEFAULT_PORT, GameServer, bot_client
+from run_game import parse_board
+
+async def serve(args):
+    width, height = args.board
+    server = GameServer(width, height, max_players=args.max_players, bots=args.bots,
+                        difficulty=args.difficulty, seed=args.seed, max_spectators=max(64, args.spectators),
+                        record=args.record)
+    port = await server.start(args.host, args.port)
+    print(f"Servidor ouvindo em {args.host}:{port} ({width}x{height}, {args.bots} bots, "
+          f"até {args.max_players} jogadores, tick de {server.arena.move_delay} ms)")
+
+    try:
+        if args.bot_clients or args.slow_clients or args.spectators:
+            # Teste de carga: clientes roteirizados no mesmo laço, conectando pela rede local
+            clients = [bot_client(args.host, port, args.duration, seed=i) for i in range(args.bot_clients)]
+            clients += [bot_client(args.host, port, args.duration, read=False) for _ in range(args.slow_clients)]
+            clients += [bot_client(args.host, port, args.duration, spectate=True) for _ in range(args.spectators)]
+            results = await asyncio.gather(*clients, return_exceptions=True)
+            report(server, [result for result in results if isinstance(result, dict)], len(results))
+        else:
+            while True:
+                await asyncio.sleep(10)
+                stats = server.stats()
+                print(f"{stats['connections']} jogadores, tick p99 {stats['tick_ms_p99']:.2f} ms, "
+                      f"{stats['frames_dropped']} estados descartados, {stats['tick_errors']} ticks com erro")
+    finally:
+        await server.close()
+
+def report(server, results, total):
+    stats = server.stats()
+    print(json.dumps(stats, indent=2))
+    readers = [result for result in results if result["states"]]
+    connected = sum(1 for result in results if result["connected"])
+    print(f"Clientes conectados: {connected} de {total}")
+    if readers:
+        states = [result["states"] for result in readers]
+        print(f"Estados recebidos por cliente: mín. {min(states)}, máx. {max(states)} "
+              f"(de {stats['ticks']} ticks)")
+        total_bytes = sum(result["bytes"] for result in readers)
+        print(f"Média de {total_bytes / sum(states):.0f} bytes por estado")
+    desyncs = sum(result["desyncs"] for result in results)
+    if any(result["keyframes"] for result in results):
+        print(f"Deltas fora de sequência nos espectadores: {desyncs}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Servidor multijogador do Snake Game")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--board", type=parse_board, default=(80, 60), metavar="LxA",
+                        help="tamanho do tabuleiro em células (padrão: 80x60)")
+    parser.add_argument("--bots", type=int, default=0, help="cobras controladas pelo servidor")
+    parser.add_argument("--max-players", type=int, default=256, help="vagas para jogadores")
+    parser.add_argument("--difficulty", type=int, default=1, choices=range(1, 6),
+                        help="dificuldade (define o intervalo do tick)")
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--bot-clients", type=int, default=0,
+                        help="clientes roteirizados para um teste de carga em localhost")
+    parser.add_argument("--slow-clients", type=int, default=0,
+                        help="clientes do teste de carga que nunca leem o que recebem")
+    parser.add_argument("--spectators", type=int, default=0,
+                        help="espectadores do teste de carga, que aplicam cada quadro recebido")
+    parser.add_argument("--record", metavar="ARQUIVO", help="grava a partida (quadros de estado) em ARQUIVO")
+    parser.add_argument("--duration", type=float, default=10.0, help="duração do teste de carga (s)")
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(serve(args))
+    except KeyboardInterrupt:
+        print("\nServidor encerrado.")
+    except OSError as e:
+        print(f"Não foi possível iniciar o servidor: {e}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
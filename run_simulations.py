@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+Executor de simulações headless do Snake Game em vários núcleos
+
+Distribui partidas sem interface gráfica por um pool de processos, cada uma
+com sua própria semente, e grava os resultados em um arquivo JSON Lines.
+Rodar de novo com o mesmo arquivo de saída retoma de onde parou.
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from autopilot import Autopilot
+from simulation import Simulation, Direction
+
+DIRECTIONS = list(Direction)
+
+def safe_directions(sim):
+    """Direções que não levam a cabeça para uma célula ocupada no próximo tick"""
+    grid = sim.grid
+    head_x, head_y = sim.snake.positions[0]
+    tail = sim.snake.positions[-1]
+    back_x, back_y = sim.snake.direction.value
+    safe = []
+    for direction in DIRECTIONS:
+        dx, dy = direction.value
+        if (dx, dy) == (-back_x, -back_y):
+            continue
+        cell_pos = ((head_x + dx) % sim.width, (head_y + dy) % sim.height)
+        cell = grid.index(cell_pos)
+        # A cauda sai do lugar no mesmo tick, a menos que a cobra esteja crescendo
+        vacating = cell_pos == tail and sim.snake.grow_pending == 0 and grid.snake[cell] == 1
+        if (grid.snake[cell] and not vacating) or grid.barriers[cell]:
+            continue
+        safe.append(direction)
+    return safe
+
+def random_policy(sim, rng):
+    """Escolhe ao acaso entre as direções seguras"""
+    safe = safe_directions(sim)
+    return rng.choice(safe) if safe else None
+
+def greedy_policy(sim, rng):
+    """Aproxima-se da comida pelo menor caminho (com volta nas bordas) entre as direções seguras"""
+    safe = safe_directions(sim)
+    if not safe:
+        return None
+
+    head_x, head_y = sim.snake.positions[0]
+    food_x, food_y = sim.food.position
+
+    def distance(direction):
+        x = (head_x + direction.value[0]) % sim.width
+        y = (head_y + direction.value[1]) % sim.height
+        dx = abs(x - food_x)
+        dy = abs(y - food_y)
+        return min(dx, sim.width - dx) + min(dy, sim.height - dy)
+
+    best = min(distance(direction) for direction in safe)
+    return rng.choice([direction for direction in safe if distance(direction) == best])
+
+POLICIES = {
+    "random": random_policy,
+    "greedy": greedy_policy,
+    "autopilot": Autopilot,
+}
+
+def play_game(difficulty, seed, policy_name, enable_walls=True, max_ticks=100000):
+    """Joga uma partida completa e retorna o resumo do resultado"""
+    sim = Simulation(difficulty, enable_walls, seed=seed)
+    policy = POLICIES[policy_name]
+    # Políticas com estado (como o piloto automático) ganham uma instância por partida
+    if isinstance(policy, type):
+        policy = policy()
+    rng = random.Random(seed)
+
+    while not sim.done and sim.ticks < max_ticks:
+        sim.step(policy(sim, rng))
+
+    return {
+        "difficulty": difficulty,
+        "seed": seed,
+        "policy": policy_name,
+        "enable_walls": enable_walls,
+        "score": sim.score,
+        "level": sim.level,
+        "ticks": sim.ticks,
+        "death_cause": sim.death_cause or "timeout",
+        "power_ups": sim.power_ups_taken,
+    }
+
+def run_batch(difficulty, seeds, policy_name, enable_walls, max_ticks):
+    """Executa um lote de partidas em um processo do pool (reduz o custo de IPC)"""
+    return [play_game(difficulty, seed, policy_name, enable_walls, max_ticks) for seed in seeds]
+
+def result_key(result):
+    return (result["difficulty"], result["policy"], result["enable_walls"], result["seed"])
+
+def load_completed(path):
+    """Lê os resultados já gravados para permitir retomar uma execução"""
+    completed = {}
+    if not os.path.exists(path):
+        return completed
+    with open(path, "r") as f:
+        for line in f:
+            try:
+                result = json.loads(line)
+            except ValueError:
+                # Última linha incompleta de uma execução interrompida
+                continue
+            completed[result_key(result)] = result
+    return completed
+
+def truncate_partial_line(path, chunk_size=65536):
+    """Corta a última linha incompleta de uma execução interrompida, para a retomada não escrever
+    o próximo resultado colado nela"""
+    if not os.path.exists(path):
+        return
+    with open(path, "rb+") as f:
+        end = f.seek(0, os.SEEK_END)
+        position = end
+        while position > 0:
+            start = max(0, position - chunk_size)
+            f.seek(start)
+            newline = f.read(position - start).rfind(b"\n")
+            if newline >= 0:
+                if start + newline + 1 < end:
+                    f.truncate(start + newline + 1)
+                return
+            position = start
+        f.truncate(0)
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+def print_summary(results):
+    """Imprime a distribuição de pontuação por dificuldade"""
+    by_difficulty = {}
+    for result in results:
+        by_difficulty.setdefault(result["difficulty"], []).append(result)
+
+    print(f"\n{'Dif.':>4} {'Jogos':>7} {'Média':>8} {'p50':>6} {'p90':>6} {'p99':>6} {'Máx':>6} "
+          f"{'Ticks':>8} {'Nível':>6}  Causas de morte")
+    for difficulty in sorted(by_difficulty):
+        games = by_difficulty[difficulty]
+        scores = [game["score"] for game in games]
+        causes = {}
+        for game in games:
+            causes[game["death_cause"]] = causes.get(game["death_cause"], 0) + 1
+        causes_str = ", ".join(f"{cause}={count}" for cause, count in sorted(causes.items()))
+        print(f"{difficulty:>4} {len(games):>7} {sum(scores) / len(scores):>8.1f} "
+              f"{percentile(scores, 0.5):>6} {percentile(scores, 0.9):>6} {percentile(scores, 0.99):>6} "
+              f"{max(scores):>6} {sum(g['ticks'] for g in games) / len(games):>8.0f} "
+              f"{sum(g['level'] for g in games) / len(games):>6.2f}  {causes_str}")
+
+def parse_difficulties(value):
+    if value == "all":
+        return [1, 2, 3, 4, 5]
+    return [int(part) for part in value.split(",")]
+
+def main():
+    """Função principal do executor de simulações"""
+    parser = argparse.ArgumentParser(description="Executa partidas headless do Snake Game em paralelo")
+    parser.add_argument("--games", type=int, default=1000, help="partidas por dificuldade")
+    parser.add_argument("--difficulty", type=parse_difficulties, default=[1],
+                        help="dificuldades separadas por vírgula ou 'all'")
+    parser.add_argument("--policy", choices=sorted(POLICIES), default="greedy")
+    parser.add_argument("--no-walls", action="store_true", help="desativa as paredes")
+    parser.add_argument("--max-ticks", type=int, default=100000, help="limite de ticks por partida")
+    parser.add_argument("--seed", type=int, default=0, help="semente da primeira partida")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="processos no pool")
+    parser.add_argument("--batch-size", type=int, default=50, help="partidas por tarefa enviada ao pool")
+    parser.add_argument("--output", default="simulation_results.jsonl", help="arquivo de resultados (JSON Lines)")
+    args = parser.parse_args()
+
+    completed = load_completed(args.output)
+    enable_walls = not args.no_walls
+    wanted_keys = [(difficulty, args.policy, enable_walls, seed) for difficulty in args.difficulty
+                   for seed in range(args.seed, args.seed + args.games)]
+
+    # Montar os lotes de sementes que ainda faltam
+    batches = []
+    for difficulty in args.difficulty:
+        pending = [seed for seed in range(args.seed, args.seed + args.games)
+                   if (difficulty, args.policy, enable_walls, seed) not in completed]
+        for i in range(0, len(pending), args.batch_size):
+            batches.append((difficulty, pending[i:i + args.batch_size]))
+
+    total = sum(len(seeds) for _, seeds in batches)
+    if total < len(wanted_keys):
+        print(f"Retomando: {len(wanted_keys) - total} partidas já concluídas, {total} restantes.")
+
+    start = time.perf_counter()
+    done = 0
+    truncate_partial_line(args.output)
+    with open(args.output, "a") as output, ProcessPoolExecutor(max_workers=args.workers) as pool:
+        futures = [pool.submit(run_batch, difficulty, seeds, args.policy, enable_walls, args.max_ticks)
+                   for difficulty, seeds in batches]
+        for future in as_completed(futures):
+            results = future.result()
+            for result in results:
+                output.write(json.dumps(result) + "\n")
+                completed[result_key(result)] = result
+            output.flush()
+            done += len(results)
+            elapsed = time.perf_counter() - start
+            print(f"\r{done}/{total} partidas ({done / elapsed:.0f}/s)", end="", file=sys.stderr)
+
+    if total:
+        print(file=sys.stderr)
+    wanted = [completed[key] for key in wanted_keys if key in completed]
+    if wanted:
+        print_summary(wanted)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Escalonador de passo fixo do Snake Game
+
+Acumula o tempo real decorrido e libera ticks de simulação em intervalos
+exatos (inclusive vários ticks seguidos para recuperar um travamento),
+informa a fração do próximo tick para renderização interpolada e dorme
+com precisão até o próximo quadro ou tick necessário.
+"""
+
+import time
+
+class FixedStepScheduler:
+    def __init__(self, clock=time.perf_counter, sleep=time.sleep, max_accumulator=1000):
+        self.clock = clock
+        self.sleep = sleep
+        # Limite (ms) de atraso recuperado de uma vez, para não entrar em espiral após um travamento longo
+        self.max_accumulator = max_accumulator
+        self.accumulator = 0.0
+        self.last = None
+        self.frame_start = clock()
+
+    def reset(self):
+        self.accumulator = 0.0
+        self.last = None
+
+    def pause(self):
+        # O tempo em pausa (ou em menus) não conta para a simulação
+        self.last = None
+
+    def advance(self):
+        """Soma ao acumulador o tempo real decorrido desde a última chamada"""
+        now = self.clock()
+        if self.last is not None:
+            self.accumulator = min(self.accumulator + (now - self.last) * 1000, self.max_accumulator)
+        self.last = now
+
+    def consume(self, step):
+        """Retorna True (e desconta step ms) se já é hora de executar mais um tick"""
+        if self.accumulator >= step:
+            self.accumulator -= step
+            return True
+        return False
+
+    def alpha(self, step):
+        """Fração (0 a 1) do intervalo até o próximo tick, para interpolar a renderização"""
+        return min(1.0, self.accumulator / step)
+
+    def wait(self, fps, step=None):
+        """Dorme até o próximo quadro ou, se step for informado, até o próximo tick (o que vier depois)"""
+        deadline = self.frame_start + 1.0 / fps
+        if step is not None and self.last is not None:
+            deadline = max(deadline, self.last + (step - self.accumulator) / 1000)
+
+        # Dormir quase todo o intervalo e completar o último milissegundo em espera ativa
+        remaining = deadline - self.clock()
+        if remaining > 0.002:
+            self.sleep(remaining - 0.001)
+        while self.clock() < deadline:
+            pass
+        self.frame_start = self.clock()
@@ -0,0 +1,176 @@
+"""
+Placar persistente do Snake Game
+
+Todas as pontuações ficam em um banco SQLite, com índices para as consultas
+de melhores pontuações por dificuldade, paredes e período. As inserções são
+feitas em lote na thread de gravação em segundo plano; a tela de recordes lê
+as primeiras páginas de um cache em memória (um heap com as K melhores
+pontuações de cada filtro) e só consulta o banco, depois de esperar as
+inserções pendentes, para páginas mais fundas ou filtros por período.
+"""
+
+import heapq
+import sqlite3
+import threading
+import time
+
+SCHEMA = [
+    """CREATE TABLE IF NOT EXISTS scores (
+        id INTEGER PRIMARY KEY,
+        name TEXT NOT NULL,
+        score INTEGER NOT NULL,
+        level INTEGER NOT NULL,
+        difficulty INTEGER,
+        walls INTEGER,
+        date REAL NOT NULL,
+        replay TEXT
+    )""",
+    # Um índice por combinação de filtro, já na ordem do placar (empates: a pontuação mais antiga primeiro)
+    "CREATE INDEX IF NOT EXISTS scores_top ON scores (score DESC, id)",
+    "CREATE INDEX IF NOT EXISTS scores_difficulty ON scores (difficulty, score DESC, id)",
+    "CREATE INDEX IF NOT EXISTS scores_walls ON scores (walls, score DESC, id)",
+    "CREATE INDEX IF NOT EXISTS scores_mode ON scores (difficulty, walls, score DESC, id)",
+    "CREATE INDEX IF NOT EXISTS scores_date ON scores (date)",
+]
+
+COLUMNS = ("id", "name", "score", "level", "difficulty", "walls", "date", "replay")
+
+# Espera máxima (segundos) pelas inserções pendentes antes de uma consulta
+QUERY_FLUSH_TIMEOUT = 5.0
+
+# Melhores pontuações de um filtro, mantidas em um heap mínimo de tamanho k
+class TopScores:
+    def __init__(self, k, entries):
+        self.k = k
+        # A menor chave é a pior posição: menor pontuação e, no empate, a mais recente
+        self.heap = [(entry["score"], -entry["id"], entry) for entry in entries]
+        heapq.heapify(self.heap)
+        self.ranked = None
+
+    def add(self, entry):
+        item = (entry["score"], -entry["id"], entry)
+        if len(self.heap) < self.k:
+            heapq.heappush(self.heap, item)
+        elif item > self.heap[0]:
+            heapq.heapreplace(self.heap, item)
+        else:
+            return False
+        self.ranked = None
+        return True
+
+    def entries(self):
+        # Ordenado só quando o heap muda (a tela de recordes é desenhada a cada quadro)
+        if self.ranked is None:
+            self.ranked = [entry for _, _, entry in sorted(self.heap, reverse=True)]
+        return self.ranked
+
+class ScoreStore:
+    def __init__(self, path, writer, cache_size=100):
+        self.path = path
+        self.writer = writer
+        self.cache_size = cache_size
+        # Consultas na thread do jogo; inserções em uma conexão própria, usada só pela thread de gravação
+        self.connection = self.connect()
+        with self.connection:
+            for statement in SCHEMA:
+                self.connection.execute(statement)
+        self.write_connection = self.connect(check_same_thread=False)
+        self.next_id = (self.connection.execute("SELECT MAX(id) FROM scores").fetchone()[0] or 0) + 1
+
+        # Inserções aguardando a thread de gravação (agrupadas em uma transação)
+        self.pending = []
+        self.lock = threading.Lock()
+        # Caches por filtro (dificuldade, paredes); None em um campo significa "todas"
+        self.caches = {}
+
+    def connect(self, check_same_thread=True):
+        connection = sqlite3.connect(self.path, check_same_thread=check_same_thread)
+        connection.row_factory = sqlite3.Row
+        # Com WAL, a leitura da tela de recordes não espera uma inserção em andamento (e vice-versa)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        return connection
+
+    def is_empty(self):
+        return self.connection.execute("SELECT 1 FROM scores LIMIT 1").fetchone() is None
+
+    def import_entries(self, entries):
+        """Importa recordes de versões anteriores (sem dificuldade nem paredes conhecidas), de forma síncrona"""
+        rows = []
+        for entry in entries:
+            # Versões antigas gravavam os milissegundos desde a abertura do jogo: data desconhecida (0)
+            date = entry.get("date", 0)
+            if date < 1e9:
+                date = 0
+            rows.append((self.next_id, entry.get("name", ""), entry.get("score", 0), entry.get("level", 1),
+                         entry.get("difficulty"), entry.get("walls"), date, entry.get("replay")))
+            self.next_id += 1
+        with self.connection:
+            self.connection.executemany("INSERT INTO scores VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+        self.caches.clear()
+
+    def add(self, name, score, level, difficulty, walls, replay=None):
+        """Registra uma pontuação e retorna a entrada (o banco é atualizado em segundo plano)"""
+        entry = {"id": self.next_id, "name": name, "score": score, "level": level, "difficulty": difficulty,
+                 "walls": int(walls), "date": time.time(), "replay": replay}
+        self.next_id += 1
+
+        for (cache_difficulty, cache_walls), cache in self.caches.items():
+            if cache_difficulty in (None, difficulty) and cache_walls in (None, entry["walls"]):
+                cache.add(entry)
+
+        with self.lock:
+            self.pending.append(tuple(entry[column] for column in COLUMNS))
+            first = len(self.pending) == 1
+        if first:
+            self.writer.call(self.commit_pending)
+        return entry
+
+    def commit_pending(self):
+        # Roda na thread de gravação: todas as inserções acumuladas em uma única transação
+        with self.lock:
+            rows, self.pending = self.pending, []
+        try:
+            with self.write_connection:
+                self.write_connection.executemany("INSERT INTO scores VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+        except sqlite3.Error as e:
+            print(f"Não foi possível gravar os recordes: {e}")
+
+    def cache(self, difficulty=None, walls=None):
+        key = (difficulty, walls)
+        cache = self.caches.get(key)
+        if cache is None:
+            cache = self.caches[key] = TopScores(self.cache_size, self.query(self.cache_size, 0, difficulty, walls))
+        return cache
+
+    def top(self, limit=10, offset=0, difficulty=None, walls=None, since=None):
+        """Entradas do placar da posição offset até offset + limit, com os filtros dados
+
+        since é um instante (time.time()) a partir do qual as pontuações contam; sem ele, as páginas
+        dentro do cache não consultam o banco."""
+        if since is None and offset + limit <= self.cache_size:
+            return self.cache(difficulty, walls).entries()[offset:offset + limit]
+        return self.query(limit, offset, difficulty, walls, since)
+
+    def query(self, limit, offset=0, difficulty=None, walls=None, since=None):
+        # Inserções ainda na fila precisam chegar ao banco antes da consulta (só acontece fora da partida);
+        # se o disco estiver travado, a consulta sai mesmo assim, só sem as mais recentes
+        self.writer.flush(QUERY_FLUSH_TIMEOUT)
+        conditions = []
+        parameters = []
+        if difficulty is not None:
+            conditions.append("difficulty = ?")
+            parameters.append(difficulty)
+        if walls is not None:
+            conditions.append("walls = ?")
+            parameters.append(int(walls))
+        if since is not None:
+            conditions.append("date >= ?")
+            parameters.append(since)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        rows = self.connection.execute(f"SELECT * FROM scores {where} ORDER BY score DESC, id LIMIT ? OFFSET ?",
+                                       parameters + [limit, offset])
+        return [dict(row) for row in rows]
+
+    def close(self):
+        self.connection.close()
@@ -0,0 +1,650 @@
+"""
+Núcleo de simulação do Snake Game, independente do Pygame
+
+Contém as regras do jogo (movimento da cobra, comida, power-ups, colisões,
+pontuação, níveis e barreiras) dirigidas por um relógio injetado e por uma
+API step(action), para que bots, replays e testes rodem sem inicializar o SDL.
+"""
+
+import random
+import re
+import struct
+import sys
+from array import array
+from collections import deque
+from enum import Enum
+
+# Dimensões padrão do tabuleiro (em células)
+GRID_WIDTH = 40
+GRID_HEIGHT = 30
+
+# Tipos de power-up disponíveis
+POWER_UP_TYPES = ["speed", "slow", "points", "invincible", "shrink"]
+
+# Duração dos efeitos de power-up em milissegundos
+EFFECT_DURATION = 5000
+
+# Tempo que um power-up fica no tabuleiro e intervalo entre power-ups, em milissegundos
+POWER_UP_DURATION = 10000
+POWER_UP_DELAY = 15000
+
+class Direction(Enum):
+    RIGHT = (1, 0)
+    LEFT = (-1, 0)
+    UP = (0, -1)
+    DOWN = (0, 1)
+
+# Códigos numéricos usados no snapshot compactado
+DIRECTIONS = list(Direction)
+DEATH_CAUSES = [None, "self", "wall", "barrier"]
+
+# Formato do snapshot: cabeçalho da simulação, cobra, comida/power-up, estado do gerador
+# aleatório e, por fim, as células do corpo, das barreiras e do índice de células livres
+SNAPSHOT_MAGIC = b"SNKS"
+SNAPSHOT_VERSION = 1
+# magic, versão, largura, altura, dificuldade, paredes, relógio, pontuação, nível, ticks,
+# power-ups pegos, fim de jogo, causa da morte, intervalo de movimento, timer de power-up
+SIM_STATE = struct.Struct("<4sBHHBBdIHIIBBdd")
+# direção, próxima direção, crescimento pendente, invencível, fim da invencibilidade,
+# modificador de velocidade, fim do modificador, tamanho do corpo
+SNAKE_STATE = struct.Struct("<BBIBdddI")
+# comida (x, y), power-up ativo, tipo, posição (x, y), momento do surgimento, duração
+ITEMS_STATE = struct.Struct("<HHBBHHdd")
+# quantidade de barreiras e de células livres
+COUNTS_STATE = struct.Struct("<II")
+# estado do Mersenne Twister (624 palavras + índice) e o próximo valor gaussiano em cache
+RNG_STATE = struct.Struct("<625IBd")
+
+# Relógio manual em milissegundos, avançado pela própria simulação
+class TickClock:
+    __slots__ = ("start", "now")
+
+    def __init__(self, start=0):
+        self.start = start
+        self.now = start
+
+    def reset(self):
+        self.now = self.start
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, ms):
+        self.now += ms
+
+# Bytes não nulos da grade de ocupação (a busca roda em C, o que importa em tabuleiros enormes)
+OCCUPIED = re.compile(rb"[^\x00]")
+
+# Índices de célula do índice livre: 4 bytes com sinal (o -1 marca célula ocupada) bastam para 2 ** 31
+# células, metade do "l" de 8 bytes do Linux em tabuleiros enormes
+CELL_INDEX = "i"
+
+# Arrays 0, 1, 2, ... por tamanho de tabuleiro; fatias deles reconstroem o índice de células livres em C
+_identity_arrays = {}
+
+def identity_array(size):
+    """Array compartilhado com os números de 0 a size - 1 (não deve ser alterado)"""
+    identity = _identity_arrays.get(size)
+    if identity is None:
+        identity = _identity_arrays[size] = array(CELL_INDEX, range(size))
+    return identity
+
+# Grade de ocupação compacta: um byte por célula, indexado por y * largura + x
+class Grid:
+    __slots__ = ("width", "height", "snake", "barriers", "free", "free_slot")
+
+    def __init__(self, width=GRID_WIDTH, height=GRID_HEIGHT):
+        self.width = width
+        self.height = height
+        # Quantidade de segmentos da cobra em cada célula (pode passar de 1 com invencibilidade)
+        self.snake = bytearray(width * height)
+        self.barriers = bytearray(width * height)
+
+        # Índice de células livres: array denso + posição de cada célula no array (-1 se ocupada),
+        # com remoção por troca com o último elemento para manter tudo O(1)
+        self.free = identity_array(width * height)[:]
+        self.free_slot = identity_array(width * height)[:]
+
+    def clone(self):
+        grid = Grid.__new__(Grid)
+        grid.width = self.width
+        grid.height = self.height
+        grid.snake = self.snake[:]
+        grid.barriers = self.barriers[:]
+        grid.free = self.free[:]
+        grid.free_slot = self.free_slot[:]
+        return grid
+
+    def load(self, body_cells, barrier_cells, free_cells):
+        """Reconstrói a ocupação a partir das células; a ordem do índice livre é preservada
+        porque dela depende o resultado dos sorteios"""
+        size = self.width * self.height
+        self.snake = bytearray(size)
+        for cell in body_cells:
+            self.snake[cell] += 1
+        self.barriers = bytearray(size)
+        for cell in barrier_cells:
+            self.barriers[cell] = 1
+        self.free = array(CELL_INDEX, free_cells)
+        self.free_slot = array(CELL_INDEX, [-1]) * size
+        for slot, cell in enumerate(self.free):
+            self.free_slot[cell] = slot
+
+    def index(self, position):
+        return position[1] * self.width + position[0]
+
+    def position(self, cell):
+        return (cell % self.width, cell // self.width)
+
+    def occupy(self, position):
+        cell = position[1] * self.width + position[0]
+        self.snake[cell] += 1
+        if self.snake[cell] == 1 and not self.barriers[cell]:
+            self._remove_free(cell)
+
+    def vacate(self, position):
+        cell = position[1] * self.width + position[0]
+        self.snake[cell] -= 1
+        if self.snake[cell] == 0 and not self.barriers[cell]:
+            self._add_free(cell)
+
+    def add_barrier(self, position):
+        cell = position[1] * self.width + position[0]
+        if not self.barriers[cell]:
+            self.barriers[cell] = 1
+            if not self.snake[cell]:
+                self._remove_free(cell)
+
+    def clear_barriers(self):
+        size = self.width * self.height
+        self.barriers = bytearray(size)
+        # Células fora da cobra em ordem crescente (a mesma ordem de sempre, da qual dependem os sorteios):
+        # o índice é montado por fatias, e a célula que tem j células ocupadas antes dela fica na posição
+        # cell - j
+        identity = identity_array(size)
+        occupied = [match.start() for match in OCCUPIED.finditer(self.snake)]
+        self.free = array(CELL_INDEX)
+        self.free_slot = identity[:]
+        start = 0
+        for j, cell in enumerate(occupied):
+            self.free.extend(identity[start:cell])
+            self.free_slot[cell] = -1
+            end = occupied[j + 1] if j + 1 < len(occupied) else size
+            self.free_slot[cell + 1:end] = identity[cell - j:end - j - 1]
+            start = cell + 1
+        self.free.extend(identity[start:])
+
+    def random_free(self, rng, exclude=()):
+        """Sorteia uma célula livre uniformemente, ignorando as células em exclude"""
+        # As células excluídas saem do índice apenas durante o sorteio
+        removed = [cell for cell in exclude if self.free_slot[cell] >= 0]
+        for cell in removed:
+            self._remove_free(cell)
+
+        cell = rng.choice(self.free) if self.free else None
+
+        for removed_cell in removed:
+            self._add_free(removed_cell)
+        return cell
+
+    def _remove_free(self, cell):
+        slot = self.free_slot[cell]
+        last = self.free.pop()
+        if last != cell:
+            self.free[slot] = last
+            self.free_slot[last] = slot
+        self.free_slot[cell] = -1
+
+    def _add_free(self, cell):
+        self.free_slot[cell] = len(self.free)
+        self.free.append(cell)
+
+# Regras da cobra (sem renderização)
+class Snake:
+    __slots__ = ("width", "height", "grid", "positions", "vacated", "direction", "next_direction",
+                 "grow_pending", "is_invincible", "invincibility_end", "speed_modifier", "speed_mod_end")
+
+    def __init__(self, width=GRID_WIDTH, height=GRID_HEIGHT, grid=None):
+        self.width = width
+        self.height = height
+        # Corpo em deque (cabeça à esquerda) e ocupação na grade para consultas O(1)
+        self.grid = grid if grid is not None else Grid(width, height)
+        self.positions = deque()
+        self.reset()
+
+    def reset(self):
+        for position in self.positions:
+            self.grid.vacate(position)
+        self.positions = deque([(self.width // 2, self.height // 2)])
+        self.grid.occupy(self.positions[0])
+        # Células liberadas pelo último movimento (cauda e reduções), para quem desenha por diferença
+        self.vacated = []
+        self.direction = Direction.RIGHT
+        self.next_direction = Direction.RIGHT
+        self.grow_pending = 0
+        self.is_invincible = False
+        self.invincibility_end = 0
+        self.speed_modifier = 1.0
+        self.speed_mod_end = 0
+
+    def clone(self, grid):
+        # Cópia sem renderização, ligada à grade já clonada
+        snake = Snake.__new__(Snake)
+        for name in Snake.__slots__:
+            setattr(snake, name, getattr(self, name))
+        snake.grid = grid
+        snake.positions = deque(self.positions)
+        snake.vacated = self.vacated[:]
+        return snake
+
+    def set_direction(self, direction):
+        # Previne a cobra de virar diretamente para trás
+        if (self.direction == Direction.RIGHT and direction == Direction.LEFT) or \
+           (self.direction == Direction.LEFT and direction == Direction.RIGHT) or \
+           (self.direction == Direction.UP and direction == Direction.DOWN) or \
+           (self.direction == Direction.DOWN and direction == Direction.UP):
+            return
+        self.next_direction = direction
+
+    def move(self):
+        # Atualizar a direção
+        self.direction = self.next_direction
+
+        # Calcular nova posição da cabeça
+        head_x, head_y = self.positions[0]
+        dx, dy = self.direction.value
+        new_head = ((head_x + dx) % self.width, (head_y + dy) % self.height)
+
+        # Mover a cobra
+        self.positions.appendleft(new_head)
+        self.grid.occupy(new_head)
+
+        # Verificar se deve crescer
+        if self.grow_pending > 0:
+            self.grow_pending -= 1
+            self.vacated = []
+        else:
+            tail = self.positions.pop()
+            self.grid.vacate(tail)
+            self.vacated = [tail]
+
+    def grow(self, amount=1):
+        self.grow_pending += amount
+
+    def shrink(self, amount=1):
+        # Impedir que a cobra fique menor que um segmento
+        if len(self.positions) > amount:
+            for _ in range(amount):
+                tail = self.positions.pop()
+                self.grid.vacate(tail)
+                self.vacated.append(tail)
+
+    def check_collision_with_self(self):
+        # Se a cobra está invencível, não há colisão com ela mesma
+        if self.is_invincible:
+            return False
+
+        # A cabeça colide se outro segmento ocupa a mesma célula
+        head_x, head_y = self.positions[0]
+        return self.grid.snake[head_y * self.width + head_x] > 1
+
+    def check_collision_with_walls(self, enable_walls):
+        # Se as paredes estão desativadas ou a cobra está invencível, não há colisão
+        if not enable_walls or self.is_invincible:
+            return False
+
+        head_x, head_y = self.positions[0]
+        return head_x < 0 or head_x >= self.width or head_y < 0 or head_y >= self.height
+
+    def check_collision_with_barriers(self):
+        # Se a cobra está invencível, não há colisão com barreiras
+        if self.is_invincible:
+            return False
+
+        head_x, head_y = self.positions[0]
+        return self.grid.barriers[head_y * self.width + head_x] != 0
+
+    def apply_power_up(self, power_up_type, current_time):
+        if power_up_type == "speed":
+            self.speed_modifier = 1.5
+            self.speed_mod_end = current_time + EFFECT_DURATION
+        elif power_up_type == "slow":
+            self.speed_modifier = 0.5
+            self.speed_mod_end = current_time + EFFECT_DURATION
+        elif power_up_type == "invincible":
+            self.is_invincible = True
+            self.invincibility_end = current_time + EFFECT_DURATION
+        elif power_up_type == "shrink":
+            self.shrink(max(1, len(self.positions) // 2))  # Reduz pela metade
+
+    def update_effects(self, current_time):
+        # Verificar invencibilidade
+        if self.is_invincible and current_time > self.invincibility_end:
+            self.is_invincible = False
+
+        # Verificar modificador de velocidade
+        if current_time > self.speed_mod_end:
+            self.speed_modifier = 1.0
+
+# Regras da comida (sem renderização)
+class Food:
+    __slots__ = ("width", "height", "position")
+
+    def __init__(self, width=GRID_WIDTH, height=GRID_HEIGHT):
+        self.width = width
+        self.height = height
+        self.position = (0, 0)
+
+    def clone(self):
+        food = Food.__new__(Food)
+        food.width = self.width
+        food.height = self.height
+        food.position = self.position
+        return food
+
+    def spawn(self, rng, grid):
+        # Garantir que a comida não apareça onde a cobra ou barreiras estão
+        cell = grid.random_free(rng)
+        if cell is not None:
+            self.position = grid.position(cell)
+
+# Regras dos power-ups (sem renderização)
+class PowerUp:
+    __slots__ = ("width", "height", "position", "active", "type", "spawn_time", "duration")
+
+    def __init__(self, width=GRID_WIDTH, height=GRID_HEIGHT):
+        self.width = width
+        self.height = height
+        self.position = (0, 0)
+        self.active = False
+        self.type = POWER_UP_TYPES[0]
+        self.spawn_time = 0
+        self.duration = POWER_UP_DURATION
+
+    def clone(self):
+        power_up = PowerUp.__new__(PowerUp)
+        for name in PowerUp.__slots__:
+            setattr(power_up, name, getattr(self, name))
+        return power_up
+
+    def spawn(self, rng, current_time, grid, food_position=None):
+        # Garantir que o power-up não apareça onde a cobra, barreiras ou comida estão
+        exclude = (grid.index(food_position),) if food_position else ()
+        cell = grid.random_free(rng, exclude)
+
+        if cell is not None:
+            self.position = grid.position(cell)
+            self.active = True
+            self.spawn_time = current_time
+            self.type = rng.choice(POWER_UP_TYPES)
+
+    def should_despawn(self, current_time):
+        if not self.active:
+            return False
+        return current_time - self.spawn_time > self.duration
+
+# Motor de simulação: aplica as regras do jogo a cada tick de movimento
+class Simulation:
+    __slots__ = ("width", "height", "difficulty", "enable_walls", "clock", "rng", "snake", "grid", "food",
+                 "power_up", "power_up_delay", "power_up_timer", "barriers", "score", "level", "ticks",
+                 "power_ups_taken", "done", "death_cause", "move_delay")
+
+    def __init__(self, difficulty=1, enable_walls=True, width=GRID_WIDTH, height=GRID_HEIGHT,
+                 clock=None, rng=None, seed=None, snake=None, food=None, power_up=None):
+        self.width = width
+        self.height = height
+        self.difficulty = difficulty
+        self.enable_walls = enable_walls
+
+        # Sem relógio injetado, o tempo avança apenas com os ticks da simulação
+        self.clock = clock if clock is not None else TickClock()
+        self.rng = rng if rng is not None else random.Random(seed)
+
+        # Os objetos podem ser injetados (ex.: versões desenháveis do SnakeGame)
+        self.snake = snake if snake is not None else Snake(width, height)
+        self.grid = self.snake.grid
+        self.food = food if food is not None else Food(width, height)
+        self.power_up = power_up if power_up is not None else PowerUp(width, height)
+
+        self.power_up_delay = POWER_UP_DELAY
+        self.reset()
+
+    def reset(self):
+        # Relógios manuais recomeçam do zero: a partida depende só da semente e das ações
+        reset_clock = getattr(self.clock, "reset", None)
+        if reset_clock is not None:
+            reset_clock()
+        self.power_up_timer = self.clock()
+
+        self.snake.reset()
+        self.barriers = []
+        self.grid.clear_barriers()
+        self.food.spawn(self.rng, self.grid)
+        self.power_up.active = False
+        self.score = 0
+        self.level = 1
+        self.ticks = 0
+        self.power_ups_taken = 0
+        self.done = False
+        self.death_cause = None
+        self.move_delay = self.get_move_delay()
+
+    def get_move_delay(self):
+        # Quanto maior o nível, menor o delay (mais rápido)
+        base_delay = 150  # ms
+        difficulty_factor = self.difficulty * 10
+        level_factor = min(self.level * 5, 50)  # Limita o fator de nível a no máximo 50 ms
+
+        delay = base_delay - difficulty_factor - level_factor
+        delay = max(50, delay)  # Garante um delay mínimo de 50ms
+
+        # Aplicar o modificador de velocidade da cobra
+        return delay / self.snake.speed_modifier
+
+    def step(self, action=None):
+        """Executa um tick de movimento e retorna a lista de eventos ocorridos"""
+        if self.done:
+            return []
+
+        if action is not None:
+            self.snake.set_direction(action)
+
+        # Relógios manuais avançam exatamente um intervalo de movimento
+        advance = getattr(self.clock, "advance", None)
+        if advance is not None:
+            advance(self.move_delay)
+        current_time = self.clock()
+
+        events = []
+        self.snake.update_effects(current_time)
+        self.snake.move()
+        self.ticks += 1
+        self.move_delay = self.get_move_delay()
+
+        # Verificar colisões
+        if self.snake.check_collision_with_self():
+            self.death_cause = "self"
+        elif self.snake.check_collision_with_walls(self.enable_walls):
+            self.death_cause = "wall"
+        elif self.snake.check_collision_with_barriers():
+            self.death_cause = "barrier"
+        if self.death_cause is not None:
+            self.done = True
+            events.append("crash")
+            return events
+
+        head = self.snake.positions[0]
+
+        # Verificar se a cobra comeu a comida
+        if head == self.food.position:
+            events.append("eat")
+            self.snake.grow()
+            self.score += 10 * self.level
+
+            # Aumentar o nível a cada 5 comidas
+            if self.score % (5 * 10 * self.level) == 0:
+                self.level += 1
+                events.append("level_up")
+                self.add_barrier()
+
+            self.food.spawn(self.rng, self.grid)
+
+        # Verificar se a cobra pegou um power-up
+        if self.power_up.active and head == self.power_up.position:
+            events.append("power_up")
+            self.power_ups_taken += 1
+
+            if self.power_up.type == "points":
+                self.score += 50  # Bônus de pontos
+            else:
+                self.snake.apply_power_up(self.power_up.type, current_time)
+
+            self.power_up.active = False
+
+        self.update_timers()
+        return events
+
+    def add_barrier(self):
+        # Adicionar uma barreira a cada novo nível, fora da cobra e da comida
+        cell = self.grid.random_free(self.rng, (self.grid.index(self.food.position),))
+        if cell is not None:
+            new_barrier = self.grid.position(cell)
+            self.barriers.append(new_barrier)
+            self.grid.add_barrier(new_barrier)
+
+    def update_timers(self):
+        """Expira efeitos e faz o power-up sumir ou surgir pelo relógio da simulação (chamado por step(),
+        uma vez por tick do passo fixo)"""
+        if self.done:
+            return
+        current_time = self.clock()
+        self.snake.update_effects(current_time)
+
+        # Gerenciar power-ups
+        if self.power_up.active and self.power_up.should_despawn(current_time):
+            self.power_up.active = False
+
+        if not self.power_up.active and current_time - self.power_up_timer > self.power_up_delay:
+            self.power_up.spawn(self.rng, current_time, self.grid, self.food.position)
+            self.power_up_timer = current_time
+
+    def clone(self):
+        """Cópia independente e sem renderização do estado atual (para bots de busca)"""
+        sim = Simulation.__new__(Simulation)
+        for name in Simulation.__slots__:
+            setattr(sim, name, getattr(self, name))
+        # Um relógio manual é copiado; um relógio real continua compartilhado
+        if isinstance(self.clock, TickClock):
+            sim.clock = TickClock(self.clock.start)
+            sim.clock.now = self.clock.now
+        # __new__ evita semear o gerador a partir do sistema antes de copiar o estado
+        sim.rng = type(self.rng).__new__(type(self.rng))
+        sim.rng.setstate(self.rng.getstate())
+        sim.grid = self.grid.clone()
+        sim.snake = self.snake.clone(sim.grid)
+        sim.food = self.food.clone()
+        sim.power_up = self.power_up.clone()
+        sim.barriers = self.barriers[:]
+        return sim
+
+    def snapshot(self):
+        """Serializa o estado completo da partida em um buffer compacto"""
+        snake = self.snake
+        power_up = self.power_up
+        grid = self.grid
+        _, mt_state, gauss_next = self.rng.getstate()
+
+        parts = [
+            SIM_STATE.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, self.width, self.height, self.difficulty,
+                           self.enable_walls, self.clock(), self.score, self.level, self.ticks,
+                           self.power_ups_taken, self.done, DEATH_CAUSES.index(self.death_cause),
+                           self.move_delay, self.power_up_timer),
+            SNAKE_STATE.pack(DIRECTIONS.index(snake.direction), DIRECTIONS.index(snake.next_direction),
+                             snake.grow_pending, snake.is_invincible, snake.invincibility_end,
+                             snake.speed_modifier, snake.speed_mod_end, len(snake.positions)),
+            ITEMS_STATE.pack(self.food.position[0], self.food.position[1], power_up.active,
+                             POWER_UP_TYPES.index(power_up.type), power_up.position[0], power_up.position[1],
+                             power_up.spawn_time, power_up.duration),
+            COUNTS_STATE.pack(len(self.barriers), len(grid.free)),
+            RNG_STATE.pack(*mt_state, gauss_next is not None, gauss_next or 0.0),
+        ]
+
+        width = self.width
+        cells = array(self._cell_typecode(), [y * width + x for x, y in snake.positions])
+        cells.fromlist([y * width + x for x, y in self.barriers])
+        cells.fromlist(grid.free.tolist())
+        if sys.byteorder == "big":
+            cells.byteswap()
+        parts.append(cells.tobytes())
+        return b"".join(parts)
+
+    def restore(self, data):
+        """Restaura em vigor um estado salvo com snapshot()"""
+        offset = 0
+        (magic, version, width, height, difficulty, enable_walls, now, score, level, ticks, power_ups_taken,
+         done, death_cause, move_delay, power_up_timer) = SIM_STATE.unpack_from(data, offset)
+        if magic != SNAPSHOT_MAGIC or version != SNAPSHOT_VERSION:
+            raise ValueError("snapshot inválido")
+        if (width, height) != (self.width, self.height):
+            raise ValueError("snapshot de um tabuleiro com outras dimensões")
+        offset += SIM_STATE.size
+        (direction, next_direction, grow_pending, is_invincible, invincibility_end, speed_modifier,
+         speed_mod_end, length) = SNAKE_STATE.unpack_from(data, offset)
+        offset += SNAKE_STATE.size
+        (food_x, food_y, power_up_active, power_up_type, power_up_x, power_up_y, spawn_time,
+         duration) = ITEMS_STATE.unpack_from(data, offset)
+        offset += ITEMS_STATE.size
+        barrier_count, free_count = COUNTS_STATE.unpack_from(data, offset)
+        offset += COUNTS_STATE.size
+        rng_state = RNG_STATE.unpack_from(data, offset)
+        offset += RNG_STATE.size
+
+        cells = array(self._cell_typecode())
+        cells.frombytes(data[offset:offset + cells.itemsize * (length + barrier_count + free_count)])
+        if sys.byteorder == "big":
+            cells.byteswap()
+        body_cells = cells[:length]
+        barrier_cells = cells[length:length + barrier_count]
+        free_cells = cells[length + barrier_count:]
+
+        # Só um relógio manual pode voltar no tempo
+        if isinstance(self.clock, TickClock):
+            self.clock.now = now
+        self.difficulty = difficulty
+        self.enable_walls = bool(enable_walls)
+        self.score = score
+        self.level = level
+        self.ticks = ticks
+        self.power_ups_taken = power_ups_taken
+        self.done = bool(done)
+        self.death_cause = DEATH_CAUSES[death_cause]
+        self.move_delay = move_delay
+        self.power_up_timer = power_up_timer
+        self.rng.setstate((3, rng_state[:625], rng_state[626] if rng_state[625] else None))
+
+        grid = self.grid
+        grid.load(body_cells, barrier_cells, free_cells)
+        # Uma nova lista de barreiras sinaliza a quem desenha que a camada estática mudou
+        self.barriers = [grid.position(cell) for cell in barrier_cells]
+
+        snake = self.snake
+        snake.positions = deque(grid.position(cell) for cell in body_cells)
+        snake.vacated = []
+        snake.direction = DIRECTIONS[direction]
+        snake.next_direction = DIRECTIONS[next_direction]
+        snake.grow_pending = grow_pending
+        snake.is_invincible = bool(is_invincible)
+        snake.invincibility_end = invincibility_end
+        snake.speed_modifier = speed_modifier
+        snake.speed_mod_end = speed_mod_end
+
+        self.food.position = (food_x, food_y)
+        self.power_up.active = bool(power_up_active)
+        self.power_up.type = POWER_UP_TYPES[power_up_type]
+        self.power_up.position = (power_up_x, power_up_y)
+        self.power_up.spawn_time = spawn_time
+        self.power_up.duration = duration
+
+    def _cell_typecode(self):
+        # Dois bytes por célula bastam para tabuleiros de até 65536 células
+        return "H" if self.width * self.height <= 0x10000 else "I"
@@ -0,0 +1,173 @@
+"""
+Ambiente de aprendizado por reforço do Snake Game, no estilo Gym
+
+Envolve as regras de simulation.py em reset()/step(action) e entrega como
+observação uma grade NumPy de vários canais (corpo, cabeça, comida, tipo do
+power-up, barreiras e tempo restante dos efeitos). A grade não é redesenhada
+a cada passo: só as células que o tick mudou são escritas (a nova cabeça e
+as caudas liberadas por Snake.move, em Snake.vacated, além da comida, do
+power-up e das barreiras quando mudam), então o custo da observação não
+depende do tamanho do tabuleiro nem do comprimento da cobra. A observação é
+sempre o mesmo array, somente leitura; quem precisa guardá-la (um buffer de
+replay, por exemplo) deve copiá-la.
+
+A recompensa é plugável: uma função (sim, eventos, pontos) -> recompensa,
+em que pontos são os do próprio jogo no tick (10 * nível por comida e +50
+pelo power-up de pontos).
+"""
+
+import numpy as np
+
+from simulation import DIRECTIONS, EFFECT_DURATION, GRID_HEIGHT, GRID_WIDTH, POWER_UP_TYPES, Simulation
+
+# Canais da observação
+BODY, HEAD, FOOD, POWER_UP, BARRIERS, EFFECT_TIME = range(6)
+CHANNELS = 6
+
+def score_reward(sim, events, points):
+    """Recompensa padrão: os pontos ganhos no tick, pelas regras do jogo"""
+    return points
+
+def shaped_reward(death_penalty=-100.0, step_cost=0.0, power_up_bonus=0.0):
+    """Pontos do jogo com penalidade pela morte, custo por passo e bônus por qualquer power-up"""
+    def reward(sim, events, points):
+        value = points - step_cost
+        if "crash" in events:
+            value += death_penalty
+        if "power_up" in events:
+            value += power_up_bonus
+        return value
+    return reward
+
+class SnakeEnv:
+    # Ações são índices de DIRECTIONS (-1 ou None mantém a direção), como no VecSnakeEnv
+    action_count = len(DIRECTIONS)
+
+    def __init__(self, difficulty=1, enable_walls=True, width=GRID_WIDTH, height=GRID_HEIGHT, seed=None,
+                 reward=score_reward, max_ticks=None):
+        self.width = width
+        self.height = height
+        self.sim = Simulation(difficulty, enable_walls, width, height, seed=seed)
+        self.reward = reward
+        # Sem limite, o episódio só termina com a morte
+        self.max_ticks = max_ticks
+
+        self._observation = np.zeros((CHANNELS, height, width), dtype=np.float32)
+        # Canais achatados (célula = y * largura + x), a mesma memória da observação
+        self._planes = self._observation.reshape(CHANNELS, width * height)
+        self.observation = self._observation.view()
+        self.observation.flags.writeable = False
+        self.observation_shape = self._observation.shape
+        self.sync()
+
+    def reset(self, seed=None):
+        """Começa um novo episódio e retorna a observação"""
+        if seed is not None:
+            self.sim.rng.seed(seed)
+        self.sim.reset()
+        self.sync()
+        return self.observation
+
+    def sync(self):
+        """Refaz a observação inteira a partir da simulação (no reset ou depois de alterá-la por fora)"""
+        sim = self.sim
+        grid = sim.grid
+        planes = self._planes
+        self._observation.fill(0.0)
+        planes[BODY] = np.frombuffer(grid.snake, dtype=np.uint8) != 0
+        planes[BARRIERS] = np.frombuffer(grid.barriers, dtype=np.uint8)
+        self.barriers = sim.barriers
+        self.barrier_count = len(sim.barriers)
+
+        self.head = self.cell(sim.snake.positions[0])
+        planes[HEAD, self.head] = 1.0
+        planes[EFFECT_TIME, self.head] = self.effect_time()
+        self.food = self.cell(sim.food.position)
+        planes[FOOD, self.food] = 1.0
+        self.power_up = self.power_up_key()
+        if self.power_up is not None:
+            planes[POWER_UP, self.power_up[0]] = self.power_up[1]
+
+    def cell(self, position):
+        return position[1] * self.width + position[0]
+
+    def effect_time(self):
+        # Fração restante do efeito mais longo em vigor (invencibilidade ou modificador de velocidade)
+        snake = self.sim.snake
+        now = self.sim.clock()
+        remaining = 0.0
+        if snake.is_invincible:
+            remaining = snake.invincibility_end - now
+        if snake.speed_modifier != 1.0:
+            remaining = max(remaining, snake.speed_mod_end - now)
+        return min(1.0, max(0.0, remaining / EFFECT_DURATION))
+
+    def power_up_key(self):
+        # Célula e valor do power-up no canal: (índice do tipo + 1) / quantidade de tipos
+        power_up = self.sim.power_up
+        if not power_up.active:
+            return None
+        return (self.cell(power_up.position), (POWER_UP_TYPES.index(power_up.type) + 1) / len(POWER_UP_TYPES))
+
+    def step(self, action=None):
+        """Avança um tick e retorna (observação, recompensa, terminou, info)"""
+        sim = self.sim
+        score = sim.score
+        events = sim.step(DIRECTIONS[action] if action is not None and action >= 0 else None)
+        self.update()
+
+        points = sim.score - score
+        done = sim.done or (self.max_ticks is not None and sim.ticks >= self.max_ticks)
+        info = {
+            "events": events,
+            "score": sim.score,
+            "level": sim.level,
+            "ticks": sim.ticks,
+            "death_cause": sim.death_cause,
+        }
+        return self.observation, self.reward(sim, events, points), done, info
+
+    def update(self):
+        # Só as células que o tick mudou
+        sim = self.sim
+        planes = self._planes
+        width = self.width
+
+        if sim.barriers is not self.barriers or len(sim.barriers) < self.barrier_count:
+            self.sync()
+            return
+        for x, y in sim.barriers[self.barrier_count:]:
+            planes[BARRIERS, y * width + x] = 1.0
+        self.barrier_count = len(sim.barriers)
+
+        snake = sim.snake
+        body = planes[BODY]
+        counts = sim.grid.snake
+        x, y = snake.positions[0]
+        head = y * width + x
+        body[head] = 1.0
+        # Caudas liberadas pelo movimento (e por uma redução); com invencibilidade a célula pode continuar ocupada
+        for x, y in snake.vacated:
+            cell = y * width + x
+            if not counts[cell]:
+                body[cell] = 0.0
+
+        planes[HEAD, self.head] = 0.0
+        planes[EFFECT_TIME, self.head] = 0.0
+        planes[HEAD, head] = 1.0
+        planes[EFFECT_TIME, head] = self.effect_time()
+        self.head = head
+
+        food = self.cell(sim.food.position)
+        if food != self.food:
+            planes[FOOD, self.food] = 0.0
+            planes[FOOD, food] = 1.0
+            self.food = food
+
+        power_up = self.power_up_key()
+        if power_up != self.power_up:
+            if self.power_up is not None:
+                planes[POWER_UP, self.power_up[0]] = 0.0
+            if power_up is not None:
+                planes[POWER_UP, power_up[0]] = power_up[1]
+            self.power_up = power_up
@@ -4,11 +4,23 @@ import random
 import os
 import json
 import math
+import time
+from collections import OrderedDict
 from enum import Enum
 
-# Inicialização do Pygame
-pygame.init()
-pygame.mixer.init()
+import persistence
+import simulation
+from simulation import Direction
+from scheduler import FixedStepScheduler
+from replay import Replay, new_seed
+from scores import ScoreStore
+from autopilot import Autopilot
+from arena import Arena
+from state_codec import StateDecoder
+
+# Inicialização do Pygame (o mixer só é aberto quando o primeiro som for necessário)
+pygame.display.init()
+pygame.font.init()
 
 # Constantes do jogo
 SCREEN_WIDTH = 800
@@ -17,14 +29,25 @@ GRID_SIZE = 20
 GRID_WIDTH = SCREEN_WIDTH // GRID_SIZE
 GRID_HEIGHT = SCREEN_HEIGHT // GRID_SIZE
 FPS = 60
+# Linhas por página na tela de recordes e os períodos que ela pode filtrar (em segundos)
+HIGH_SCORES_PAGE = 10
+HIGH_SCORE_PERIODS = [("Sempre", None), ("30 dias", 30 * 86400), ("7 dias", 7 * 86400), ("24 horas", 86400)]
+# Acima deste número de células o piloto automático fica desativado (a busca percorre o tabuleiro todo)
+AUTOPILOT_MAX_CELLS = 160 * 120
+# Sem um número de bots pedido, a arena tem um bot a cada tantas células do tabuleiro, até um limite
+# (mais bots só com um número explícito: run_game.py --arena BOTS)
+ARENA_CELLS_PER_BOT = 100
+ARENA_MAX_DEFAULT_BOTS = 200
 
-# Enums
-class Direction(Enum):
-    RIGHT = (1, 0)
-    LEFT = (-1, 0)
-    UP = (0, -1)
-    DOWN = (0, 1)
+# Setas do teclado e as direções correspondentes
+ARROW_DIRECTIONS = {
+    pygame.K_UP: Direction.UP,
+    pygame.K_DOWN: Direction.DOWN,
+    pygame.K_LEFT: Direction.LEFT,
+    pygame.K_RIGHT: Direction.RIGHT,
+}
 
+# Enums
 class GameState(Enum):
     MENU = 0
     PLAYING = 1
@@ -49,18 +72,30 @@ class Colors:
     CYAN = (0, 255, 255)
     
     BACKGROUND = (240, 248, 255)  # AliceBlue
+    
+    # Cores (corpo, cabeça) das cobras dos bots na arena
+    ARENA_SNAKES = [
+        ((70, 130, 180), (25, 60, 110)),
+        ((220, 20, 60), (120, 0, 30)),
+        ((255, 140, 0), (150, 70, 0)),
+        ((147, 112, 219), (75, 45, 130)),
+        ((0, 139, 139), (0, 70, 70)),
+        ((199, 21, 133), (110, 0, 70)),
+        ((184, 134, 11), (100, 70, 0)),
+        ((105, 105, 105), (40, 40, 40)),
+    ]
     GRID_LIGHT = (220, 220, 220)
     GRID_DARK = (200, 200, 200)
     
     @staticmethod
-    def get_random_color():
-        return (random.randint(50, 200), random.randint(50, 200), random.randint(50, 200))
+    def get_random_color(rng=random):
+        # Durante a partida, passe o gerador da simulação para manter o replay determinístico
+        return (rng.randint(50, 200), rng.randint(50, 200), rng.randint(50, 200))
 
 # Classe para carregar e gerenciar recursos
 class AssetManager:
     def __init__(self):
         self.images = {}
-        self.sounds = {}
         self.fonts = {}
         
         # Caminhos para arquivos de recursos
@@ -75,46 +110,126 @@ class AssetManager:
         self.fonts["medium"] = pygame.font.Font(None, 36)
         self.fonts["large"] = pygame.font.Font(None, 72)
         
-        # Tentar carregar sons
+        # Sprites da cobra, comida e power-ups gerados uma única vez
+        self.sprites = SpriteAtlas(GRID_SIZE)
+        
+        # Cache LRU de textos renderizados, chaveado por (fonte, texto, cor, antialias)
+        self.text_cache = OrderedDict()
+        self.text_cache_size = 256
+        self.text_cache_hits = 0
+        self.text_cache_misses = 0
+        
+        # Os sons são sintetizados sob demanda (ver load_sounds)
+        self.sound_bank = None
+        self.sounds_loaded = False
+    
+    def load_sounds(self):
+        # Inicializar o mixer e sintetizar os sons apenas uma vez, sem ler nada do disco
+        if self.sounds_loaded:
+            return
+        self.sounds_loaded = True
+        
         try:
-            self.sounds["eat"] = pygame.mixer.Sound(os.path.join(self.assets_dir, "eat.wav"))
-            self.sounds["crash"] = pygame.mixer.Sound(os.path.join(self.assets_dir, "crash.wav"))
-            self.sounds["powerup"] = pygame.mixer.Sound(os.path.join(self.assets_dir, "powerup.wav"))
-        except:
-            print("Alguns sons não puderam ser carregados. O jogo continuará sem áudio.")
+            # O NumPy só é importado aqui, quando o primeiro som é necessário
+            from sound_bank import SoundBank
+            if not pygame.mixer.get_init():
+                pygame.mixer.init()
+            self.sound_bank = SoundBank()
+        except (pygame.error, ImportError) as e:
+            print(f"Os sons não puderam ser gerados ({e}). O jogo continuará sem áudio.")
     
     def get_font(self, size):
         return self.fonts.get(size, self.fonts["medium"])
     
+    def render_text(self, size, text, color, antialias=True):
+        key = (size, text, color, antialias)
+        surface = self.text_cache.get(key)
+        if surface is not None:
+            self.text_cache_hits += 1
+            self.text_cache.move_to_end(key)
+            return surface
+        
+        self.text_cache_misses += 1
+        surface = self.get_font(size).render(text, antialias, color)
+        self.text_cache[key] = surface
+        if len(self.text_cache) > self.text_cache_size:
+            self.text_cache.popitem(last=False)
+        return surface
+    
     def play_sound(self, sound_name):
-        if sound_name in self.sounds:
-            self.sounds[sound_name].play()
+        self.load_sounds()
+        if self.sound_bank is not None:
+            self.sound_bank.play(sound_name)
 
 # Classe para gerenciar as configurações do jogo
 class GameSettings:
-    def __init__(self):
+    def __init__(self, writer=None, directory=None):
         self.difficulty = 1  # 1-5, afeta a velocidade
         self.sound_enabled = True
         self.music_enabled = True
         self.grid_enabled = True
         self.enable_walls = True
-        self.high_scores = []
         
-        self.load_settings()
+        # Configurações e recordes em arquivos separados: settings.json é substituído por inteiro
+        # (de forma atômica) e as pontuações vão para um banco SQLite. As gravações são feitas em
+        # segundo plano para não travar o quadro. Por padrão ficam ao lado do jogo.
+        directory = directory if directory is not None else os.path.dirname(__file__)
+        self.settings_path = os.path.join(directory, "settings.json")
+        self.scores_path = os.path.join(directory, "scores.db")
+        self.writer = writer if writer is not None else persistence.shared_writer()
+        
+        legacy_scores = self.load_settings()
+        self.scores = ScoreStore(self.scores_path, self.writer)
+        # Recordes de versões anteriores (settings.json e o log scores.jsonl) entram no banco uma única vez
+        if self.scores.is_empty():
+            legacy_scores = legacy_scores + self.load_score_log(os.path.join(directory, "scores.jsonl"))
+            if legacy_scores:
+                self.scores.import_entries(legacy_scores)
+        # O cache dos melhores de todos os modos é montado já na inicialização, e não no fim de uma partida
+        self.scores.cache()
     
     def load_settings(self):
+        # Retorna os recordes gravados no settings.json por versões anteriores (para migrá-los)
         try:
-            with open(os.path.join(os.path.dirname(__file__), "settings.json"), "r") as f:
+            with open(self.settings_path, "r") as f:
                 data = json.load(f)
-                self.difficulty = data.get("difficulty", 1)
-                self.sound_enabled = data.get("sound_enabled", True)
-                self.music_enabled = data.get("music_enabled", True)
-                self.grid_enabled = data.get("grid_enabled", True)
-                self.enable_walls = data.get("enable_walls", True)
-                self.high_scores = data.get("high_scores", [])
-        except:
-            # Se o arquivo não existir ou estiver corrompido, use as configurações padrão
+        except FileNotFoundError:
+            return []
+        except (OSError, ValueError) as e:
+            # Se o arquivo estiver corrompido, use as configurações padrão, mas avise e guarde o arquivo
+            print(f"Configurações ilegíveis ({e}). Usando as configurações padrão.")
+            try:
+                os.replace(self.settings_path, self.settings_path + ".corrompido")
+            except OSError:
+                pass
+            return []
+        
+        self.difficulty = data.get("difficulty", 1)
+        self.sound_enabled = data.get("sound_enabled", True)
+        self.music_enabled = data.get("music_enabled", True)
+        self.grid_enabled = data.get("grid_enabled", True)
+        self.enable_walls = data.get("enable_walls", True)
+        return data.get("high_scores", [])
+    
+    @staticmethod
+    def load_score_log(path):
+        # Linhas JSON do log de pontuações antigo; uma linha incompleta é ignorada
+        entries = []
+        try:
+            with open(path, "rb") as f:
+                for line in f:
+                    try:
+                        entries.append(json.loads(line))
+                    except ValueError:
+                        continue
+        except OSError:
             pass
+        return entries
+    
+    @property
+    def high_scores(self):
+        # Os 10 melhores de todos os modos (do cache em memória)
+        return self.scores.top(10)
     
     def save_settings(self):
         data = {
@@ -122,44 +237,42 @@ class GameSettings:
             "sound_enabled": self.sound_enabled,
             "music_enabled": self.music_enabled,
             "grid_enabled": self.grid_enabled,
-            "enable_walls": self.enable_walls,
-            "high_scores": self.high_scores
+            "enable_walls": self.enable_walls
         }
-        
-        try:
-            with open(os.path.join(os.path.dirname(__file__), "settings.json"), "w") as f:
-                json.dump(data, f)
-        except:
-            print("Não foi possível salvar as configurações.")
-    
-    def add_score(self, name, score, level):
-        self.high_scores.append({"name": name, "score": score, "level": level, "date": pygame.time.get_ticks()})
-        self.high_scores.sort(key=lambda x: x["score"], reverse=True)
-        if len(self.high_scores) > 10:  # Manter apenas os 10 melhores
-            self.high_scores = self.high_scores[:10]
-        self.save_settings()
+        self.writer.replace(self.settings_path, json.dumps(data).encode("utf-8"))
+    
+    def add_score(self, name, score, level, replay=None, difficulty=None, enable_walls=None):
+        # Toda pontuação é guardada; retorna a entrada se ela ficou entre os 10 melhores (ou None)
+        difficulty = difficulty if difficulty is not None else self.difficulty
+        enable_walls = enable_walls if enable_walls is not None else self.enable_walls
+        entry = self.scores.add(name, score, level, difficulty, enable_walls, replay)
+        return entry if any(kept is entry for kept in self.high_scores) else None
+    
+    def flush(self, timeout=5.0):
+        # Espera as gravações pendentes (ao sair do jogo)
+        return self.writer.flush(timeout)
 
 # Classe para o menu principal
 class MainMenu:
-    def __init__(self, screen, assets, settings):
+    def __init__(self, screen, assets, settings, autopilot=True):
         self.screen = screen
         self.assets = assets
         self.settings = settings
         self.selected_option = 0
-        self.options = ["Jogar", "Opções", "Recordes", "Sair"]
+        self.options = ["Jogar", "Piloto automático", "Arena", "Opções", "Recordes", "Sair"]
+        if not autopilot:
+            self.options.remove("Piloto automático")
         self.background_color = Colors.BACKGROUND
         
     def draw(self):
         self.screen.fill(self.background_color)
         
         # Título do jogo
-        title_font = self.assets.get_font("large")
-        title = title_font.render("Snake Game", True, Colors.DARK_GREEN)
+        title = self.assets.render_text("large", "Snake Game", Colors.DARK_GREEN)
         self.screen.blit(title, (SCREEN_WIDTH // 2 - title.get_width() // 2, 100))
         
         # Opções do menu
         for i, option in enumerate(self.options):
-            font = self.assets.get_font("medium")
             if i == self.selected_option:
                 color = Colors.GREEN
                 text = f"> {option} <"
@@ -167,12 +280,11 @@ class MainMenu:
                 color = Colors.BLACK
                 text = option
                 
-            rendered_text = font.render(text, True, color)
+            rendered_text = self.assets.render_text("medium", text, color)
             self.screen.blit(rendered_text, (SCREEN_WIDTH // 2 - rendered_text.get_width() // 2, 250 + i * 50))
         
         # Rodapé
-        footer_font = self.assets.get_font("small")
-        footer = footer_font.render("© 2025 Marco - Portfólio", True, Colors.GREY)
+        footer = self.assets.render_text("small", "© 2025 Marco - Portfólio", Colors.GREY)
         self.screen.blit(footer, (SCREEN_WIDTH - footer.get_width() - 10, SCREEN_HEIGHT - footer.get_height() - 10))
         
     def handle_event(self, event):
@@ -186,344 +298,882 @@ class MainMenu:
         return None
 
 # Classe para a comida
-class Food:
-    def __init__(self, assets):
+class Food(simulation.Food):
+    def __init__(self, assets, width=GRID_WIDTH, height=GRID_HEIGHT):
+        super().__init__(width, height)
         self.assets = assets
-        self.position = (0, 0)
         self.color = Colors.RED
-        self.spawn()
-        
-    def spawn(self, snake_positions=None, barriers=None):
-        if snake_positions is None:
-            snake_positions = []
-        if barriers is None:
-            barriers = []
-        
-        # Garantir que a comida não apareça onde a cobra ou barreiras estão
-        valid_positions = [(x, y) for x in range(GRID_WIDTH) for y in range(GRID_HEIGHT) 
-                           if (x, y) not in snake_positions and (x, y) not in barriers]
-        
-        if valid_positions:
-            self.position = random.choice(valid_positions)
     
-    def draw(self, screen):
-        pygame.draw.rect(screen, self.color, (self.position[0] * GRID_SIZE, self.position[1] * GRID_SIZE, GRID_SIZE, GRID_SIZE))
-        
-        # Desenhar um brilho para tornar a comida mais atrativa
-        inner_rect = (self.position[0] * GRID_SIZE + 4, self.position[1] * GRID_SIZE + 4, GRID_SIZE - 8, GRID_SIZE - 8)
-        pygame.draw.rect(screen, Colors.YELLOW, inner_rect)
+    def draw(self, screen, cell=None):
+        # cell: célula da tela onde desenhar (com câmera); por padrão, a posição no tabuleiro
+        x, y = cell if cell is not None else self.position
+        sheet, area = self.assets.sprites.food
+        screen.blit(sheet, (x * GRID_SIZE, y * GRID_SIZE), area)
 
 # Classe para power-ups
-class PowerUp:
-    def __init__(self, assets):
+class PowerUp(simulation.PowerUp):
+    def __init__(self, assets, width=GRID_WIDTH, height=GRID_HEIGHT):
+        super().__init__(width, height)
         self.assets = assets
-        self.position = (0, 0)
-        self.active = False
-        self.type = random.choice(["speed", "slow", "points", "invincible", "shrink"])
-        self.color = self.get_color_for_type()
-        self.spawn_time = 0
-        self.duration = 10000  # 10 segundos em milissegundos
-        
+    
+    @property
+    def color(self):
+        return self.color_for_type(self.type)
+    
     def get_color_for_type(self):
-        if self.type == "speed":
+        return self.color_for_type(self.type)
+    
+    @staticmethod
+    def color_for_type(power_up_type):
+        if power_up_type == "speed":
             return Colors.YELLOW
-        elif self.type == "slow":
+        elif power_up_type == "slow":
             return Colors.BLUE
-        elif self.type == "points":
+        elif power_up_type == "points":
             return Colors.PURPLE
-        elif self.type == "invincible":
+        elif power_up_type == "invincible":
             return Colors.CYAN
-        elif self.type == "shrink":
+        elif power_up_type == "shrink":
             return Colors.ORANGE
         return Colors.WHITE
-        
-    def spawn(self, snake_positions=None, barriers=None, food_position=None):
-        if snake_positions is None:
-            snake_positions = []
-        if barriers is None:
-            barriers = []
-        
-        # Garantir que o power-up não apareça onde a cobra, barreiras ou comida estão
-        forbidden_positions = snake_positions + barriers
-        if food_position:
-            forbidden_positions.append(food_position)
-            
-        valid_positions = [(x, y) for x in range(GRID_WIDTH) for y in range(GRID_HEIGHT) 
-                           if (x, y) not in forbidden_positions]
-        
-        if valid_positions:
-            self.position = random.choice(valid_positions)
-            self.active = True
-            self.spawn_time = pygame.time.get_ticks()
-            self.type = random.choice(["speed", "slow", "points", "invincible", "shrink"])
-            self.color = self.get_color_for_type()
-    
-    def should_despawn(self):
-        if not self.active:
-            return False
-        return pygame.time.get_ticks() - self.spawn_time > self.duration
     
-    def draw(self, screen):
+    def draw(self, screen, current_time, cell=None):
         if self.active:
-            # Desenhar o Power-Up com um efeito pulsante
-            time_alive = pygame.time.get_ticks() - self.spawn_time
-            pulse = abs(math.sin(time_alive / 300)) * 0.5 + 0.5  # Efeito de pulsação
-            
-            size_mod = int(GRID_SIZE * (0.8 + 0.2 * pulse))
-            offset = (GRID_SIZE - size_mod) // 2
-            
-            rect = (self.position[0] * GRID_SIZE + offset, 
-                    self.position[1] * GRID_SIZE + offset, 
-                    size_mod, size_mod)
-            
-            pygame.draw.rect(screen, self.color, rect)
-            
-            # Ícone para o tipo de power-up
-            inner_rect = (self.position[0] * GRID_SIZE + GRID_SIZE // 4, 
-                          self.position[1] * GRID_SIZE + GRID_SIZE // 4, 
-                          GRID_SIZE // 2, GRID_SIZE // 2)
-            
-            pygame.draw.rect(screen, Colors.WHITE, inner_rect)
-            
-            # Tempo restante como barra de progresso circular
-            time_left = 1.0 - (pygame.time.get_ticks() - self.spawn_time) / self.duration
-            pygame.draw.arc(screen, self.color, 
-                           (self.position[0] * GRID_SIZE, self.position[1] * GRID_SIZE, GRID_SIZE, GRID_SIZE),
-                           0, time_left * 2 * math.pi, 2)
+            # Power-up pulsante com o contador de tempo restante, ambos pré-renderizados no atlas
+            (sheet, area), (timer_sheet, timer_area) = self.assets.sprites.power_up_frames(
+                self.type, current_time - self.spawn_time, self.duration)
+            x, y = cell if cell is not None else self.position
+            position = (x * GRID_SIZE, y * GRID_SIZE)
+            screen.blits([(sheet, position, area), (timer_sheet, position, timer_area)], False)
 
 # Classe para a cobra
-class Snake:
-    def __init__(self, assets):
+class Snake(simulation.Snake):
+    def __init__(self, assets, width=GRID_WIDTH, height=GRID_HEIGHT):
+        super().__init__(width, height)
         self.assets = assets
-        self.positions = [(GRID_WIDTH // 2, GRID_HEIGHT // 2)]
-        self.direction = Direction.RIGHT
-        self.next_direction = Direction.RIGHT
-        self.grow_pending = 0
         self.color = Colors.GREEN
         self.head_color = Colors.DARK_GREEN
-        self.is_invincible = False
-        self.invincibility_end = 0
-        self.speed_modifier = 1.0
-        self.speed_mod_end = 0
-        
-    def reset(self):
-        self.positions = [(GRID_WIDTH // 2, GRID_HEIGHT // 2)]
-        self.direction = Direction.RIGHT
-        self.next_direction = Direction.RIGHT
-        self.grow_pending = 0
-        self.is_invincible = False
-        self.invincibility_end = 0
-        self.speed_modifier = 1.0
-        self.speed_mod_end = 0
-    
-    def set_direction(self, direction):
-        # Previne a cobra de virar diretamente para trás
-        if (self.direction == Direction.RIGHT and direction == Direction.LEFT) or \
-           (self.direction == Direction.LEFT and direction == Direction.RIGHT) or \
-           (self.direction == Direction.UP and direction == Direction.DOWN) or \
-           (self.direction == Direction.DOWN and direction == Direction.UP):
-            return
-        self.next_direction = direction
     
-    def move(self):
-        # Atualizar a direção
-        self.direction = self.next_direction
+    def draw(self, screen, current_time, alpha=None):
+        # Com alpha, cada segmento é desenhado entre a posição anterior e a atual
+        if alpha is not None:
+            positions = self.interpolated_positions(alpha)
+        else:
+            positions = self.positions
         
-        # Calcular nova posição da cabeça
-        head_x, head_y = self.positions[0]
-        dx, dy = self.direction.value
-        new_head = ((head_x + dx) % GRID_WIDTH, (head_y + dy) % GRID_HEIGHT)
+        # Se invencível, usar o quadro do pulso correspondente ao instante atual
+        frame = SpriteAtlas.pulse_frame(current_time) if self.is_invincible else -1
+        body, heads = self.assets.sprites.snake(self.color, self.head_color)
         
-        # Mover a cobra
-        self.positions.insert(0, new_head)
+        # Todo o corpo em um único lote de blits (a cabeça, com cor diferente, vai primeiro)
+        head_sheet, head_area = heads[self.direction][frame]
+        body_sheet, body_area = body[frame]
+        screen.blits([(head_sheet, (x * GRID_SIZE, y * GRID_SIZE), head_area) if i == 0 else
+                      (body_sheet, (x * GRID_SIZE, y * GRID_SIZE), body_area)
+                      for i, (x, y) in enumerate(positions)], False)
+    
+    def interpolated_positions(self, alpha):
+        # No último tick, o segmento i saiu de onde o segmento i + 1 está agora
+        # (o último saiu da cauda removida, se houve uma)
+        previous = list(self.positions)[1:]
+        previous.append(self.vacated[0] if self.vacated else self.positions[-1])
         
-        # Verificar se deve crescer
-        if self.grow_pending > 0:
-            self.grow_pending -= 1
+        positions = []
+        for (x, y), (prev_x, prev_y) in zip(self.positions, previous):
+            # Ao atravessar a borda do tabuleiro o segmento não é interpolado
+            if abs(x - prev_x) + abs(y - prev_y) == 1:
+                x = prev_x + (x - prev_x) * alpha
+                y = prev_y + (y - prev_y) * alpha
+            positions.append((x, y))
+        return positions
+    
+    def draw_cells(self, screen, current_time, cells, head=None):
+        # Desenha segmentos em células da tela já conhecidas (câmera): o corpo em um lote e a cabeça por cima
+        frame = SpriteAtlas.pulse_frame(current_time) if self.is_invincible else -1
+        body, heads = self.assets.sprites.snake(self.color, self.head_color)
+        body_sheet, body_area = body[frame]
+        screen.blits([(body_sheet, (x * GRID_SIZE, y * GRID_SIZE), body_area) for x, y in cells], False)
+        if head is not None:
+            head_sheet, head_area = heads[self.direction][frame]
+            screen.blit(head_sheet, (head[0] * GRID_SIZE, head[1] * GRID_SIZE), head_area)
+    
+    def draw_segment(self, screen, x, y, is_head):
+        body, heads = self.assets.sprites.snake(self.color, self.head_color)
+        sheet, area = heads[self.direction][-1] if is_head else body[-1]
+        screen.blit(sheet, (x * GRID_SIZE, y * GRID_SIZE), area)
+
+# Quadros pré-renderizados para efeitos animados
+PULSE_FRAMES = 16
+TIMER_FRAMES = 32
+
+# Atlas de sprites gerado uma vez: cada segmento, comida ou power-up vira um único blit.
+# Cada sprite é um par (folha, área); os quadros de um mesmo grupo dividem uma folha.
+class SpriteAtlas:
+    def __init__(self, cell_size, target=None):
+        self.cell_size = cell_size
+        # Superfície cujo formato de pixel os sprites opacos devem ter (por padrão, o da tela)
+        self.target = target
+        self.snakes = {}
+        self.food = self.pack([self.draw_food()])[0]
+        self.power_ups = {}
+        self.timers = {}
+        for power_up_type in simulation.POWER_UP_TYPES:
+            color = PowerUp.color_for_type(power_up_type)
+            sizes = range(int(cell_size * 0.9), cell_size + 1)
+            frames = self.pack([self.draw_power_up(color, size_mod) for size_mod in sizes], alpha=True)
+            self.power_ups[power_up_type] = dict(zip(sizes, frames))
+            self.timers[power_up_type] = self.pack([self.draw_timer(color, frame) for frame in range(TIMER_FRAMES + 1)],
+                                                   alpha=True)
+    
+    def new_surface(self, width, height, alpha=False):
+        # Converter para o formato da tela quando houver uma (o blit fica bem mais barato)
+        if alpha:
+            surface = pygame.Surface((width, height), pygame.SRCALPHA)
+            return surface.convert_alpha() if pygame.display.get_surface() else surface
+        surface = pygame.Surface((width, height))
+        if self.target is not None:
+            return surface.convert(self.target)
+        return surface.convert() if pygame.display.get_surface() else surface
+    
+    def pack(self, surfaces, alpha=False):
+        # A largura ímpar deixa o pitch da folha desalinhado de 16 bytes: o SDL então copia com memcpy
+        # comum em vez das escritas SSE não temporais, muito lentas para blits pequenos repetidos
+        size = self.cell_size
+        sheet = self.new_surface(len(surfaces) * size + 1, size, alpha)
+        sprites = []
+        for i, surface in enumerate(surfaces):
+            sheet.blit(surface, (i * size, 0))
+            sprites.append((sheet, pygame.Rect(i * size, 0, size, size)))
+        return sprites
+    
+    def snake(self, color, head_color):
+        # Quadros do corpo e da cabeça (por direção) para cada intensidade do pulso de invencibilidade;
+        # o último quadro tem a cor original
+        key = (color, head_color)
+        if key not in self.snakes:
+            factors = [0.5 + 0.5 * frame / (PULSE_FRAMES - 1) for frame in range(PULSE_FRAMES)]
+            body = self.pack([self.draw_segment(self.tint(color, factor)) for factor in factors])
+            heads = {direction: self.pack([self.draw_segment(self.tint(head_color, factor), direction)
+                                           for factor in factors])
+                     for direction in Direction}
+            self.snakes[key] = (body, heads)
+        return self.snakes[key]
+    
+    @staticmethod
+    def tint(color, factor):
+        return (int(color[0] * factor), int(color[1] * factor), int(color[2] * factor))
+    
+    @staticmethod
+    def pulse_frame(current_time):
+        pulse = abs(math.sin(current_time / 100))
+        return round(pulse * (PULSE_FRAMES - 1))
+    
+    def power_up_frames(self, power_up_type, time_alive, duration):
+        # Sprites do pulso e do contador de tempo restante de um power-up com time_alive ms de vida
+        pulse = abs(math.sin(time_alive / 300)) * 0.5 + 0.5  # Efeito de pulsação
+        size_mod = int(self.cell_size * (0.8 + 0.2 * pulse))
+        time_left = 1.0 - time_alive / duration
+        timer_frame = min(TIMER_FRAMES, max(0, math.ceil(time_left * TIMER_FRAMES)))
+        return self.power_ups[power_up_type][size_mod], self.timers[power_up_type][timer_frame]
+    
+    def draw_segment(self, color, direction=None):
+        # Segmento com borda para dar efeito 3D; a cabeça ganha os olhos voltados para a direção
+        size = self.cell_size
+        surface = self.new_surface(size, size)
+        surface.fill(Colors.BLACK)
+        pygame.draw.rect(surface, color, (1, 1, size - 2, size - 2))
+        
+        if direction == Direction.RIGHT:
+            eye_positions = [(size - 5, 5), (size - 5, size - 5)]
+        elif direction == Direction.LEFT:
+            eye_positions = [(5, 5), (5, size - 5)]
+        elif direction == Direction.UP:
+            eye_positions = [(5, 5), (size - 5, 5)]
+        elif direction == Direction.DOWN:
+            eye_positions = [(5, size - 5), (size - 5, size - 5)]
         else:
-            self.positions.pop()
+            eye_positions = []
+        for eye_pos in eye_positions:
+            pygame.draw.circle(surface, Colors.WHITE, eye_pos, 2)
+        return surface
     
-    def grow(self, amount=1):
-        self.grow_pending += amount
+    def draw_food(self):
+        # Comida com um brilho para torná-la mais atrativa
+        size = self.cell_size
+        surface = self.new_surface(size, size)
+        surface.fill(Colors.RED)
+        pygame.draw.rect(surface, Colors.YELLOW, (4, 4, size - 8, size - 8))
+        return surface
     
-    def shrink(self, amount=1):
-        # Impedir que a cobra fique menor que um segmento
-        if len(self.positions) > amount:
-            for _ in range(amount):
-                self.positions.pop()
+    def draw_power_up(self, color, size_mod):
+        # Um quadro para cada tamanho que o pulso do power-up pode assumir
+        size = self.cell_size
+        surface = self.new_surface(size, size, alpha=True)
+        offset = (size - size_mod) // 2
+        pygame.draw.rect(surface, color, (offset, offset, size_mod, size_mod))
+        # Ícone para o tipo de power-up
+        pygame.draw.rect(surface, Colors.WHITE, (size // 4, size // 4, size // 2, size // 2))
+        return surface
     
-    def check_collision_with_self(self):
-        # Se a cobra está invencível, não há colisão com ela mesma
-        if self.is_invincible:
-            return False
-            
-        # Verificar se a cabeça colide com qualquer parte do corpo
-        return self.positions[0] in self.positions[1:]
+    def draw_timer(self, color, frame):
+        # Tempo restante como barra de progresso circular, em TIMER_FRAMES passos
+        surface = self.new_surface(self.cell_size, self.cell_size, alpha=True)
+        if frame:
+            pygame.draw.arc(surface, color, (0, 0, self.cell_size, self.cell_size),
+                            0, frame / TIMER_FRAMES * 2 * math.pi, 2)
+        return surface
+
+# Camada estática (fundo, grade e barreiras) pré-renderizada fora da tela
+class StaticLayer:
+    def __init__(self, width, height):
+        self.grid_surface = pygame.Surface((width, height)).convert()
+        self.surface = pygame.Surface((width, height)).convert()
+        self.grid_enabled = None
+        self.barriers = None
+        self.barrier_count = 0
     
-    def check_collision_with_walls(self, enable_walls):
-        # Se as paredes estão desativadas ou a cobra está invencível, não há colisão
-        if not enable_walls or self.is_invincible:
-            return False
-            
-        head_x, head_y = self.positions[0]
-        return head_x < 0 or head_x >= GRID_WIDTH or head_y < 0 or head_y >= GRID_HEIGHT
+    def update(self, grid_enabled, barriers):
+        # Redesenhar a grade apenas quando a opção muda
+        if grid_enabled != self.grid_enabled:
+            self.grid_enabled = grid_enabled
+            self.draw_grid()
+            self.barriers = None
+        
+        # Uma nova partida troca a lista de barreiras: recomeçar a partir da grade
+        if barriers is not self.barriers or len(barriers) < self.barrier_count:
+            self.surface.blit(self.grid_surface, (0, 0))
+            self.barriers = barriers
+            self.barrier_count = 0
+        
+        # Desenhar apenas as barreiras adicionadas desde o último quadro
+        for barrier in barriers[self.barrier_count:]:
+            pygame.draw.rect(self.surface, Colors.GREY, 
+                           (barrier[0] * GRID_SIZE, barrier[1] * GRID_SIZE, GRID_SIZE, GRID_SIZE))
+        self.barrier_count = len(barriers)
+    
+    def draw_grid(self):
+        self.grid_surface.fill(Colors.BACKGROUND)
+        if self.grid_enabled:
+            for x in range(GRID_WIDTH):
+                for y in range(GRID_HEIGHT):
+                    if (x + y) % 2 == 0:
+                        pygame.draw.rect(self.grid_surface, Colors.GRID_LIGHT, 
+                                        (x * GRID_SIZE, y * GRID_SIZE, GRID_SIZE, GRID_SIZE))
+                    else:
+                        pygame.draw.rect(self.grid_surface, Colors.GRID_DARK, 
+                                        (x * GRID_SIZE, y * GRID_SIZE, GRID_SIZE, GRID_SIZE))
+
+# Renderização por retângulos sujos: redesenha e envia ao display apenas as células que mudaram
+class DirtyRectRenderer:
+    def __init__(self, game):
+        self.game = game
+        self.cells = set()
+        self.valid = False  # False força um redesenho completo no próximo quadro
+    
+    def mark_step(self, snake):
+        # Chamado após cada tick: nova cabeça, cabeça anterior (vira corpo) e caudas removidas
+        self.cells.add(snake.positions[0])
+        if len(snake.positions) > 1:
+            self.cells.add(snake.positions[1])
+        self.cells.update(snake.vacated)
+    
+    def commit(self):
+        # Registrar o que está na tela após um redesenho completo
+        game = self.game
+        self.valid = game.state == GameState.PLAYING and not game.snake.is_invincible
+        self.cells.clear()
+        self.grid_enabled = game.settings.grid_enabled
+        self.barriers = game.sim.barriers
+        self.barrier_count = len(game.sim.barriers)
+        self.food = game.food.position
+        self.power_up = game.power_up.position if game.power_up.active else None
+        self.hud = [(text, pygame.Rect(position, surface.get_size()))
+                    for text, surface, position in game.hud_items()]
     
-    def check_collision_with_barriers(self, barriers):
-        # Se a cobra está invencível, não há colisão com barreiras
-        if self.is_invincible:
+    def draw(self):
+        """Desenha o quadro apenas nas células alteradas; retorna False se for preciso redesenhar tudo"""
+        game = self.game
+        # Fora do jogo, com a cobra pulsando (invencível) ou interpolada, ou com a camada
+        # estática trocada, tudo muda
+        if not self.valid or game.state != GameState.PLAYING or game.snake.is_invincible or game.interpolate or \
+           game.settings.grid_enabled != self.grid_enabled or game.sim.barriers is not self.barriers:
             return False
-            
-        return self.positions[0] in barriers
+        
+        cells = self.cells
+        barriers = game.sim.barriers
+        game.static_layer.update(game.settings.grid_enabled, barriers)
+        cells.update(barriers[self.barrier_count:])
+        self.barrier_count = len(barriers)
+        
+        if game.food.position != self.food:
+            cells.add(self.food)
+            cells.add(game.food.position)
+            self.food = game.food.position
+        
+        # O power-up pulsa: sua célula (e as vizinhas, que o arco do contador pode tocar)
+        # é redesenhada em todo quadro enquanto ativo
+        if self.power_up is not None:
+            self.add_neighbourhood(self.power_up)
+        self.power_up = game.power_up.position if game.power_up.active else None
+        if self.power_up is not None:
+            self.add_neighbourhood(self.power_up)
+        
+        # Textos do HUD que mudaram sujam as células sob o texto antigo e o novo
+        hud_items = game.hud_items()
+        hud = [(text, pygame.Rect(position, surface.get_size())) for text, surface, position in hud_items]
+        if [text for text, _ in hud] != [text for text, _ in self.hud]:
+            for _, rect in self.hud + hud:
+                self.add_rect_cells(rect)
+            self.hud = hud
+        
+        if not cells:
+            return True
+        
+        # Restaurar o fundo e redesenhar o que houver em cada célula suja
+        screen = game.screen
+        grid = game.sim.grid
+        head = game.snake.positions[0]
+        rects = []
+        for x, y in cells:
+            rect = pygame.Rect(x * GRID_SIZE, y * GRID_SIZE, GRID_SIZE, GRID_SIZE)
+            screen.blit(game.static_layer.surface, rect, rect)
+            rects.append(rect)
+        if game.food.position in cells:
+            game.food.draw(screen)
+        if self.power_up in cells:
+            game.power_up.draw(screen, game.render_time())
+        for x, y in cells:
+            if grid.snake[y * grid.width + x]:
+                game.snake.draw_segment(screen, x, y, (x, y) == head)
+        # O texto tem transparência: reaplicá-lo só dentro das células restauradas
+        for (_, surface, _), (_, hud_rect) in zip(hud_items, hud):
+            for rect in rects:
+                if rect.colliderect(hud_rect):
+                    clip = rect.clip(hud_rect)
+                    screen.blit(surface, clip.topleft, clip.move(-hud_rect.x, -hud_rect.y))
+        
+        pygame.display.update(rects)
+        cells.clear()
+        return True
+    
+    def add_neighbourhood(self, position):
+        for x in range(max(0, position[0] - 1), min(GRID_WIDTH, position[0] + 2)):
+            for y in range(max(0, position[1] - 1), min(GRID_HEIGHT, position[1] + 2)):
+                self.cells.add((x, y))
+    
+    def add_rect_cells(self, rect):
+        for x in range(max(0, rect.left // GRID_SIZE), min(GRID_WIDTH, (rect.right - 1) // GRID_SIZE + 1)):
+            for y in range(max(0, rect.top // GRID_SIZE), min(GRID_HEIGHT, (rect.bottom - 1) // GRID_SIZE + 1)):
+                self.cells.add((x, y))
+
+# Câmera que segue a cabeça em tabuleiros maiores que a tela (alinhada às células, com volta nas bordas)
+class Camera:
+    def __init__(self, board_width, board_height, view_width=GRID_WIDTH, view_height=GRID_HEIGHT):
+        self.board_width = board_width
+        self.board_height = board_height
+        self.view_width = view_width
+        self.view_height = view_height
+        # Célula do tabuleiro no canto superior esquerdo da tela
+        self.x = 0
+        self.y = 0
     
-    def apply_power_up(self, power_up_type):
-        current_time = pygame.time.get_ticks()
+    def follow(self, position):
+        # Cabeça sempre no centro da tela
+        self.x = (position[0] - self.view_width // 2) % self.board_width
+        self.y = (position[1] - self.view_height // 2) % self.board_height
+    
+    def to_view(self, position):
+        """Célula da tela em que a posição do tabuleiro aparece, ou None se estiver fora da visão"""
+        x = (position[0] - self.x) % self.board_width
+        y = (position[1] - self.y) % self.board_height
+        if x < self.view_width and y < self.view_height:
+            return (x, y)
+        return None
+    
+    def spans(self):
+        # Colunas visíveis de cada linha como (início, fim, coluna na tela): duas faixas quando a visão
+        # atravessa a borda direita do tabuleiro
+        end = self.x + self.view_width
+        if end <= self.board_width:
+            return [(self.x, end, 0)]
+        return [(self.x, self.board_width, 0), (0, end - self.board_width, self.board_width - self.x)]
+
+# Renderização de tabuleiros grandes: só as células dentro da câmera são visitadas. A grade de ocupação
+# da simulação serve de índice espacial: cada linha visível é uma fatia contígua dela, e as células
+# ocupadas são encontradas em C, então o custo do quadro depende da tela e não do tabuleiro ou da cobra.
+class ViewportRenderer:
+    def __init__(self, game):
+        self.game = game
+        self.camera = Camera(game.board_width, game.board_height)
+        # Xadrez da grade com uma coluna a mais: deslocado de uma célula, inverte a paridade
+        self.background = pygame.Surface((SCREEN_WIDTH + GRID_SIZE, SCREEN_HEIGHT)).convert()
+        self.grid_enabled = None
+    
+    def draw_background(self, screen):
+        camera = self.camera
+        if self.game.settings.grid_enabled != self.grid_enabled:
+            self.grid_enabled = self.game.settings.grid_enabled
+            self.background.fill(Colors.BACKGROUND)
+            if self.grid_enabled:
+                for x in range(GRID_WIDTH + 1):
+                    for y in range(GRID_HEIGHT):
+                        color = Colors.GRID_LIGHT if (x + y) % 2 == 0 else Colors.GRID_DARK
+                        self.background.fill(color, (x * GRID_SIZE, y * GRID_SIZE, GRID_SIZE, GRID_SIZE))
+        parity = (camera.x + camera.y) % 2
+        screen.blit(self.background, (0, 0), (parity * GRID_SIZE, 0, SCREEN_WIDTH, SCREEN_HEIGHT))
+    
+    def draw(self, screen, current_time):
+        game = self.game
+        camera = self.camera
+        grid = game.sim.grid
+        head = game.snake.positions[0]
+        camera.follow(head)
+        self.draw_background(screen)
         
-        if power_up_type == "speed":
-            self.speed_modifier = 1.5
-            self.speed_mod_end = current_time + 5000  # 5 segundos
-        elif power_up_type == "slow":
-            self.speed_modifier = 0.5
-            self.speed_mod_end = current_time + 5000  # 5 segundos
-        elif power_up_type == "invincible":
-            self.is_invincible = True
-            self.invincibility_end = current_time + 5000  # 5 segundos
-        elif power_up_type == "shrink":
-            self.shrink(max(1, len(self.positions) // 2))  # Reduz pela metade
+        # Barreiras e segmentos visíveis, linha a linha
+        occupied = simulation.OCCUPIED
+        spans = camera.spans()
+        rows = [(view_y, ((camera.y + view_y) % grid.height) * grid.width) for view_y in range(camera.view_height)]
+        for view_y, row in rows:
+            for start, end, view_x in spans:
+                offset = view_x - row - start
+                for match in occupied.finditer(grid.barriers, row + start, row + end):
+                    screen.fill(Colors.GREY, ((match.start() + offset) * GRID_SIZE, view_y * GRID_SIZE,
+                                              GRID_SIZE, GRID_SIZE))
+        game.mark_phase("grade")
+        
+        food_cell = camera.to_view(game.food.position)
+        if food_cell is not None:
+            game.food.draw(screen, food_cell)
+        else:
+            self.draw_food_marker(screen)
+        if game.power_up.active:
+            power_up_cell = camera.to_view(game.power_up.position)
+            if power_up_cell is not None:
+                game.power_up.draw(screen, current_time, power_up_cell)
+        game.mark_phase("itens")
+        
+        snake_cells = []
+        for view_y, row in rows:
+            for start, end, view_x in spans:
+                offset = view_x - row - start
+                for match in occupied.finditer(grid.snake, row + start, row + end):
+                    snake_cells.append((match.start() + offset, view_y))
+        
+        # Com segmentos sobrepostos (invencibilidade), a célula da cabeça mostra o corpo
+        head_cell = camera.to_view(head)
+        if grid.snake[grid.index(head)] == 1:
+            snake_cells.remove(head_cell)
+        else:
+            head_cell = None
+        game.snake.draw_cells(screen, current_time, snake_cells, head_cell)
+        game.mark_phase("cobra")
     
-    def update_effects(self):
-        current_time = pygame.time.get_ticks()
+    def draw_food_marker(self, screen):
+        # Comida fora da tela: um marcador na borda, na direção do caminho mais curto (com volta nas bordas)
+        camera = self.camera
+        center_x = camera.x + camera.view_width / 2
+        center_y = camera.y + camera.view_height / 2
+        food_x, food_y = self.game.food.position
+        dx = (food_x + 0.5 - center_x + camera.board_width / 2) % camera.board_width - camera.board_width / 2
+        dy = (food_y + 0.5 - center_y + camera.board_height / 2) % camera.board_height - camera.board_height / 2
         
-        # Verificar invencibilidade
-        if self.is_invincible and current_time > self.invincibility_end:
-            self.is_invincible = False
-            
-        # Verificar modificador de velocidade
-        if current_time > self.speed_mod_end:
-            self.speed_modifier = 1.0
+        margin = GRID_SIZE
+        half_width = SCREEN_WIDTH / 2 - margin
+        half_height = SCREEN_HEIGHT / 2 - margin
+        scale = min(half_width / abs(dx) if dx else math.inf, half_height / abs(dy) if dy else math.inf)
+        position = (int(SCREEN_WIDTH / 2 + dx * scale), int(SCREEN_HEIGHT / 2 + dy * scale))
+        pygame.draw.circle(screen, Colors.WHITE, position, GRID_SIZE // 3 + 2)
+        pygame.draw.circle(screen, Colors.RED, position, GRID_SIZE // 3)
+
+# Renderização da arena: a mesma varredura das linhas visíveis da grade de ocupação, com a grade de donos
+# da arena dizendo a que cobra (e cor) pertence cada célula ocupada
+class ArenaRenderer(ViewportRenderer):
+    def __init__(self, game):
+        super().__init__(game)
+        # Câmera parada na última posição do jogador depois que ele morre
+        self.focus = (0, 0)
+
+    def colors(self, snake_id):
+        if snake_id == self.game.arena.player_id:
+            return Colors.GREEN, Colors.DARK_GREEN
+        return Colors.ARENA_SNAKES[snake_id % len(Colors.ARENA_SNAKES)]
+
+    def draw(self, screen, current_time):
+        game = self.game
+        arena = game.arena
+        camera = self.camera
+        grid = arena.grid
+        player = arena.player
+        if player is None:
+            # Espectador: a câmera acompanha a cobra viva com mais pontos
+            player = max(arena.alive(), key=lambda snake: snake.score, default=None)
+        if player is not None and player.alive:
+            self.focus = player.positions[0]
+        camera.follow(self.focus)
+        self.draw_background(screen)
+
+        # Barreiras só existem em gravações de partidas normais (replay.py --export-states)
+        occupied = simulation.OCCUPIED
+        spans = camera.spans()
+        decoder = game.state_decoder
+        if decoder is not None and decoder.barriers:
+            for view_y in range(camera.view_height):
+                row = ((camera.y + view_y) % grid.height) * grid.width
+                for start, end, view_x in spans:
+                    offset = view_x - row - start
+                    for match in occupied.finditer(grid.barriers, row + start, row + end):
+                        screen.fill(Colors.GREY, ((match.start() + offset) * GRID_SIZE, view_y * GRID_SIZE,
+                                                  GRID_SIZE, GRID_SIZE))
+        game.mark_phase("grade")
+
+        sprites = game.assets.sprites
+        sheet, area = sprites.food
+        food_blits = []
+        for cell in arena.food:
+            view = camera.to_view(grid.position(cell))
+            if view is not None:
+                food_blits.append((sheet, (view[0] * GRID_SIZE, view[1] * GRID_SIZE), area))
+        if decoder is not None and decoder.power_up is not None:
+            power_up_type, position, end_time = decoder.power_up
+            view = camera.to_view(position)
+            if view is not None:
+                # Sem a animação de pulso: a gravação só traz o tempo restante
+                time_left = (end_time - decoder.now) / game.power_up.duration
+                timer_frame = min(TIMER_FRAMES, max(0, math.ceil(time_left * TIMER_FRAMES)))
+                point = (view[0] * GRID_SIZE, view[1] * GRID_SIZE)
+                power_up_sheet, power_up_area = sprites.power_ups[power_up_type][GRID_SIZE]
+                food_blits.append((power_up_sheet, point, power_up_area))
+                timer_sheet, timer_area = sprites.timers[power_up_type][timer_frame]
+                food_blits.append((timer_sheet, point, timer_area))
+        screen.blits(food_blits, False)
+        game.mark_phase("itens")
+
+        # Segmentos visíveis agrupados pela dona
+        owner = arena.owner
+        cells_by_owner = {}
+        for view_y in range(camera.view_height):
+            row = ((camera.y + view_y) % grid.height) * grid.width
+            for start, end, view_x in spans:
+                offset = view_x - row - start
+                for match in occupied.finditer(grid.snake, row + start, row + end):
+                    cell = match.start()
+                    cells_by_owner.setdefault(owner[cell], []).append((cell + offset, view_y))
+
+        blits = []
+        heads = []
+        for snake_id, cells in cells_by_owner.items():
+            snake = arena.snakes[snake_id]
+            body, snake_heads = sprites.snake(*self.colors(snake_id))
+            body_sheet, body_area = body[-1]
+            head_cell = camera.to_view(snake.positions[0]) if snake.alive else None
+            for x, y in cells:
+                if (x, y) == head_cell:
+                    head_sheet, head_area = snake_heads[snake.direction][-1]
+                    heads.append((head_sheet, (x * GRID_SIZE, y * GRID_SIZE), head_area))
+                else:
+                    blits.append((body_sheet, (x * GRID_SIZE, y * GRID_SIZE), body_area))
+        # As cabeças por cima de todos os corpos
+        screen.blits(blits, False)
+        screen.blits(heads, False)
+        game.mark_phase("cobra")
+
+# Painel de desempenho (F3) com os tempos por fase do FrameProfiler; o texto é refeito poucas vezes
+# por segundo para que o próprio painel quase não pese no quadro
+class PerformanceOverlay:
+    def __init__(self, assets, profiler, refresh=0.5):
+        self.assets = assets
+        self.profiler = profiler
+        self.refresh = refresh
+        self.surface = None
+        self.updated = 0.0
     
     def draw(self, screen):
-        # Desenhar corpo da cobra
-        for i, (x, y) in enumerate(self.positions):
-            # A cabeça da cobra tem uma cor diferente
-            color = self.head_color if i == 0 else self.color
-            
-            # Se invencível, aplicar efeito visual
-            if self.is_invincible:
-                # Efeito pulsante quando invencível
-                pulse = abs(math.sin(pygame.time.get_ticks() / 100))
-                color = (int(color[0] * (0.5 + 0.5 * pulse)), 
-                         int(color[1] * (0.5 + 0.5 * pulse)), 
-                         int(color[2] * (0.5 + 0.5 * pulse)))
-            
-            # Desenhar segmento com borda para dar efeito 3D
-            rect = (x * GRID_SIZE, y * GRID_SIZE, GRID_SIZE, GRID_SIZE)
-            pygame.draw.rect(screen, Colors.BLACK, rect)
-            pygame.draw.rect(screen, color, (x * GRID_SIZE + 1, y * GRID_SIZE + 1, GRID_SIZE - 2, GRID_SIZE - 2))
-            
-            # Desenhar os olhos na cabeça da cobra
-            if i == 0:
-                # Definir posição dos olhos baseada na direção
-                if self.direction == Direction.RIGHT:
-                    eye_positions = [(x * GRID_SIZE + GRID_SIZE - 5, y * GRID_SIZE + 5), 
-                                    (x * GRID_SIZE + GRID_SIZE - 5, y * GRID_SIZE + GRID_SIZE - 5)]
-                elif self.direction == Direction.LEFT:
-                    eye_positions = [(x * GRID_SIZE + 5, y * GRID_SIZE + 5), 
-                                    (x * GRID_SIZE + 5, y * GRID_SIZE + GRID_SIZE - 5)]
-                elif self.direction == Direction.UP:
-                    eye_positions = [(x * GRID_SIZE + 5, y * GRID_SIZE + 5), 
-                                    (x * GRID_SIZE + GRID_SIZE - 5, y * GRID_SIZE + 5)]
-                else:  # DOWN
-                    eye_positions = [(x * GRID_SIZE + 5, y * GRID_SIZE + GRID_SIZE - 5), 
-                                    (x * GRID_SIZE + GRID_SIZE - 5, y * GRID_SIZE + GRID_SIZE - 5)]
-                
-                # Desenhar os olhos
-                for eye_pos in eye_positions:
-                    pygame.draw.circle(screen, Colors.WHITE, eye_pos, 2)
+        now = time.perf_counter()
+        if self.surface is None or now - self.updated >= self.refresh:
+            self.surface = self.render()
+            self.updated = now
+        screen.blit(self.surface, (SCREEN_WIDTH - self.surface.get_width() - 10, 50))
+    
+    def render(self):
+        font = self.assets.get_font("small")
+        rows = [("ms", "p50", "p95", "p99", "máx")]
+        for phase, _, _, p50, p95, p99, maximum in self.profiler.summary():
+            # Subfases do desenho aparecem recuadas sob "desenho"
+            name = "  " + phase.split("/", 1)[1] if "/" in phase else phase
+            rows.append((name, f"{p50:.2f}", f"{p95:.2f}", f"{p99:.2f}", f"{maximum:.1f}"))
+        rendered = [[font.render(text, True, Colors.WHITE) for text in row] for row in rows]
+        footer = font.render(f"Quadros longos: {self.profiler.long_frames} de {self.profiler.frames}",
+                             True, Colors.WHITE)
+        
+        # Primeira coluna alinhada à esquerda e as numéricas à direita
+        padding = 8
+        widths = [max(row[i].get_width() for row in rendered) for i in range(len(rows[0]))]
+        line_height = font.get_linesize()
+        width = max(sum(widths) + padding * (len(widths) + 1), footer.get_width() + padding * 2)
+        height = line_height * (len(rendered) + 1) + padding * 2
+        surface = pygame.Surface((width, height), pygame.SRCALPHA)
+        surface.fill((0, 0, 0, 170))
+        for row_index, row in enumerate(rendered):
+            y = padding + row_index * line_height
+            x = padding
+            for column, text in enumerate(row):
+                offset = 0 if column == 0 else widths[column] - text.get_width()
+                surface.blit(text, (x + offset, y))
+                x += widths[column] + padding
+        surface.blit(footer, (padding, padding + len(rendered) * line_height))
+        return surface
 
 # Classe principal do jogo
 class SnakeGame:
-    def __init__(self):
+    def __init__(self, dirty_rects=False, interpolate=False, board_size=None, profiler=None, arena_bots=None,
+                 settings=None):
+        # Tabuleiro em células: o padrão ocupa a janela; maiores são vistos por uma câmera que segue a cabeça
+        self.board_width, self.board_height = board_size if board_size is not None else (GRID_WIDTH, GRID_HEIGHT)
+        if self.board_width < GRID_WIDTH or self.board_height < GRID_HEIGHT:
+            raise ValueError(f"o tabuleiro precisa ter pelo menos {GRID_WIDTH}x{GRID_HEIGHT} células")
+        
         # Configuração da janela
         self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
         pygame.display.set_caption("Snake Game - Portfolio")
         
         # Inicialização de recursos e configurações
         self.assets = AssetManager()
-        self.settings = GameSettings()
-        self.clock = pygame.time.Clock()
+        self.settings = settings if settings is not None else GameSettings()
+        # Ticks de simulação em intervalos exatos; o relógio da simulação avança só com os ticks
+        self.scheduler = FixedStepScheduler()
+        self.static_layer = StaticLayer(SCREEN_WIDTH, SCREEN_HEIGHT)
+        # Com câmera a tela inteira rola a cada tick: sem retângulos sujos nem interpolação
+        self.viewport = ViewportRenderer(self) if self.board_size != (GRID_WIDTH, GRID_HEIGHT) else None
+        self.interpolate = interpolate and self.viewport is None
+        self.renderer = DirtyRectRenderer(self) if dirty_rects and self.viewport is None else None
         
         # Estado do jogo
         self.state = GameState.MENU
-        self.menu = MainMenu(self.screen, self.assets, self.settings)
-        
-        # Elementos do jogo
-        self.snake = Snake(self.assets)
-        self.food = Food(self.assets)
-        self.power_up = PowerUp(self.assets)
-        self.barriers = []
-        
-        # Variáveis do jogo
-        self.score = 0
-        self.level = 1
-        self.move_timer = 0
-        self.move_delay = self.get_move_delay()
-        self.power_up_timer = 0
-        self.power_up_delay = 15000  # 15 segundos em milissegundos
+        self.menu = MainMenu(self.screen, self.assets, self.settings, autopilot=self.autopilot_available)
+        
+        # Elementos do jogo (as regras ficam no núcleo de simulação)
+        self.snake = Snake(self.assets, self.board_width, self.board_height)
+        self.food = Food(self.assets, self.board_width, self.board_height)
+        self.power_up = PowerUp(self.assets, self.board_width, self.board_height)
+        self.sim = simulation.Simulation(self.settings.difficulty, self.settings.enable_walls,
+                                         self.board_width, self.board_height,
+                                         snake=self.snake, food=self.food, power_up=self.power_up)
+        
+        # Gravação da partida atual e replay em reprodução (None fora do modo replay)
+        self.replay = None
+        self.playback = None
+        self.playback_actions = None
+        self.replays_dir = os.path.join(os.path.dirname(__file__), "replays")
+        
+        # Piloto automático (modo demonstração); None quando o jogador controla a cobra
+        self.autopilot = None
+        self.autopilot_restart_delay = 3.0  # segundos na tela de fim de jogo antes de recomeçar
+        self.game_over_time = 0.0
+        
+        # Modo arena (várias cobras no mesmo tabuleiro); None nas partidas normais. Em rede, a arena
+        # é simulada pelo servidor e aqui só recebe os quadros de estado do NetworkClient (ou de uma
+        # gravação, com a mesma interface), aplicados pelo decodificador
+        self.arena = None
+        self.network = None
+        self.state_decoder = None
+        self.arena_bots = arena_bots if arena_bots is not None else \
+            min(self.board_width * self.board_height // ARENA_CELLS_PER_BOT, ARENA_MAX_DEFAULT_BOTS)
+        self.arena_renderer = None
+        
+        # Medição de tempo por quadro (FrameProfiler); None desliga toda a instrumentação
+        self.profiler = profiler
+        self.overlay = PerformanceOverlay(self.assets, profiler) if profiler is not None else None
+        self.show_overlay = False
         
         # Variáveis para menus
         self.selected_option = 0  # Opção selecionada nos menus de opções
         
-    def get_move_delay(self):
-        # Quanto maior o nível, menor o delay (mais rápido)
-        base_delay = 150  # ms
-        difficulty_factor = self.settings.difficulty * 10
-        level_factor = min(self.level * 5, 50)  # Limita o fator de nível a no máximo 50 ms
+        # Filtros e página da tela de recordes; as linhas da página ficam guardadas entre os quadros
+        self.high_score_view = {"difficulty": None, "walls": None, "period": 0, "page": 0}
+        self.high_score_rows = None
+        self.high_score_has_next = False
+    
+    @property
+    def board_size(self):
+        return (self.board_width, self.board_height)
+    
+    @property
+    def autopilot_available(self):
+        return self.board_width * self.board_height <= AUTOPILOT_MAX_CELLS
+    
+    def reset_game(self):
+        # Abrir o mixer ao começar a partida, e não no meio dela
+        if self.settings.sound_enabled:
+            self.assets.load_sounds()
+        self.scheduler.reset()
+        if self.arena is not None:
+            self.arena.reset(new_seed())
+            return
         
-        delay = base_delay - difficulty_factor - level_factor
-        delay = max(50, delay)  # Garante um delay mínimo de 50ms
+        # Cada partida tem sua semente: toda a aleatoriedade vem de self.sim.rng
+        if self.playback is not None:
+            self.replay = self.playback
+            self.playback_actions = self.playback.actions()
+        else:
+            self.replay = Replay(new_seed(), self.settings.difficulty, self.settings.enable_walls,
+                                 self.board_width, self.board_height)
+        self.sim.difficulty = self.replay.difficulty
+        self.sim.enable_walls = self.replay.enable_walls
+        self.sim.rng.seed(self.replay.seed)
+        self.sim.reset()
+        if self.autopilot is not None:
+            self.autopilot.reset()
+    
+    def start_replay(self, replay):
+        # Reproduz uma partida gravada em velocidade normal, ignorando as setas
+        if (replay.width, replay.height) != self.board_size:
+            raise ValueError(f"o replay foi gravado em um tabuleiro {replay.width}x{replay.height}")
+        self.playback = replay
+        self.state = GameState.PLAYING
+        self.reset_game()
+    
+    def start_autopilot(self):
+        # Modo demonstração: a cobra é conduzida pelo planejador e a partida recomeça sozinha
+        if not self.autopilot_available:
+            raise ValueError("o piloto automático não está disponível em tabuleiros tão grandes")
+        self.autopilot = Autopilot()
+        self.playback = None
+        self.state = GameState.PLAYING
+        self.reset_game()
+    
+    def start_arena(self, bots=None):
+        # Arena: o jogador contra bots no mesmo tabuleiro, sem replay nem recordes
+        self.arena = Arena(self.board_width, self.board_height, bots if bots is not None else self.arena_bots,
+                           difficulty=self.settings.difficulty)
+        if self.arena_renderer is None:
+            self.arena_renderer = ArenaRenderer(self)
+        self.autopilot = None
+        self.playback = None
+        # A tela da arena não é a que os retângulos sujos conhecem
+        if self.renderer is not None:
+            self.renderer.valid = False
+        self.state = GameState.PLAYING
+        self.reset_game()
+    
+    def start_network(self, client):
+        # Partida em rede: as setas vão para o servidor, e a arena local só mostra o estado recebido.
+        # Um espectador (snake_id None) apenas acompanha a cobra na liderança.
+        if (client.width, client.height) != self.board_size:
+            raise ValueError(f"o servidor usa um tabuleiro {client.width}x{client.height}")
+        self.arena = Arena.mirror(client.width, client.height, client.snake_id)
+        self.state_decoder = StateDecoder(self.arena)
+        if self.arena_renderer is None:
+            self.arena_renderer = ArenaRenderer(self)
+        self.network = client
+        self.autopilot = None
+        self.playback = None
+        if self.renderer is not None:
+            self.renderer.valid = False
+        self.state = GameState.PLAYING
+    
+    def leave_arena(self):
+        self.arena = None
+        self.state_decoder = None
+        if self.network is not None:
+            self.network.close()
+            self.network = None
+    
+    def save_replay(self, high_score=True):
+        # O último jogo sempre fica em replays/last.snkr; recordes ganham um arquivo próprio.
+        # Os arquivos são gravados em segundo plano, como as configurações.
+        self.replay.finish(self.sim)
+        try:
+            if not os.path.exists(self.replays_dir):
+                os.makedirs(self.replays_dir)
+        except OSError:
+            print("Não foi possível salvar o replay.")
+            return
+        data = self.replay.to_bytes()
+        self.settings.writer.replace(os.path.join(self.replays_dir, "last.snkr"), data)
         
-        # Aplicar o modificador de velocidade da cobra
-        if hasattr(self.snake, 'speed_modifier'):
-            return delay / self.snake.speed_modifier
-        return delay
+        # O id que a pontuação vai receber e a semente da partida tornam o nome único
+        name = f"{self.settings.scores.next_id}_{self.replay.seed:016x}.snkr"
+        if high_score and self.settings.add_score("Jogador", self.sim.score, self.sim.level, name,
+                                                  self.sim.difficulty, self.sim.enable_walls) is not None:
+            self.settings.writer.replace(os.path.join(self.replays_dir, name), data)
     
-    def reset_game(self):
-        self.snake.reset()
-        self.barriers = []
-        self.food.spawn(self.snake.positions, self.barriers)
-        self.power_up.active = False
-        self.score = 0
-        self.level = 1
-        self.move_delay = self.get_move_delay()
+    def restore_snapshot(self, data):
+        # Volta a um estado salvo com self.sim.snapshot() desta mesma partida (desfazer, recuperação)
+        self.sim.restore(data)
+        # A gravação é truncada no tick restaurado e continua válida
+        if self.playback is None and self.replay is not None:
+            del self.replay.directions[self.sim.ticks:]
+        self.scheduler.reset()
+        if self.renderer is not None:
+            self.renderer.valid = False
+
+    def mark_phase(self, phase):
+        # Fim de uma subfase do desenho (sem custo além desta chamada com a medição desligada)
+        if self.profiler is not None:
+            self.profiler.mark(phase)
+    
+    def toggle_overlay(self):
+        self.show_overlay = not self.show_overlay
+        # O painel cobre células que os retângulos sujos não redesenhariam ao escondê-lo
+        if self.renderer is not None:
+            self.renderer.valid = False
     
     def handle_events(self):
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 return False
+            
+            # F3 mostra ou esconde o painel de desempenho em qualquer tela
+            if event.type == pygame.KEYDOWN and event.key == pygame.K_F3 and self.overlay is not None:
+                self.toggle_overlay()
+                continue
                 
             if self.state == GameState.MENU:
                 option = self.menu.handle_event(event)
                 if option == "Jogar":
                     self.state = GameState.PLAYING
+                    self.autopilot = None
+                    self.leave_arena()
                     self.reset_game()
+                elif option == "Piloto automático":
+                    self.leave_arena()
+                    self.start_autopilot()
+                elif option == "Arena":
+                    self.start_arena()
                 elif option == "Opções":
                     self.state = GameState.OPTIONS
                     self.selected_option = 0  # Opção selecionada no menu de opções
                 elif option == "Recordes":
                     self.state = GameState.HIGH_SCORES
+                    self.high_score_rows = None
                 elif option == "Sair":
                     return False
             
             elif self.state == GameState.PLAYING:
                 if event.type == pygame.KEYDOWN:
+                    if self.playback is not None and event.key != pygame.K_ESCAPE:
+                        continue
+                    # Na demonstração, qualquer tecla além do ESC devolve o controle ao menu
+                    if self.autopilot is not None and event.key != pygame.K_ESCAPE:
+                        self.state = GameState.MENU
+                        self.autopilot = None
+                        continue
+                    if self.network is not None:
+                        if event.key in ARROW_DIRECTIONS:
+                            self.network.send_direction(ARROW_DIRECTIONS[event.key])
+                        elif event.key == pygame.K_ESCAPE:
+                            self.state = GameState.PAUSED
+                        continue
+                    snake = self.arena.player if self.arena is not None else self.snake
                     if event.key == pygame.K_UP:
-                        self.snake.set_direction(Direction.UP)
+                        snake.set_direction(Direction.UP)
                     elif event.key == pygame.K_DOWN:
-                        self.snake.set_direction(Direction.DOWN)
+                        snake.set_direction(Direction.DOWN)
                     elif event.key == pygame.K_LEFT:
-                        self.snake.set_direction(Direction.LEFT)
+                        snake.set_direction(Direction.LEFT)
                     elif event.key == pygame.K_RIGHT:
-                        self.snake.set_direction(Direction.RIGHT)
+                        snake.set_direction(Direction.RIGHT)
                     elif event.key == pygame.K_ESCAPE:
                         self.state = GameState.PAUSED
             
@@ -533,19 +1183,43 @@ class SnakeGame:
                         self.state = GameState.PLAYING
                     elif event.key == pygame.K_q:
                         self.state = GameState.MENU
+                        self.playback = None
+                        self.autopilot = None
+                        self.leave_arena()
             
             elif self.state == GameState.GAME_OVER:
                 if event.type == pygame.KEYDOWN:
                     if event.key == pygame.K_RETURN:
                         self.state = GameState.MENU
+                        self.playback = None
+                        self.autopilot = None
+                        self.leave_arena()
                     elif event.key == pygame.K_r:
                         self.state = GameState.PLAYING
+                        self.playback = None
                         self.reset_game()
             
             elif self.state == GameState.HIGH_SCORES:
                 if event.type == pygame.KEYDOWN:
+                    view = self.high_score_view
                     if event.key == pygame.K_ESCAPE:
                         self.state = GameState.MENU
+                    elif event.key == pygame.K_LEFT and view["page"] > 0:
+                        view["page"] -= 1
+                    elif event.key == pygame.K_RIGHT and self.high_score_has_next:
+                        view["page"] += 1
+                    elif event.key == pygame.K_d:
+                        # Todas as dificuldades, depois cada uma de 1 a 5
+                        view["difficulty"] = None if view["difficulty"] == 5 else (view["difficulty"] or 0) + 1
+                        view["page"] = 0
+                    elif event.key == pygame.K_p:
+                        view["walls"] = {None: True, True: False, False: None}[view["walls"]]
+                        view["page"] = 0
+                    elif event.key == pygame.K_t:
+                        view["period"] = (view["period"] + 1) % len(HIGH_SCORE_PERIODS)
+                        view["page"] = 0
+                    # A página é consultada de novo só quando o filtro ou a página mudam
+                    self.high_score_rows = None
                         
             elif self.state == GameState.OPTIONS:
                 if event.type == pygame.KEYDOWN:
@@ -582,118 +1256,150 @@ class SnakeGame:
         return True
     
     def update(self):
-        if self.state == GameState.PLAYING:
-            current_time = pygame.time.get_ticks()
-            
-            # Atualizar efeitos da cobra
-            self.snake.update_effects()
-            
-            # Movimentar a cobra com base no timer
-            if current_time - self.move_timer > self.move_delay:
-                self.snake.move()
-                self.move_timer = current_time
-                self.move_delay = self.get_move_delay()
-                
-                # Verificar colisões
-                if self.snake.check_collision_with_self() or \
-                   self.snake.check_collision_with_walls(self.settings.enable_walls) or \
-                   self.snake.check_collision_with_barriers(self.barriers):
+        # Em rede o servidor não pausa: os estados são aplicados mesmo com o jogo pausado
+        if self.network is not None:
+            self.update_network()
+            return
+        if self.state != GameState.PLAYING:
+            self.scheduler.pause()
+            # Na demonstração, recomeçar sozinho depois de alguns segundos no fim de jogo
+            if self.state == GameState.GAME_OVER and self.autopilot is not None and \
+               time.perf_counter() - self.game_over_time > self.autopilot_restart_delay:
+                self.state = GameState.PLAYING
+                self.reset_game()
+            return
+        
+        # Executar todos os ticks vencidos (mais de um se o quadro atrasou)
+        self.scheduler.advance()
+        if self.arena is not None:
+            self.update_arena()
+            return
+        while self.state == GameState.PLAYING and self.scheduler.consume(self.sim.move_delay):
+            # A direção em vigor em cada tick é gravada (ou lida do replay em reprodução)
+            if self.playback is not None:
+                action = next(self.playback_actions, None)
+                if action is None:
+                    self.state = GameState.GAME_OVER
+                    break
+            else:
+                if self.autopilot is not None:
+                    direction = self.autopilot.decide(self.sim)
+                    if direction is not None:
+                        self.snake.set_direction(direction)
+                action = self.snake.next_direction
+                self.replay.record(action)
+            events = self.sim.step(action)
+            if self.renderer is not None:
+                self.renderer.mark_step(self.snake)
+            for event in events:
+                self.handle_sim_event(event)
+    
+    def update_arena(self):
+        # O jogador muda a direção da própria cobra direto nos eventos; os bots decidem dentro do step
+        arena = self.arena
+        while self.state == GameState.PLAYING and self.scheduler.consume(arena.move_delay):
+            for event, snake_id in arena.step():
+                # Só os eventos do jogador têm som (com dezenas de bots, comer seria um ruído constante)
+                if snake_id != arena.player.id:
+                    continue
+                if event == "crash":
                     if self.settings.sound_enabled:
                         self.assets.play_sound("crash")
                     self.state = GameState.GAME_OVER
-                    self.settings.add_score("Jogador", self.score, self.level)
-                
-                # Verificar se a cobra comeu a comida
-                if self.snake.positions[0] == self.food.position:
+                    self.game_over_time = time.perf_counter()
+                elif event == "eat":
                     if self.settings.sound_enabled:
                         self.assets.play_sound("eat")
-                    self.snake.grow()
-                    self.score += 10 * self.level
-                    
-                    # Aumentar o nível a cada 5 comidas
-                    if self.score % (5 * 10 * self.level) == 0:
-                        self.level += 1
-                        # Adicionar uma barreira a cada novo nível
-                        new_barrier = (random.randint(0, GRID_WIDTH - 1), random.randint(0, GRID_HEIGHT - 1))
-                        while new_barrier in self.snake.positions or new_barrier == self.food.position:
-                            new_barrier = (random.randint(0, GRID_WIDTH - 1), random.randint(0, GRID_HEIGHT - 1))
-                        self.barriers.append(new_barrier)
-                        
-                    self.food.spawn(self.snake.positions, self.barriers)
-                
-                # Verificar se a cobra pegou um power-up
-                if self.power_up.active and self.snake.positions[0] == self.power_up.position:
-                    if self.settings.sound_enabled:
-                        self.assets.play_sound("powerup")
-                    
-                    if self.power_up.type == "points":
-                        self.score += 50  # Bônus de pontos
-                    else:
-                        self.snake.apply_power_up(self.power_up.type)
-                    
-                    self.power_up.active = False
-            
-            # Gerenciar power-ups
-            if self.power_up.active and self.power_up.should_despawn():
-                self.power_up.active = False
-            
-            if not self.power_up.active and current_time - self.power_up_timer > self.power_up_delay:
-                self.power_up.spawn(self.snake.positions, self.barriers, self.food.position)
-                self.power_up_timer = current_time
+    
+    def update_network(self):
+        player = self.arena.player
+        was_alive = player is not None and player.alive
+        score = player.score if player is not None else 0
+        for data in self.network.poll():
+            # Um delta sem a base (nunca deveria acontecer pela rede) é ignorado até o próximo quadro-chave
+            self.state_decoder.apply(data)
+        # Os sons saem das mudanças no estado da própria cobra
+        if self.settings.sound_enabled and player is not None:
+            if was_alive and not player.alive:
+                self.assets.play_sound("crash")
+            elif player.score > score:
+                self.assets.play_sound("eat")
+        if self.network.closed:
+            print(f"Transmissão encerrada: {self.network.error}")
+            self.leave_arena()
+            self.state = GameState.MENU
+    
+    def render_time(self):
+        # Tempo da simulação somado à fração já decorrida do próximo tick (animações suaves)
+        return self.sim.clock() + self.scheduler.accumulator
+    
+    def handle_sim_event(self, event):
+        if event == "crash":
+            if self.settings.sound_enabled:
+                self.assets.play_sound("crash")
+            self.state = GameState.GAME_OVER
+            self.game_over_time = time.perf_counter()
+            # Partidas do piloto automático não entram nos recordes
+            if self.playback is None:
+                self.save_replay(high_score=self.autopilot is None)
+        elif event == "eat":
+            if self.settings.sound_enabled:
+                self.assets.play_sound("eat")
+        elif event == "power_up":
+            if self.settings.sound_enabled:
+                self.assets.play_sound("powerup")
     
     def draw(self):
-        # Limpar a tela
-        self.screen.fill(Colors.BACKGROUND)
+        # No modo de retângulos sujos, só a parte alterada é redesenhada quando possível
+        # (com o painel de desempenho visível, a tela é sempre redesenhada inteira)
+        if self.renderer is not None and self.arena is None and not self.show_overlay and self.renderer.draw():
+            self.mark_phase("retângulos sujos")
+            return
         
-        # Desenhar grade se ativado
-        if self.settings.grid_enabled:
-            for x in range(GRID_WIDTH):
-                for y in range(GRID_HEIGHT):
-                    if (x + y) % 2 == 0:
-                        pygame.draw.rect(self.screen, Colors.GRID_LIGHT, 
-                                        (x * GRID_SIZE, y * GRID_SIZE, GRID_SIZE, GRID_SIZE))
-                    else:
-                        pygame.draw.rect(self.screen, Colors.GRID_DARK, 
-                                        (x * GRID_SIZE, y * GRID_SIZE, GRID_SIZE, GRID_SIZE))
+        # Fundo, grade e barreiras vêm da camada estática em um único blit
+        # (menus, recordes e opções preenchem a tela inteira por conta própria)
+        if self.arena is not None:
+            if self.state == GameState.PLAYING or self.state == GameState.PAUSED:
+                self.arena_renderer.draw(self.screen, self.render_time())
+            elif self.state == GameState.GAME_OVER:
+                self.arena_renderer.draw_background(self.screen)
+                self.mark_phase("grade")
+        elif self.viewport is not None:
+            # Tabuleiro grande: a câmera desenha o fundo e tudo o que está visível
+            if self.state == GameState.PLAYING or self.state == GameState.PAUSED:
+                self.viewport.draw(self.screen, self.render_time())
+            elif self.state == GameState.GAME_OVER:
+                self.viewport.draw_background(self.screen)
+                self.mark_phase("grade")
+        else:
+            self.static_layer.update(self.settings.grid_enabled, self.sim.barriers)
+            if self.state == GameState.PLAYING or self.state == GameState.PAUSED:
+                self.screen.blit(self.static_layer.surface, (0, 0))
+            elif self.state == GameState.GAME_OVER:
+                self.screen.blit(self.static_layer.grid_surface, (0, 0))
+            self.mark_phase("grade")
         
         # Desenhar elementos do jogo de acordo com o estado
         if self.state == GameState.MENU:
             self.menu.draw()
         
         elif self.state == GameState.PLAYING or self.state == GameState.PAUSED:
-            # Desenhar barreiras
-            for barrier in self.barriers:
-                pygame.draw.rect(self.screen, Colors.GREY, 
-                               (barrier[0] * GRID_SIZE, barrier[1] * GRID_SIZE, GRID_SIZE, GRID_SIZE))
-            
-            # Desenhar comida e power-up
-            self.food.draw(self.screen)
-            if self.power_up.active:
-                self.power_up.draw(self.screen)
-            
-            # Desenhar cobra
-            self.snake.draw(self.screen)
+            if self.viewport is None and self.arena is None:
+                # Desenhar comida e power-up
+                self.food.draw(self.screen)
+                if self.power_up.active:
+                    self.power_up.draw(self.screen, self.render_time())
+                self.mark_phase("itens")
+                
+                # Desenhar cobra
+                if self.interpolate and self.state == GameState.PLAYING:
+                    self.snake.draw(self.screen, self.render_time(), self.scheduler.alpha(self.sim.move_delay))
+                else:
+                    self.snake.draw(self.screen, self.render_time())
+                self.mark_phase("cobra")
             
             # Desenhar informações do jogo
-            score_text = self.assets.get_font("medium").render(f"Pontos: {self.score}", True, Colors.BLACK)
-            self.screen.blit(score_text, (10, 10))
-            
-            level_text = self.assets.get_font("medium").render(f"Nível: {self.level}", True, Colors.BLACK)
-            self.screen.blit(level_text, (SCREEN_WIDTH - level_text.get_width() - 10, 10))
-            
-            # Mostrar efeitos ativos
-            effects_text = []
-            if self.snake.is_invincible:
-                effects_text.append("Invencível")
-            if self.snake.speed_modifier > 1.0:
-                effects_text.append("Velocidade+")
-            elif self.snake.speed_modifier < 1.0:
-                effects_text.append("Velocidade-")
-                
-            if effects_text:
-                effect_str = ", ".join(effects_text)
-                effect_render = self.assets.get_font("small").render(f"Efeitos: {effect_str}", True, Colors.BLUE)
-                self.screen.blit(effect_render, (10, 50))
+            self.draw_hud()
             
             # Mensagem adicional se pausado
             if self.state == GameState.PAUSED:
@@ -701,27 +1407,32 @@ class SnakeGame:
                 pause_surface.fill((0, 0, 0, 128))
                 self.screen.blit(pause_surface, (0, 0))
                 
-                pause_text = self.assets.get_font("large").render("PAUSADO", True, Colors.WHITE)
+                pause_text = self.assets.render_text("large", "PAUSADO", Colors.WHITE)
                 self.screen.blit(pause_text, (SCREEN_WIDTH // 2 - pause_text.get_width() // 2, 
                                              SCREEN_HEIGHT // 2 - pause_text.get_height() // 2))
                 
-                instruction = self.assets.get_font("small").render("Pressione ESC para continuar ou Q para sair", 
-                                                                True, Colors.WHITE)
+                instruction = self.assets.render_text("small", "Pressione ESC para continuar ou Q para sair", Colors.WHITE)
                 self.screen.blit(instruction, (SCREEN_WIDTH // 2 - instruction.get_width() // 2, 
                                              SCREEN_HEIGHT // 2 + 50))
         
         elif self.state == GameState.GAME_OVER:
-            game_over_text = self.assets.get_font("large").render("FIM DE JOGO", True, Colors.RED)
+            game_over_text = self.assets.render_text("large", "FIM DE JOGO", Colors.RED)
             self.screen.blit(game_over_text, (SCREEN_WIDTH // 2 - game_over_text.get_width() // 2, 200))
             
-            score_text = self.assets.get_font("medium").render(f"Pontuação: {self.score}", True, Colors.BLACK)
+            if self.arena is not None:
+                player = self.arena.player
+                score_str = f"Pontuação: {player.score}"
+                level_str = f"Posição: {self.arena.rank(player)} de {len(self.arena.snakes)}"
+            else:
+                score_str = f"Pontuação: {self.sim.score}"
+                level_str = f"Nível alcançado: {self.sim.level}"
+            score_text = self.assets.render_text("medium", score_str, Colors.BLACK)
             self.screen.blit(score_text, (SCREEN_WIDTH // 2 - score_text.get_width() // 2, 270))
             
-            level_text = self.assets.get_font("medium").render(f"Nível alcançado: {self.level}", True, Colors.BLACK)
+            level_text = self.assets.render_text("medium", level_str, Colors.BLACK)
             self.screen.blit(level_text, (SCREEN_WIDTH // 2 - level_text.get_width() // 2, 310))
             
-            instruction = self.assets.get_font("small").render("Pressione ENTER para voltar ao menu ou R para jogar novamente", 
-                                                           True, Colors.BLACK)
+            instruction = self.assets.render_text("small", "Pressione ENTER para voltar ao menu ou R para jogar novamente", Colors.BLACK)
             self.screen.blit(instruction, (SCREEN_WIDTH // 2 - instruction.get_width() // 2, 370))
         
         elif self.state == GameState.HIGH_SCORES:
@@ -729,67 +1440,190 @@ class SnakeGame:
         
         elif self.state == GameState.OPTIONS:
             self.draw_options()
+        self.mark_phase("hud e menus")
+        
+        if self.show_overlay:
+            self.overlay.draw(self.screen)
+            self.mark_phase("painel")
         
         # Atualizar a tela
         pygame.display.flip()
+        self.mark_phase("tela")
+        if self.renderer is not None and self.arena is None:
+            self.renderer.commit()
+    
+    def hud_items(self):
+        # Textos do HUD como (texto, superfície, posição)
+        if self.arena is not None:
+            return self.arena_hud_items()
+        items = self.simulation_hud_items(self.assets, self.sim)
+        
+        if self.autopilot is not None:
+            # Taxa arredondada para o texto (e o cache) não mudar a cada tick
+            rate = round(self.autopilot.decisions_per_second, -2)
+            autopilot_str = f"Piloto automático: {rate:.0f} decisões/s"
+            autopilot_render = self.assets.render_text("small", autopilot_str, Colors.GREY)
+            items.append((autopilot_str, autopilot_render,
+                          (10, SCREEN_HEIGHT - autopilot_render.get_height() - 10)))
+        return items
+    
+    @staticmethod
+    def simulation_hud_items(assets, sim, width=SCREEN_WIDTH):
+        # Pontos, nível e efeitos ativos de uma partida (também usados pelo frame_renderer, sem janela)
+        items = []
+        score_str = f"Pontos: {sim.score}"
+        score_text = assets.render_text("medium", score_str, Colors.BLACK)
+        items.append((score_str, score_text, (10, 10)))
+        
+        level_str = f"Nível: {sim.level}"
+        level_text = assets.render_text("medium", level_str, Colors.BLACK)
+        items.append((level_str, level_text, (width - level_text.get_width() - 10, 10)))
+        
+        # Mostrar efeitos ativos
+        effects_text = []
+        if sim.snake.is_invincible:
+            effects_text.append("Invencível")
+        if sim.snake.speed_modifier > 1.0:
+            effects_text.append("Velocidade+")
+        elif sim.snake.speed_modifier < 1.0:
+            effects_text.append("Velocidade-")
+            
+        if effects_text:
+            effect_str = f"Efeitos: {', '.join(effects_text)}"
+            effect_render = assets.render_text("small", effect_str, Colors.BLUE)
+            items.append((effect_str, effect_render, (10, 50)))
+        return items
+    
+    def arena_hud_items(self):
+        items = []
+        arena = self.arena
+        player = arena.player
+        if player is None:
+            return self.spectator_hud_items()
+        score_str = f"Pontos: {player.score}"
+        score_text = self.assets.render_text("medium", score_str, Colors.BLACK)
+        items.append((score_str, score_text, (10, 10)))
+        
+        alive_str = f"Cobras vivas: {sum(1 for snake in arena.snakes if snake.alive)}"
+        alive_text = self.assets.render_text("medium", alive_str, Colors.BLACK)
+        items.append((alive_str, alive_text, (SCREEN_WIDTH - alive_text.get_width() - 10, 10)))
+        
+        rank_str = f"Posição: {arena.rank(player)}  Abates: {player.kills}"
+        rank_text = self.assets.render_text("small", rank_str, Colors.BLUE)
+        items.append((rank_str, rank_text, (10, 50)))
+        
+        # Em rede a cobra renasce sozinha depois de alguns ticks
+        if not player.alive:
+            respawn_text = self.assets.render_text("medium", "Renascendo...", Colors.RED)
+            items.append(("Renascendo...", respawn_text, (SCREEN_WIDTH // 2 - respawn_text.get_width() // 2, 10)))
+        return items
+    
+    def spectator_hud_items(self):
+        items = []
+        arena = self.arena
+        leader = max(arena.snakes, key=lambda snake: snake.score, default=None)
+        leader_str = f"Líder: {leader.score if leader is not None else 0} pontos"
+        leader_text = self.assets.render_text("medium", leader_str, Colors.BLACK)
+        items.append((leader_str, leader_text, (10, 10)))
+        
+        alive_str = f"Cobras vivas: {sum(1 for snake in arena.snakes if snake.alive)}"
+        alive_text = self.assets.render_text("medium", alive_str, Colors.BLACK)
+        items.append((alive_str, alive_text, (SCREEN_WIDTH - alive_text.get_width() - 10, 10)))
+        
+        watching_text = self.assets.render_text("small", "Assistindo", Colors.BLUE)
+        items.append(("Assistindo", watching_text, (10, 50)))
+        return items
+    
+    def draw_hud(self):
+        for _, surface, position in self.hud_items():
+            self.screen.blit(surface, position)
+    
+    def load_high_score_page(self):
+        view = self.high_score_view
+        period = HIGH_SCORE_PERIODS[view["period"]][1]
+        since = time.time() - period if period is not None else None
+        # Uma linha a mais indica se existe a próxima página
+        rows = self.settings.scores.top(HIGH_SCORES_PAGE + 1, view["page"] * HIGH_SCORES_PAGE,
+                                        view["difficulty"], view["walls"], since)
+        self.high_score_has_next = len(rows) > HIGH_SCORES_PAGE
+        self.high_score_rows = rows[:HIGH_SCORES_PAGE]
     
     def draw_high_scores(self):
         self.screen.fill(Colors.BACKGROUND)
+        if self.high_score_rows is None:
+            self.load_high_score_page()
+        view = self.high_score_view
         
-        title = self.assets.get_font("large").render("Recordes", True, Colors.DARK_GREEN)
-        self.screen.blit(title, (SCREEN_WIDTH // 2 - title.get_width() // 2, 50))
+        title = self.assets.render_text("large", "Recordes", Colors.DARK_GREEN)
+        self.screen.blit(title, (SCREEN_WIDTH // 2 - title.get_width() // 2, 30))
         
-        if not self.settings.high_scores:
-            no_scores = self.assets.get_font("medium").render("Nenhum recorde ainda!", True, Colors.GREY)
+        # Filtros em uso
+        difficulty = "Todas" if view["difficulty"] is None else str(view["difficulty"])
+        walls = {None: "Todas", True: "Com paredes", False: "Sem paredes"}[view["walls"]]
+        filters = f"Dificuldade: {difficulty}   Paredes: {walls}   Período: {HIGH_SCORE_PERIODS[view['period']][0]}"
+        filters_text = self.assets.render_text("small", filters, Colors.BLUE)
+        self.screen.blit(filters_text, (SCREEN_WIDTH // 2 - filters_text.get_width() // 2, 100))
+        
+        if not self.high_score_rows:
+            no_scores = self.assets.render_text("medium", "Nenhum recorde ainda!", Colors.GREY)
             self.screen.blit(no_scores, (SCREEN_WIDTH // 2 - no_scores.get_width() // 2, 250))
         else:
             # Cabeçalho da tabela
-            header_y = 120
-            header_font = self.assets.get_font("medium")
+            header_y = 140
+            rank_text = self.assets.render_text("medium", "Rank", Colors.BLACK)
+            self.screen.blit(rank_text, (60, header_y))
             
-            rank_text = header_font.render("Rank", True, Colors.BLACK)
-            self.screen.blit(rank_text, (100, header_y))
+            name_text = self.assets.render_text("medium", "Nome", Colors.BLACK)
+            self.screen.blit(name_text, (160, header_y))
             
-            name_text = header_font.render("Nome", True, Colors.BLACK)
-            self.screen.blit(name_text, (200, header_y))
+            score_text = self.assets.render_text("medium", "Pontos", Colors.BLACK)
+            self.screen.blit(score_text, (340, header_y))
             
-            score_text = header_font.render("Pontos", True, Colors.BLACK)
-            self.screen.blit(score_text, (400, header_y))
+            level_text = self.assets.render_text("medium", "Nível", Colors.BLACK)
+            self.screen.blit(level_text, (470, header_y))
             
-            level_text = header_font.render("Nível", True, Colors.BLACK)
-            self.screen.blit(level_text, (550, header_y))
+            date_text = self.assets.render_text("medium", "Data", Colors.BLACK)
+            self.screen.blit(date_text, (590, header_y))
             
             # Linhas da tabela
             line_y = header_y + 40
-            for i, score in enumerate(self.settings.high_scores[:10]):
-                row_font = self.assets.get_font("small")
+            first_rank = view["page"] * HIGH_SCORES_PAGE + 1
+            for i, score in enumerate(self.high_score_rows):
+                rank = self.assets.render_text("small", f"{first_rank + i}.", Colors.BLACK)
+                self.screen.blit(rank, (60, line_y))
                 
-                rank = row_font.render(f"{i+1}.", True, Colors.BLACK)
-                self.screen.blit(rank, (100, line_y))
+                name = self.assets.render_text("small", score["name"], Colors.BLACK)
+                self.screen.blit(name, (160, line_y))
                 
-                name = row_font.render(score["name"], True, Colors.BLACK)
-                self.screen.blit(name, (200, line_y))
+                points = self.assets.render_text("small", str(score["score"]), Colors.BLACK)
+                self.screen.blit(points, (340, line_y))
                 
-                points = row_font.render(str(score["score"]), True, Colors.BLACK)
-                self.screen.blit(points, (400, line_y))
+                level = self.assets.render_text("small", str(score["level"]), Colors.BLACK)
+                self.screen.blit(level, (470, line_y))
                 
-                level = row_font.render(str(score["level"]), True, Colors.BLACK)
-                self.screen.blit(level, (550, line_y))
+                date = time.strftime("%d/%m/%Y", time.localtime(score["date"])) if score["date"] else "-"
+                date = self.assets.render_text("small", date, Colors.BLACK)
+                self.screen.blit(date, (590, line_y))
                 
                 line_y += 30
         
-        instruction = self.assets.get_font("small").render("Pressione ESC para voltar", True, Colors.BLACK)
+        page = self.assets.render_text("small", f"Página {view['page'] + 1}", Colors.GREY)
+        self.screen.blit(page, (SCREEN_WIDTH // 2 - page.get_width() // 2, 490))
+        
+        controls = self.assets.render_text("small", "Setas: página   D: dificuldade   P: paredes   T: período",
+                                           Colors.BLACK)
+        self.screen.blit(controls, (SCREEN_WIDTH // 2 - controls.get_width() // 2, SCREEN_HEIGHT - 80))
+        instruction = self.assets.render_text("small", "Pressione ESC para voltar", Colors.BLACK)
         self.screen.blit(instruction, (SCREEN_WIDTH // 2 - instruction.get_width() // 2, SCREEN_HEIGHT - 50))
     
     def draw_options(self):
         self.screen.fill(Colors.BACKGROUND)
         
-        title = self.assets.get_font("large").render("Opções", True, Colors.DARK_GREEN)
+        title = self.assets.render_text("large", "Opções", Colors.DARK_GREEN)
         self.screen.blit(title, (SCREEN_WIDTH // 2 - title.get_width() // 2, 50))
         
         options_y = 150
         options_spacing = 60
-        options_font = self.assets.get_font("medium")
         
         # Lista de opções para facilitar a navegação
         options = [
@@ -817,7 +1651,7 @@ class SnakeGame:
                 else:  # Toggle options - pressione Enter para alternar
                     text = f"> {option['name']}: {option['value']} <"
             
-            option_text = options_font.render(text, True, color)
+            option_text = self.assets.render_text("medium", text, color)
             self.screen.blit(option_text, (SCREEN_WIDTH // 2 - option_text.get_width() // 2, option["y"]))
         
         # Instruções
@@ -830,22 +1664,52 @@ class SnakeGame:
         ]
         
         for i, ctrl in enumerate(controls):
-            ctrl_text = self.assets.get_font("small").render(ctrl, True, Colors.BLACK)
+            ctrl_text = self.assets.render_text("small", ctrl, Colors.BLACK)
             self.screen.blit(ctrl_text, (SCREEN_WIDTH // 2 - ctrl_text.get_width() // 2, instruction_y + i * 30))
         
         # Rodapé
-        footer = self.assets.get_font("small").render("Pressione ESC para salvar e voltar", True, Colors.BLUE)
+        footer = self.assets.render_text("small", "Pressione ESC para salvar e voltar", Colors.BLUE)
         self.screen.blit(footer, (SCREEN_WIDTH // 2 - footer.get_width() // 2, SCREEN_HEIGHT - 50))
     
+    def wait_next_frame(self):
+        # Sem nada animando na tela, dormir até o próximo tick em vez de redesenhar a 60 FPS
+        animating = self.interpolate or self.power_up.active or self.snake.is_invincible
+        if self.state == GameState.PLAYING and self.arena is not None and self.network is None:
+            self.scheduler.wait(FPS, self.arena.move_delay)
+        elif self.state == GameState.PLAYING and not animating:
+            self.scheduler.wait(FPS, self.sim.move_delay)
+        else:
+            self.scheduler.wait(FPS)
+    
+    def run_frame(self):
+        # Um quadro com o tempo de cada fase medido
+        profiler = self.profiler
+        profiler.begin_frame()
+        running = self.handle_events()
+        profiler.end_phase("eventos")
+        self.update()
+        profiler.end_phase("update")
+        self.draw()
+        profiler.end_phase("desenho")
+        profiler.end_frame()
+        return running
+    
     def run(self):
         running = True
         
         while running:
-            running = self.handle_events()
-            self.update()
-            self.draw()
-            self.clock.tick(FPS)
+            if self.profiler is None:
+                running = self.handle_events()
+                self.update()
+                self.draw()
+            else:
+                running = self.run_frame()
+            self.wait_next_frame()
         
+        if self.profiler is not None:
+            self.profiler.finish()
+        self.leave_arena()
+        self.settings.flush()
         pygame.quit()
         sys.exit()
 
@@ -0,0 +1,193 @@
+"""
+Banco de sons procedurais do Snake Game
+
+Os efeitos são sintetizados com NumPy direto na memória, no formato do mixer,
+a partir de parâmetros (forma de onda, frequência com glissando, envelope
+ADSR e variações de afinação), sem ler nem gravar arquivos. Buffers já
+sintetizados ficam em um cache chaveado pelos parâmetros e pelo formato do
+mixer. A reprodução usa um conjunto de canais reservados: cada som tem uma
+prioridade e um limite de vozes, e quando não há canal livre o som de menor
+prioridade (o mais antigo, no empate) é interrompido para dar lugar ao novo.
+"""
+
+import time
+
+import numpy as np
+import pygame
+
+# Parâmetros de síntese de um efeito. O envelope é (ataque, decaimento, sustentação, liberação),
+# com tempos em segundos e a sustentação como fração do volume; as variações espalham a afinação
+# em ±variation_cents para que repetições seguidas não soem idênticas.
+class SoundSpec:
+    def __init__(self, frequency, duration, volume=0.5, waveform="sine", frequency_end=None,
+                 envelope=(0.005, 0.0, 1.0, 0.02), variations=1, variation_cents=0, priority=0, max_voices=2):
+        self.frequency = frequency
+        self.duration = duration
+        self.volume = volume
+        self.waveform = waveform
+        self.frequency_end = frequency_end if frequency_end is not None else frequency
+        self.envelope = envelope
+        self.variations = variations
+        self.variation_cents = variation_cents
+        self.priority = priority
+        self.max_voices = max_voices
+
+    def key(self):
+        # Tudo o que muda as amostras (prioridade e vozes só afetam a reprodução)
+        return (self.frequency, self.frequency_end, self.duration, self.volume, self.waveform, self.envelope,
+                self.variations, self.variation_cents)
+
+    def detune(self, variation):
+        # Variações distribuídas por igual entre -variation_cents e +variation_cents
+        if self.variations <= 1:
+            return 1.0
+        cents = -self.variation_cents + 2 * self.variation_cents * variation / (self.variations - 1)
+        return 2 ** (cents / 1200)
+
+# Efeitos do jogo
+GAME_SOUNDS = {
+    "eat": SoundSpec(440, 0.1, 0.6, envelope=(0.003, 0.03, 0.7, 0.04), variations=4, variation_cents=60,
+                     priority=1, max_voices=3),
+    "powerup": SoundSpec(800, 0.2, 0.6, frequency_end=1200, envelope=(0.005, 0.05, 0.8, 0.08), variations=3,
+                         variation_cents=40, priority=2, max_voices=2),
+    "crash": SoundSpec(100, 0.3, 0.7, waveform="square", frequency_end=60, envelope=(0.002, 0.05, 0.6, 0.15),
+                       priority=3, max_voices=1),
+}
+
+# Amostras por formato do mixer (tamanho em bits, negativo = com sinal; o pygame informa o
+# formato em ponto flutuante de 32 bits como -32)
+SAMPLE_TYPES = {8: np.uint8, -8: np.int8, 16: np.uint16, -16: np.int16, -32: np.float32}
+
+def envelope(spec, count, sample_rate):
+    """Envelope ADSR com count amostras"""
+    attack, decay, sustain, release = spec.envelope
+    attack_n = min(count, int(attack * sample_rate))
+    decay_n = min(count - attack_n, int(decay * sample_rate))
+    release_n = min(count - attack_n - decay_n, int(release * sample_rate))
+    hold_n = count - attack_n - decay_n - release_n
+    return np.concatenate([
+        np.linspace(0.0, 1.0, attack_n, endpoint=False),
+        np.linspace(1.0, sustain, decay_n, endpoint=False),
+        np.full(hold_n, sustain),
+        np.linspace(sustain, 0.0, release_n),
+    ])
+
+def synthesize(spec, sample_rate, variation=0):
+    """Amostras em ponto flutuante (-1 a 1) de uma variação do efeito"""
+    count = int(spec.duration * sample_rate)
+    detune = spec.detune(variation)
+    # Frequência instantânea com glissando linear; a fase é a soma acumulada (sem estalos)
+    frequency = np.linspace(spec.frequency, spec.frequency_end, count) * detune
+    phase = np.cumsum(frequency) * (2 * np.pi / sample_rate)
+    if spec.waveform == "square":
+        wave = np.sign(np.sin(phase)) * 0.5
+    elif spec.waveform == "triangle":
+        wave = 2 / np.pi * np.arcsin(np.sin(phase))
+    elif spec.waveform == "noise":
+        wave = np.random.default_rng(variation).uniform(-1.0, 1.0, count)
+    else:
+        wave = np.sin(phase)
+    return wave * envelope(spec, count, sample_rate) * spec.volume
+
+def to_mixer_format(wave, mixer_format):
+    # Converte para o tipo de amostra e o número de canais do mixer
+    _, size, channels = mixer_format
+    sample_type = SAMPLE_TYPES.get(size)
+    if sample_type is None:
+        raise ValueError(f"formato de amostra do mixer não suportado: {size}")
+    if sample_type is np.float32:
+        samples = wave.astype(np.float32)
+    else:
+        info = np.iinfo(sample_type)
+        middle = (int(info.max) + int(info.min) + 1) // 2
+        samples = (wave * (info.max - middle) + middle).astype(sample_type)
+    if channels > 1:
+        samples = np.repeat(samples[:, None], channels, axis=1)
+    return np.ascontiguousarray(samples)
+
+# Buffers sintetizados, chaveados pelos parâmetros, pela variação e pelo formato do mixer
+_buffer_cache = {}
+
+def sound_buffer(spec, variation, mixer_format):
+    key = (spec.key(), variation, mixer_format)
+    buffer = _buffer_cache.get(key)
+    if buffer is None:
+        buffer = _buffer_cache[key] = to_mixer_format(synthesize(spec, mixer_format[0], variation),
+                                                      mixer_format).tobytes()
+    return buffer
+
+class SoundBank:
+    def __init__(self, specs=GAME_SOUNDS, pool_size=8, clock=time.perf_counter):
+        """Sintetiza os sons e reserva pool_size canais (o mixer já deve estar aberto)"""
+        self.specs = specs
+        self.clock = clock
+        mixer_format = pygame.mixer.get_init()
+        if mixer_format[1] not in SAMPLE_TYPES:
+            # Formato que não sabemos gerar: reabre o mixer em 16 bits com sinal
+            frequency, _, channels = mixer_format
+            pygame.mixer.quit()
+            pygame.mixer.init(frequency, -16, channels)
+            mixer_format = pygame.mixer.get_init()
+        self.sounds = {name: [pygame.mixer.Sound(buffer=sound_buffer(spec, variation, mixer_format))
+                              for variation in range(spec.variations)]
+                       for name, spec in specs.items()}
+        self.next_variation = {name: 0 for name in specs}
+
+        # Canais reservados só para os efeitos: o pygame não os escolhe sozinho para outros sons
+        if pygame.mixer.get_num_channels() < pool_size:
+            pygame.mixer.set_num_channels(pool_size)
+        pygame.mixer.set_reserved(pool_size)
+        self.channels = [pygame.mixer.Channel(i) for i in range(pool_size)]
+        # Voz atual de cada canal: (nome, prioridade, início)
+        self.voices = [None] * pool_size
+        self.dropped = 0
+        self.stolen = 0
+
+    def play(self, name):
+        """Toca um efeito; retorna False se ele foi descartado por falta de canal"""
+        spec = self.specs.get(name)
+        if spec is None:
+            return False
+        variation = self.next_variation[name]
+        self.next_variation[name] = (variation + 1) % spec.variations
+
+        index = self.choose_channel(name, spec)
+        if index is None:
+            self.dropped += 1
+            return False
+        self.channels[index].play(self.sounds[name][variation])
+        self.voices[index] = (name, spec.priority, self.clock())
+        return True
+
+    def choose_channel(self, name, spec):
+        free = None
+        same = []
+        candidates = []
+        for index, channel in enumerate(self.channels):
+            if not channel.get_busy():
+                self.voices[index] = None
+                if free is None:
+                    free = index
+                continue
+            voice_name, priority, start = self.voices[index] or (None, -1, 0.0)
+            if voice_name == name:
+                same.append((start, index))
+            candidates.append((priority, start, index))
+
+        # Com o limite de vozes do efeito atingido, a voz mais antiga dele é reaproveitada
+        if len(same) >= spec.max_voices:
+            self.stolen += 1
+            return min(same)[1]
+        if free is not None:
+            return free
+        # Sem canal livre: roubar a voz de menor prioridade (a mais antiga no empate), se não for mais importante
+        priority, _, index = min(candidates)
+        if priority > spec.priority:
+            return None
+        self.stolen += 1
+        return index
+
+    def stop(self):
+        for channel in self.channels:
+            channel.stop()
+        self.voices = [None] * len(self.channels)
@@ -0,0 +1,663 @@
+#!/usr/bin/env python3
+"""
+Codificação binária compacta do estado do Snake Game, tick a tick
+
+Um quadro-chave traz todo o estado visível: cada corpo como a célula da
+cabeça mais as direções de um segmento para o seguinte, em sequências
+(run-lengths) ou empacotadas a 2 bits, o que ficar menor; comidas, power-up,
+barreiras, pontuação, nível e o tempo restante dos efeitos. Entre dois
+quadros-chave, cada tick vira um delta com um byte por cobra no tabuleiro
+(direção da nova cabeça e quantos segmentos saíram da cauda), seguido apenas
+dos eventos do tick: cobras que nascem, comidas, power-up, barreiras e
+placares que mudaram. Uma cobra de 2.000 segmentos custa o mesmo byte por
+tick que uma de três.
+
+O mesmo formato alimenta a transmissão do servidor (network.py) e as
+gravações em arquivo, que intercalam quadros-chave periódicos para que a
+reprodução possa (re)começar em qualquer um deles. Os quadros são aplicados
+em uma arena espelho (Arena.mirror), com a grade de ocupação e a de donos
+atualizadas pelas mesmas diferenças.
+"""
+
+import argparse
+import struct
+import sys
+import time
+from array import array
+from collections import deque
+
+from arena import ArenaSnake
+from simulation import CELL_INDEX, DIRECTIONS, POWER_UP_TYPES, Grid
+
+# Tipos de quadro
+KEYFRAME = 1
+DELTA = 2
+
+# Ticks entre dois quadros-chave periódicos
+KEYFRAME_INTERVAL = 200
+
+# tipo, tick, tick de base (o do quadro anterior; no quadro-chave, o próprio tick) e relógio da partida (ms)
+FRAME_HEAD = struct.Struct("<BIII")
+# largura, altura, cobras, pontuação, nível, fim de jogo, barreiras e comidas
+WORLD_STATE = struct.Struct("<HHHIHBII")
+# flags, direção, pontuação, abates, velocidade (x10), tempo restante da invencibilidade e do
+# modificador de velocidade (ms), comprimento
+SNAKE_STATE = struct.Struct("<BBIHBHHI")
+# ativo, tipo, célula, tempo restante (ms)
+POWER_UP_STATE = struct.Struct("<BBIH")
+# pontuação, nível, fim de jogo
+SCORE_STATE = struct.Struct("<IHB")
+SNAKE_ID = struct.Struct("<H")
+CELL = struct.Struct("<I")
+
+# Flags da cobra
+ALIVE = 1
+INVINCIBLE = 2
+PACKED_BODY = 4  # direções do corpo a 2 bits em vez de sequências
+
+# Byte de movimento de cada cobra no tabuleiro, na ordem dos ids: bits 0-1 a direção da nova cabeça,
+# bits 2-3 os segmentos tirados da cauda (3: a quantidade vem a seguir como varint)
+MOVE_STAY = 0x10  # a cobra não se moveu
+MOVE_GONE = 0x20  # a cobra saiu do tabuleiro (morreu, ou volta a nascer em um evento SPAWN)
+
+# Eventos do delta, depois dos movimentos
+SPAWN = 1         # id, SNAKE_STATE e corpo
+SNAKE = 2         # id e SNAKE_STATE (o comprimento não muda nada)
+FOOD_ADDED = 3    # célula
+FOOD_REMOVED = 4  # célula
+POWER_UP = 5      # POWER_UP_STATE
+BARRIER = 6       # célula
+SCORE = 7         # SCORE_STATE
+
+# Sequência do corpo: direção nos 2 bits altos e comprimento - 1 nos 6 baixos
+MAX_RUN = 64
+
+# Gravações: cabeçalho e, para cada quadro, o tamanho seguido do quadro
+RECORDING_MAGIC = b"SNKT"
+RECORDING_VERSION = 1
+RECORDING_HEADER = struct.Struct("<4sBHH")
+RECORDING_FRAME = struct.Struct("<I")
+
+STEPS = [direction.value for direction in DIRECTIONS]
+DIRECTION_CODES = {direction: code for code, direction in enumerate(DIRECTIONS)}
+CLOCK_MASK = 0xFFFFFFFF
+NO_BARRIERS = ()
+
+def cell_typecode(width, height):
+    # Dois bytes por célula bastam para tabuleiros de até 65536 células
+    return "H" if width * height <= 0x10000 else "I"
+
+def write_varint(out, value):
+    while value >= 0x80:
+        out.append(value & 0x7F | 0x80)
+        value >>= 7
+    out.append(value)
+
+def read_varint(data, offset):
+    value = 0
+    shift = 0
+    while True:
+        byte = data[offset]
+        offset += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, offset
+        shift += 7
+
+def milliseconds_left(end, now):
+    return max(0, min(0xFFFF, int(end - now)))
+
+def frame_time(data):
+    """Relógio da partida (ms) no quadro"""
+    return FRAME_HEAD.unpack_from(data, 0)[3]
+
+def encode_body(positions, width, height):
+    """Direções de cada segmento para o seguinte, da cabeça à cauda: (empacotado, bytes)"""
+    # Em tabuleiros estreitos dois deslocamentos podem coincidir; qualquer um leva à mesma célula
+    offsets = {}
+    for code, (dx, dy) in enumerate(STEPS):
+        offsets.setdefault((dx % width, dy % height), code)
+    codes = bytearray(len(positions) - 1)
+    iterator = iter(positions)
+    previous_x, previous_y = next(iterator)
+    for i, (x, y) in enumerate(iterator):
+        codes[i] = offsets.get(((x - previous_x) % width, (y - previous_y) % height), 0)
+        previous_x, previous_y = x, y
+
+    runs = bytearray()
+    start = 0
+    count = len(codes)
+    while start < count:
+        code = codes[start]
+        end = start + 1
+        while end < count and end - start < MAX_RUN and codes[end] == code:
+            end += 1
+        runs.append(code << 6 | (end - start - 1))
+        start = end
+    if len(runs) <= (count + 3) // 4:
+        return False, runs
+
+    # Corpo cheio de curvas: quatro direções por byte
+    packed = bytearray((count + 3) // 4)
+    for i, code in enumerate(codes):
+        packed[i >> 2] |= code << ((i & 3) * 2)
+    return True, packed
+
+def decode_body(data, offset, head, length, packed, width, height):
+    """Corpo a partir da célula da cabeça; retorna (posições, offset depois do corpo)"""
+    x, y = head % width, head // width
+    positions = deque([(x, y)])
+    append = positions.append
+    remaining = length - 1
+    if packed:
+        for i in range(remaining):
+            dx, dy = STEPS[(data[offset + (i >> 2)] >> ((i & 3) * 2)) & 3]
+            x = (x + dx) % width
+            y = (y + dy) % height
+            append((x, y))
+        return positions, offset + (remaining + 3) // 4
+    while remaining > 0:
+        byte = data[offset]
+        offset += 1
+        dx, dy = STEPS[byte >> 6]
+        run = (byte & 0x3F) + 1
+        for _ in range(run):
+            x = (x + dx) % width
+            y = (y + dy) % height
+            append((x, y))
+        remaining -= run
+    return positions, offset
+
+# Codificador do estado de uma Arena ou de uma Simulation: deve ser chamado uma vez por tick
+class StateEncoder:
+    def __init__(self, source, keyframe_interval=KEYFRAME_INTERVAL):
+        self.source = source
+        self.is_arena = hasattr(source, "snakes")
+        self.keyframe_interval = keyframe_interval
+        self.last_keyframe = None
+        # Estado já transmitido: cabeça, comprimento e placar de cada cobra, comidas, power-up, barreiras
+        self.grid = None
+        self.heads = None
+
+    def snakes(self):
+        return self.source.snakes if self.is_arena else [self.source.snake]
+
+    def snake_key(self, snake):
+        # Tudo o que vai no SNAKE_STATE além do corpo e da direção (que os movimentos já trazem)
+        if self.is_arena:
+            alive, score, kills = snake.alive, snake.score, snake.kills
+        else:
+            alive, score, kills = not self.source.done, self.source.score, 0
+        return (alive, snake.is_invincible, score, kills, snake.speed_modifier,
+                snake.invincibility_end if snake.is_invincible else 0,
+                snake.speed_mod_end if snake.speed_modifier != 1.0 else 0)
+
+    def world_key(self):
+        # A arena só tem placares por cobra
+        if self.is_arena:
+            return (0, 0, False)
+        source = self.source
+        return (source.score, source.level, source.done)
+
+    def food_cells(self):
+        if self.is_arena:
+            return self.source.food
+        return {self.source.grid.index(self.source.food.position)}
+
+    def barriers(self):
+        return NO_BARRIERS if self.is_arena else self.source.barriers
+
+    def power_up_key(self):
+        if self.is_arena or not self.source.power_up.active:
+            return None
+        power_up = self.source.power_up
+        return (POWER_UP_TYPES.index(power_up.type), self.source.grid.index(power_up.position),
+                power_up.spawn_time + power_up.duration)
+
+    def encode(self):
+        """Quadro do tick atual: delta, ou quadro-chave a cada keyframe_interval ticks"""
+        ticks = self.source.ticks
+        if self.last_keyframe is None or ticks - self.last_keyframe >= self.keyframe_interval \
+                or ticks < self.last_keyframe:
+            frame = self.keyframe()
+        else:
+            frame = self.delta()
+        if frame[0] == KEYFRAME:
+            self.last_keyframe = ticks
+        return frame
+
+    def pack_snake(self, out, snake, key, now):
+        alive, invincible, score, kills, speed_modifier, invincibility_end, speed_mod_end = key
+        positions = snake.positions
+        length = len(positions)
+        packed, body = encode_body(positions, snake.width, snake.height) if length > 1 else (False, b"")
+        out += SNAKE_STATE.pack(alive | invincible << 1 | packed << 2, DIRECTION_CODES[snake.direction], score,
+                                kills, round(speed_modifier * 10), milliseconds_left(invincibility_end, now),
+                                milliseconds_left(speed_mod_end, now), length)
+        if length:
+            x, y = positions[0]
+            out += CELL.pack(y * snake.width + x)
+            out += body
+
+    def keyframe(self):
+        """Estado visível completo (também refaz a base dos próximos deltas)"""
+        source = self.source
+        width = source.width
+        now = int(source.clock())
+        snakes = self.snakes()
+        barriers = self.barriers()
+        food = self.food_cells()
+        power_up = self.power_up_key()
+        world = self.world_key()
+
+        out = bytearray(FRAME_HEAD.pack(KEYFRAME, source.ticks, source.ticks, now & CLOCK_MASK))
+        out += WORLD_STATE.pack(width, source.height, len(snakes), *world, len(barriers), len(food))
+        out += self.pack_power_up(power_up, now)
+        cells = array(cell_typecode(width, source.height), [y * width + x for x, y in barriers])
+        cells.fromlist(list(food))
+        if sys.byteorder == "big":
+            cells.byteswap()
+        out += cells.tobytes()
+
+        self.heads = []
+        self.lengths = []
+        self.keys = []
+        for snake in snakes:
+            key = self.snake_key(snake)
+            self.pack_snake(out, snake, key, now)
+            self.heads.append(snake.positions[0] if snake.positions else None)
+            self.lengths.append(len(snake.positions))
+            self.keys.append(key)
+        self.grid = source.grid
+        self.barrier_list = barriers
+        self.barrier_count = len(barriers)
+        self.food = set(food)
+        self.power_up = power_up
+        self.world = world
+        self.tick = source.ticks
+        return bytes(out)
+
+    @staticmethod
+    def pack_power_up(power_up, now):
+        if power_up is None:
+            return POWER_UP_STATE.pack(False, 0, 0, 0)
+        power_up_type, cell, end = power_up
+        return POWER_UP_STATE.pack(True, power_up_type, cell, milliseconds_left(end, now))
+
+    def delta(self):
+        """Mudanças desde o último quadro; vira um quadro-chave quando a partida recomeça"""
+        source = self.source
+        snakes = self.snakes()
+        barriers = self.barriers()
+        # Grade ou lista de barreiras nova: a partida foi reiniciada ou restaurada
+        if self.heads is None or source.grid is not self.grid or barriers is not self.barrier_list \
+                or len(snakes) != len(self.heads) or len(barriers) < self.barrier_count:
+            return self.keyframe()
+
+        width = source.width
+        height = source.height
+        now = int(source.clock())
+        out = bytearray(FRAME_HEAD.pack(DELTA, source.ticks, self.tick, now & CLOCK_MASK))
+        events = bytearray()
+        heads = self.heads
+        lengths = self.lengths
+        keys = self.keys
+        for i, snake in enumerate(snakes):
+            positions = snake.positions
+            head = heads[i]
+            spawned = False
+            if head is not None:
+                if not positions:
+                    out.append(MOVE_GONE)
+                else:
+                    new_head = positions[0]
+                    length = len(positions)
+                    removed = lengths[i] + 1 - length
+                    code = DIRECTION_CODES[snake.direction]
+                    dx, dy = STEPS[code]
+                    if new_head == head and length == lengths[i]:
+                        out.append(MOVE_STAY)
+                    elif new_head == ((head[0] + dx) % width, (head[1] + dy) % height) and removed >= 0 \
+                            and (length == 1 or positions[1] == head):
+                        if removed < 3:
+                            out.append(code | removed << 2)
+                        else:
+                            out.append(code | 12)
+                            write_varint(out, removed)
+                    else:
+                        # Não é a continuação do corpo anterior (renasceu em outro lugar)
+                        out.append(MOVE_GONE)
+                        spawned = True
+            elif positions:
+                spawned = True
+
+            key = self.snake_key(snake)
+            if spawned:
+                events.append(SPAWN)
+                events += SNAKE_ID.pack(i)
+                self.pack_snake(events, snake, key, now)
+            elif key != keys[i]:
+                events.append(SNAKE)
+                events += SNAKE_ID.pack(i)
+                self.pack_snake_state(events, snake, key, now)
+            heads[i] = positions[0] if positions else None
+            lengths[i] = len(positions)
+            keys[i] = key
+
+        food = self.food_cells()
+        if food != self.food:
+            for cell in self.food - food:
+                events.append(FOOD_REMOVED)
+                events += CELL.pack(cell)
+            for cell in food - self.food:
+                events.append(FOOD_ADDED)
+                events += CELL.pack(cell)
+            self.food = set(food)
+
+        power_up = self.power_up_key()
+        if power_up != self.power_up:
+            events.append(POWER_UP)
+            events += self.pack_power_up(power_up, now)
+            self.power_up = power_up
+
+        for x, y in barriers[self.barrier_count:]:
+            events.append(BARRIER)
+            events += CELL.pack(y * width + x)
+        self.barrier_count = len(barriers)
+
+        world = self.world_key()
+        if world != self.world:
+            events.append(SCORE)
+            events += SCORE_STATE.pack(*world)
+            self.world = world
+
+        self.tick = source.ticks
+        out += events
+        return bytes(out)
+
+    def pack_snake_state(self, out, snake, key, now):
+        # Só o placar e os efeitos: o corpo continua o do espelho
+        alive, invincible, score, kills, speed_modifier, invincibility_end, speed_mod_end = key
+        out += SNAKE_STATE.pack(alive | invincible << 1, DIRECTION_CODES[snake.direction], score, kills,
+                                round(speed_modifier * 10), milliseconds_left(invincibility_end, now),
+                                milliseconds_left(speed_mod_end, now), len(snake.positions))
+
+# Aplica os quadros em uma arena espelho (Arena.mirror); guarda também o que a arena não tem
+# (pontuação e nível da partida, power-up e barreiras)
+class StateDecoder:
+    def __init__(self, arena):
+        self.arena = arena
+        # Um delta só vale sobre o quadro anterior: fora de sincronia, espera-se o próximo quadro-chave
+        self.synced = False
+        self.tick = 0
+        self.now = 0
+        self.score = 0
+        self.level = 0
+        self.done = False
+        # (tipo, posição, instante do fim) ou None
+        self.power_up = None
+        self.barriers = []
+
+    def apply(self, data):
+        """Aplica um quadro; False se for um delta que não continua o estado atual"""
+        kind, tick, base, now = FRAME_HEAD.unpack_from(data, 0)
+        if kind == DELTA and (not self.synced or base != self.tick):
+            self.synced = False
+            return False
+        self.now = now
+        if kind == KEYFRAME:
+            self.load_keyframe(data, FRAME_HEAD.size)
+            self.synced = True
+        elif kind == DELTA:
+            self.apply_delta(data, FRAME_HEAD.size)
+        else:
+            raise ValueError("quadro de estado desconhecido")
+        self.tick = tick
+        self.arena.ticks = tick
+        return True
+
+    def load_keyframe(self, data, offset):
+        arena = self.arena
+        width, height, snake_count, score, level, done, barrier_count, food_count = \
+            WORLD_STATE.unpack_from(data, offset)
+        if (width, height) != (arena.width, arena.height):
+            raise ValueError("estado de uma arena com outras dimensões")
+        offset += WORLD_STATE.size
+        offset = self.read_power_up(data, offset)
+        cells = array(cell_typecode(width, height))
+        end = offset + cells.itemsize * (barrier_count + food_count)
+        cells.frombytes(data[offset:end])
+        if sys.byteorder == "big":
+            cells.byteswap()
+        offset = end
+
+        # Grade nova: o quadro-chave substitui tudo
+        grid = arena.grid = Grid(width, height)
+        arena.owner = array(CELL_INDEX, [-1]) * (width * height)
+        self.barriers = [grid.position(cell) for cell in cells[:barrier_count]]
+        for position in self.barriers:
+            grid.add_barrier(position)
+        arena.clear_food()
+        for cell in cells[barrier_count:]:
+            arena.add_food(cell)
+        self.score, self.level, self.done = score, level, bool(done)
+
+        snakes = arena.snakes
+        while len(snakes) < snake_count:
+            snakes.append(ArenaSnake(len(snakes), width, height, grid))
+        del snakes[snake_count:]
+        for snake in snakes:
+            snake.grid = grid
+            snake.positions = deque()
+            snake.vacated = []
+            offset = self.read_snake(data, offset, snake, True)
+
+    def read_snake(self, data, offset, snake, with_body):
+        flags, direction, score, kills, speed, invincible_left, speed_left, length = \
+            SNAKE_STATE.unpack_from(data, offset)
+        offset += SNAKE_STATE.size
+        now = self.now
+        snake.alive = bool(flags & ALIVE)
+        snake.is_invincible = bool(flags & INVINCIBLE)
+        snake.invincibility_end = now + invincible_left
+        snake.speed_modifier = speed / 10
+        snake.speed_mod_end = now + speed_left
+        snake.direction = snake.next_direction = DIRECTIONS[direction]
+        snake.score = score
+        snake.kills = kills
+        if with_body and length:
+            arena = self.arena
+            head = CELL.unpack_from(data, offset)[0]
+            positions, offset = decode_body(data, offset + CELL.size, head, length, flags & PACKED_BODY,
+                                            arena.width, arena.height)
+            snake.positions = positions
+            grid = arena.grid
+            owner = arena.owner
+            width = arena.width
+            # Da cauda para a cabeça: a cabeça fica por cima dos outros segmentos na mesma célula
+            for position in reversed(positions):
+                grid.occupy(position)
+                owner[position[1] * width + position[0]] = snake.id
+        return offset
+
+    def read_power_up(self, data, offset):
+        active, power_up_type, cell, left = POWER_UP_STATE.unpack_from(data, offset)
+        if active:
+            self.power_up = (POWER_UP_TYPES[power_up_type], self.arena.grid.position(cell), self.now + left)
+        else:
+            self.power_up = None
+        return offset + POWER_UP_STATE.size
+
+    def apply_delta(self, data, offset):
+        arena = self.arena
+        grid = arena.grid
+        owner = arena.owner
+        width = arena.width
+        height = arena.height
+        occupy = grid.occupy
+        vacate = grid.vacate
+
+        # Um byte (e talvez um varint) por cobra que estava no tabuleiro, na ordem dos ids
+        for snake in [snake for snake in arena.snakes if snake.positions]:
+            code = data[offset]
+            offset += 1
+            if code == MOVE_STAY:
+                continue
+            if code == MOVE_GONE:
+                snake.remove()
+                continue
+            positions = snake.positions
+            direction = code & 3
+            dx, dy = STEPS[direction]
+            x, y = positions[0]
+            head = ((x + dx) % width, (y + dy) % height)
+            positions.appendleft(head)
+            occupy(head)
+            owner[head[1] * width + head[0]] = snake.id
+            snake.direction = DIRECTIONS[direction]
+            removed = code >> 2
+            if removed == 3:
+                removed, offset = read_varint(data, offset)
+            vacated = []
+            for _ in range(removed):
+                tail = positions.pop()
+                vacate(tail)
+                vacated.append(tail)
+            snake.vacated = vacated
+
+        end = len(data)
+        while offset < end:
+            event = data[offset]
+            offset += 1
+            if event == SPAWN or event == SNAKE:
+                snake = arena.snakes[SNAKE_ID.unpack_from(data, offset)[0]]
+                offset = self.read_snake(data, offset + SNAKE_ID.size, snake, event == SPAWN)
+            elif event == FOOD_ADDED:
+                arena.add_food(CELL.unpack_from(data, offset)[0])
+                offset += CELL.size
+            elif event == FOOD_REMOVED:
+                arena.remove_food(CELL.unpack_from(data, offset)[0])
+                offset += CELL.size
+            elif event == POWER_UP:
+                offset = self.read_power_up(data, offset)
+            elif event == BARRIER:
+                position = grid.position(CELL.unpack_from(data, offset)[0])
+                offset += CELL.size
+                self.barriers.append(position)
+                grid.add_barrier(position)
+            elif event == SCORE:
+                self.score, self.level, done = SCORE_STATE.unpack_from(data, offset)
+                self.done = bool(done)
+                offset += SCORE_STATE.size
+            else:
+                raise ValueError(f"evento de estado desconhecido ({event})")
+
+# Gravação de quadros em arquivo, um após o outro (o arquivo pode ser lido enquanto cresce)
+class StateWriter:
+    def __init__(self, path, width, height):
+        self.file = open(path, "wb")
+        self.file.write(RECORDING_HEADER.pack(RECORDING_MAGIC, RECORDING_VERSION, width, height))
+
+    def write(self, frame):
+        self.file.write(RECORDING_FRAME.pack(len(frame)) + frame)
+
+    def close(self):
+        self.file.close()
+
+def read_recording(path):
+    """Lê uma gravação: (largura, altura, quadros); um quadro final incompleto é descartado"""
+    with open(path, "rb") as f:
+        data = f.read()
+    try:
+        magic, version, width, height = RECORDING_HEADER.unpack_from(data, 0)
+    except struct.error:
+        raise ValueError(f"{path} não é uma gravação válida")
+    if magic != RECORDING_MAGIC or version != RECORDING_VERSION:
+        raise ValueError(f"{path} não é uma gravação válida")
+
+    frames = []
+    offset = RECORDING_HEADER.size
+    while offset + RECORDING_FRAME.size <= len(data):
+        size = RECORDING_FRAME.unpack_from(data, offset)[0]
+        offset += RECORDING_FRAME.size
+        if offset + size > len(data):
+            break
+        frames.append(data[offset:offset + size])
+        offset += size
+    return width, height, frames
+
+# Reprodução de uma gravação no ritmo em que foi gravada, com a mesma interface do NetworkClient
+# (o SnakeGame a assiste como espectador)
+class RecordingPlayer:
+    def __init__(self, path, speed=1.0):
+        self.width, self.height, self.frames = read_recording(path)
+        if not self.frames:
+            raise ValueError(f"{path} não tem nenhum quadro")
+        self.snake_id = None
+        self.speed = speed
+        # Intervalo típico entre quadros, para quem precisa de um ritmo de ticks
+        times = [frame_time(frame) for frame in self.frames[:2]]
+        self.move_delay = (times[-1] - times[0]) & CLOCK_MASK or 100
+        self.next = 0
+        self.start = None
+        self.closed = False
+        self.error = None
+
+    def poll(self):
+        """Quadros cujo instante na partida já chegou"""
+        now = time.perf_counter()
+        if self.start is None:
+            self.start = now
+        elapsed = (now - self.start) * 1000 * self.speed
+        first = frame_time(self.frames[0])
+        frames = []
+        while self.next < len(self.frames) and \
+                (frame_time(self.frames[self.next]) - first) & CLOCK_MASK <= elapsed:
+            frames.append(self.frames[self.next])
+            self.next += 1
+        if self.next == len(self.frames):
+            self.closed = True
+            self.error = "fim da gravação"
+        return frames
+
+    def send_direction(self, direction):
+        pass
+
+    def close(self):
+        self.closed = True
+
+def main():
+    """Confere gravações aplicando todos os quadros e mostra o custo por tick"""
+    from arena import Arena
+
+    parser = argparse.ArgumentParser(description="Confere gravações de estado do Snake Game")
+    parser.add_argument("recordings", nargs="+", help="arquivos de gravação (.snkt)")
+    args = parser.parse_args()
+
+    failures = 0
+    for path in args.recordings:
+        try:
+            width, height, frames = read_recording(path)
+            decoder = StateDecoder(Arena.mirror(width, height, None))
+            skipped = sum(not decoder.apply(frame) for frame in frames)
+        except (OSError, ValueError, struct.error, IndexError) as e:
+            print(f"{path}: {e}")
+            failures += 1
+            continue
+
+        keyframes = [len(frame) for frame in frames if frame[0] == KEYFRAME]
+        deltas = [len(frame) for frame in frames if frame[0] == DELTA]
+        print(f"{path}: {width}x{height}, {len(frames)} quadros ({len(keyframes)} quadros-chave), "
+              f"{sum(map(len, frames))} bytes")
+        if keyframes:
+            print(f"  quadro-chave: média {sum(keyframes) / len(keyframes):.0f} bytes, máx. {max(keyframes)}")
+        if deltas:
+            print(f"  delta: média {sum(deltas) / len(deltas):.1f} bytes, máx. {max(deltas)}")
+        if skipped:
+            print(f"  {skipped} deltas sem quadro-chave anterior")
+            failures += 1
+
+    sys.exit(1 if failures else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,270 @@
+"""
+Ambiente vetorizado do Snake Game com NumPy
+
+Mantém N partidas independentes como arrays (cabeças, corpos em buffer
+circular, grades de ocupação, comida, power-ups, pontuação) e avança todas
+com uma única chamada step(actions), usando as mesmas regras de simulation.py.
+"""
+
+import numpy as np
+
+from simulation import (GRID_WIDTH, GRID_HEIGHT, POWER_UP_TYPES, EFFECT_DURATION, POWER_UP_DURATION, POWER_UP_DELAY,
+                        Direction)
+
+# Direções na mesma ordem do enum Direction (índices usados nas ações)
+DIRECTIONS = list(Direction)
+DX = np.array([d.value[0] for d in DIRECTIONS], dtype=np.int64)
+DY = np.array([d.value[1] for d in DIRECTIONS], dtype=np.int64)
+OPPOSITE = np.array([DIRECTIONS.index(Direction((-d.value[0], -d.value[1]))) for d in DIRECTIONS])
+
+# Causas de morte registradas em death_cause
+ALIVE, DEATH_SELF, DEATH_BARRIER = 0, 1, 2
+
+SPEED, SLOW, POINTS, INVINCIBLE, SHRINK = (POWER_UP_TYPES.index(t) for t in
+                                           ("speed", "slow", "points", "invincible", "shrink"))
+
+class VecSnakeEnv:
+    def __init__(self, num_envs, difficulty=1, width=GRID_WIDTH, height=GRID_HEIGHT, seed=None):
+        self.num_envs = num_envs
+        self.difficulty = difficulty
+        self.width = width
+        self.height = height
+        self.cells = width * height
+        self.rng = np.random.default_rng(seed)
+
+        # O corpo nunca passa do número de células (a comida só nasce em células livres);
+        # ao atingir a capacidade do buffer a cobra simplesmente deixa de crescer
+        self.capacity = self.cells + 1
+        cell_dtype = np.int16 if self.cells < 2 ** 15 else np.int32
+        self.body = np.zeros((num_envs, self.capacity), dtype=cell_dtype)
+        self.head_ptr = np.zeros(num_envs, dtype=np.int64)
+        self.length = np.zeros(num_envs, dtype=np.int64)
+        self.occupancy = np.zeros((num_envs, self.cells), dtype=np.uint8)
+        self.barriers = np.zeros((num_envs, self.cells), dtype=bool)
+
+        self.direction = np.zeros(num_envs, dtype=np.int64)
+        self.grow_pending = np.zeros(num_envs, dtype=np.int64)
+        self.food = np.zeros(num_envs, dtype=np.int64)
+
+        self.power_up_active = np.zeros(num_envs, dtype=bool)
+        self.power_up_cell = np.zeros(num_envs, dtype=np.int64)
+        self.power_up_type = np.zeros(num_envs, dtype=np.int64)
+        self.power_up_spawn_time = np.zeros(num_envs)
+        self.power_up_timer = np.zeros(num_envs)
+
+        self.time = np.zeros(num_envs)
+        self.move_delay = np.zeros(num_envs)
+        self.is_invincible = np.zeros(num_envs, dtype=bool)
+        self.invincibility_end = np.zeros(num_envs)
+        self.speed_modifier = np.ones(num_envs)
+        self.speed_mod_end = np.zeros(num_envs)
+
+        self.score = np.zeros(num_envs, dtype=np.int64)
+        self.level = np.ones(num_envs, dtype=np.int64)
+        self.ticks = np.zeros(num_envs, dtype=np.int64)
+        self.power_ups_taken = np.zeros(num_envs, dtype=np.int64)
+        self.death_cause = np.zeros(num_envs, dtype=np.int8)
+
+        self.reset()
+
+    @property
+    def heads(self):
+        return self.body[np.arange(self.num_envs), self.head_ptr].astype(np.int64)
+
+    def reset(self, rows=None):
+        """Reinicia as partidas indicadas (todas, por padrão)"""
+        if rows is None:
+            rows = np.arange(self.num_envs)
+        if len(rows) == 0:
+            return
+
+        start = (self.height // 2) * self.width + self.width // 2
+        self.occupancy[rows] = 0
+        self.barriers[rows] = False
+        self.head_ptr[rows] = 0
+        self.body[rows, 0] = start
+        self.occupancy[rows, start] = 1
+        self.length[rows] = 1
+
+        self.direction[rows] = DIRECTIONS.index(Direction.RIGHT)
+        self.grow_pending[rows] = 0
+        self.power_up_active[rows] = False
+        self.power_up_timer[rows] = 0
+        self.time[rows] = 0
+        self.is_invincible[rows] = False
+        self.invincibility_end[rows] = 0
+        self.speed_modifier[rows] = 1.0
+        self.speed_mod_end[rows] = 0
+
+        self.score[rows] = 0
+        self.level[rows] = 1
+        self.ticks[rows] = 0
+        self.power_ups_taken[rows] = 0
+        self.death_cause[rows] = ALIVE
+
+        self.food[rows] = self._random_free(rows)
+        self.move_delay[rows] = self._move_delay(rows)
+
+    def step(self, actions=None):
+        """Avança todas as partidas um tick; ações são índices de DIRECTIONS (-1 mantém a direção)
+
+        Retorna (rewards, dones, info). Partidas terminadas são reiniciadas
+        automaticamente; info traz pontuação, nível, ticks e causa da morte finais.
+        """
+        rows = np.arange(self.num_envs)
+        score_before = self.score.copy()
+
+        if actions is not None:
+            actions = np.asarray(actions, dtype=np.int64)
+            turn = (actions >= 0) & (actions != OPPOSITE[self.direction])
+            self.direction[turn] = actions[turn]
+
+        self.time += self.move_delay
+        self._update_effects()
+
+        # Mover a cabeça (o tabuleiro dá a volta nas bordas, como Snake.move)
+        heads = self.heads
+        new_x = (heads % self.width + DX[self.direction]) % self.width
+        new_y = (heads // self.width + DY[self.direction]) % self.height
+        heads = new_y * self.width + new_x
+        self.head_ptr = (self.head_ptr - 1) % self.capacity
+        self.body[rows, self.head_ptr] = heads
+        self.occupancy[rows, heads] += 1
+        self.length += 1
+
+        # Remover a cauda de quem não está crescendo
+        growing = (self.grow_pending > 0) & (self.length < self.capacity)
+        self.grow_pending[growing] -= 1
+        moving = np.flatnonzero(~growing)
+        tails = self.body[moving, (self.head_ptr[moving] + self.length[moving] - 1) % self.capacity]
+        self.occupancy[moving, tails] -= 1
+        self.length[moving] -= 1
+
+        self.ticks += 1
+        self.move_delay = self._move_delay(rows)
+
+        # Verificar colisões
+        vulnerable = ~self.is_invincible
+        hit_self = vulnerable & (self.occupancy[rows, heads] > 1)
+        hit_barrier = vulnerable & ~hit_self & self.barriers[rows, heads]
+        self.death_cause[hit_self] = DEATH_SELF
+        self.death_cause[hit_barrier] = DEATH_BARRIER
+        dones = hit_self | hit_barrier
+        alive = ~dones
+
+        # Comida
+        ate = np.flatnonzero(alive & (heads == self.food))
+        if len(ate):
+            self.grow_pending[ate] += 1
+            self.score[ate] += 10 * self.level[ate]
+            level_up = ate[self.score[ate] % (50 * self.level[ate]) == 0]
+            if len(level_up):
+                self.level[level_up] += 1
+                self._add_barriers(level_up)
+            self.food[ate] = self._random_free(ate)
+
+        # Power-ups
+        took = np.flatnonzero(alive & self.power_up_active & (heads == self.power_up_cell))
+        if len(took):
+            self._apply_power_ups(took, self.power_up_type[took])
+            self.power_up_active[took] = False
+            self.power_ups_taken[took] += 1
+
+        self._update_timers(np.flatnonzero(alive))
+
+        rewards = self.score - score_before
+        info = {
+            "score": self.score.copy(),
+            "level": self.level.copy(),
+            "ticks": self.ticks.copy(),
+            "power_ups_taken": self.power_ups_taken.copy(),
+            "death_cause": self.death_cause.copy(),
+        }
+        self.reset(np.flatnonzero(dones))
+        return rewards, dones, info
+
+    def _move_delay(self, rows):
+        # Mesma fórmula de Simulation.get_move_delay
+        delay = 150 - self.difficulty * 10 - np.minimum(self.level[rows] * 5, 50)
+        return np.maximum(50, delay) / self.speed_modifier[rows]
+
+    def _update_effects(self, rows=slice(None)):
+        expired = self.time[rows] > self.invincibility_end[rows]
+        self.is_invincible[rows] &= ~expired
+        self.speed_modifier[rows] = np.where(self.time[rows] > self.speed_mod_end[rows],
+                                             1.0, self.speed_modifier[rows])
+
+    def _update_timers(self, rows):
+        self._update_effects(rows)
+
+        expired = rows[self.power_up_active[rows] &
+                       (self.time[rows] - self.power_up_spawn_time[rows] > POWER_UP_DURATION)]
+        self.power_up_active[expired] = False
+
+        due = rows[~self.power_up_active[rows] &
+                   (self.time[rows] - self.power_up_timer[rows] > POWER_UP_DELAY)]
+        if len(due):
+            cells = self._random_free(due, exclude=self.food[due])
+            spawned = cells >= 0
+            spawned_rows = due[spawned]
+            self.power_up_cell[spawned_rows] = cells[spawned]
+            self.power_up_active[spawned_rows] = True
+            self.power_up_spawn_time[spawned_rows] = self.time[spawned_rows]
+            self.power_up_type[spawned_rows] = self.rng.integers(0, len(POWER_UP_TYPES), len(spawned_rows))
+            self.power_up_timer[due] = self.time[due]
+
+    def _apply_power_ups(self, rows, types):
+        speed = rows[types == SPEED]
+        self.speed_modifier[speed] = 1.5
+        self.speed_mod_end[speed] = self.time[speed] + EFFECT_DURATION
+
+        slow = rows[types == SLOW]
+        self.speed_modifier[slow] = 0.5
+        self.speed_mod_end[slow] = self.time[slow] + EFFECT_DURATION
+
+        invincible = rows[types == INVINCIBLE]
+        self.is_invincible[invincible] = True
+        self.invincibility_end[invincible] = self.time[invincible] + EFFECT_DURATION
+
+        self.score[rows[types == POINTS]] += 50
+
+        # Redução pela metade: evento raro, tratado partida a partida
+        for row in rows[types == SHRINK]:
+            amount = max(1, self.length[row] // 2)
+            if self.length[row] > amount:
+                tail = self.head_ptr[row] + self.length[row] - 1
+                removed = self.body[row, (tail - np.arange(amount)) % self.capacity]
+                np.subtract.at(self.occupancy[row], removed, 1)
+                self.length[row] -= amount
+
+    def _add_barriers(self, rows):
+        cells = self._random_free(rows, exclude=self.food[rows])
+        placed = cells >= 0
+        self.barriers[rows[placed], cells[placed]] = True
+
+    def _random_free(self, rows, exclude=None):
+        """Sorteia uma célula livre por partida (-1 se não houver nenhuma)"""
+        cells = np.full(len(rows), -1, dtype=np.int64)
+        pending = np.arange(len(rows))
+
+        # Amostragem por rejeição: rápida enquanto o tabuleiro tem espaço livre
+        for _ in range(8):
+            candidates = self.rng.integers(0, self.cells, len(pending))
+            free = (self.occupancy[rows[pending], candidates] == 0) & \
+                   ~self.barriers[rows[pending], candidates]
+            if exclude is not None:
+                free &= candidates != exclude[pending]
+            cells[pending[free]] = candidates[free]
+            pending = pending[~free]
+            if len(pending) == 0:
+                return cells
+
+        # Tabuleiros quase cheios: sorteio exato entre as células livres
+        for i in pending:
+            mask = (self.occupancy[rows[i]] == 0) & ~self.barriers[rows[i]]
+            if exclude is not None:
+                mask[exclude[i]] = False
+            free_cells = np.flatnonzero(mask)
+            if len(free_cells):
+                cells[i] = self.rng.choice(free_cells)
+        return cells